@@ -7,4 +7,4 @@ export PYTHONUNBUFFERED=true
 
 /app/app/prometheus-cleanup.sh
 
-celery -A core worker -l INFO -c 1 --pidfile=/tmp/celery-%n.pid
+celery -A core worker -l INFO -c "${CELERY_WORKER_CONCURRENCY:-1}" --pidfile=/tmp/celery-%n.pid
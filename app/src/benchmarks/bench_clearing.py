@@ -0,0 +1,39 @@
+"""Clears a delivery day of 10k positions with pro-rata and merit-order acceptance, decoding included.
+
+Run from `app/src`: `python -m benchmarks.bench_clearing`
+"""
+import os
+
+import django
+import numpy as np
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+django.setup()
+
+from benchmarks.common import measure, report  # noqa: E402
+from offering import values as fixed_point  # noqa: E402
+from simulation.clearing import clear  # noqa: E402
+from simulation.models import ClearingMethod  # noqa: E402
+
+POSITIONS = 10_000
+SLOTS = 24
+
+
+def main() -> None:
+    rng = np.random.default_rng(42)
+    packed = [fixed_point.pack(rng.integers(0, 50 * fixed_point.SCALE, SLOTS)) for _ in range(POSITIONS)]
+    demand = rng.integers(0, POSITIONS * 25 * fixed_point.SCALE, SLOTS)
+    priority = rng.permutation(POSITIONS)
+
+    def decode() -> np.ndarray:
+        return np.ascontiguousarray(fixed_point.unpack(b"".join(packed)).reshape(POSITIONS, SLOTS).T)
+
+    offers = decode()
+    report("decode order book", *measure(decode), POSITIONS * SLOTS)
+    for method in ClearingMethod.values:
+        seconds, peak = measure(lambda: clear(method, offers, demand, priority))
+        report(f"clear {method}", seconds, peak, POSITIONS * SLOTS)
+
+
+if __name__ == "__main__":
+    main()
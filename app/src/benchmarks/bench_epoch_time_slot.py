@@ -0,0 +1,41 @@
+"""Compares `TimeSlot` against `EpochTimeSlot` on creation, comparison and splitting.
+
+Run from `app/src`: `python -m benchmarks.bench_epoch_time_slot`
+"""
+import arrow
+
+from benchmarks.common import measure, report
+from common.epoch_time_slot import EpochTimeSlot
+from common.time_slot import TimeSlot
+
+SLOTS = 10_000
+
+
+def main() -> None:
+    start = arrow.get("2024-01-01T00:00:00")
+    arrow_bounds = [(start.shift(hours=i), start.shift(hours=i + 2)) for i in range(SLOTS)]
+    epoch_bounds = [(a.int_timestamp, b.int_timestamp) for a, b in arrow_bounds]
+
+    arrow_slots = [TimeSlot(a, b) for a, b in arrow_bounds]
+    epoch_slots = [EpochTimeSlot(a, b) for a, b in epoch_bounds]
+    arrow_probe, epoch_probe = arrow_slots[SLOTS // 2], epoch_slots[SLOTS // 2]
+    arrow_year = TimeSlot(start, start.shift(years=1))
+    epoch_year = EpochTimeSlot.from_time_slot(arrow_year)
+
+    cases = [
+        ("create TimeSlot", lambda: [TimeSlot(a, b) for a, b in arrow_bounds], SLOTS),
+        ("create EpochTimeSlot", lambda: [EpochTimeSlot(a, b) for a, b in epoch_bounds], SLOTS),
+        ("overlaps TimeSlot", lambda: [s.overlaps(arrow_probe) for s in arrow_slots], SLOTS),
+        ("overlaps EpochTimeSlot", lambda: [s.overlaps(epoch_probe) for s in epoch_slots], SLOTS),
+        ("common_part_with TimeSlot", lambda: [s.common_part_with(arrow_probe) for s in arrow_slots], SLOTS),
+        ("common_part_with EpochTimeSlot", lambda: [s.common_part_with(epoch_probe) for s in epoch_slots], SLOTS),
+        ("split 1 year hourly TimeSlot", lambda: arrow_year.split(3600), 8784),
+        ("split 1 year hourly EpochTimeSlot", lambda: epoch_year.split(3600), 8784),
+    ]
+    for name, fn, count in cases:
+        seconds, peak = measure(fn)
+        report(name, seconds, peak, count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compares the DRF serializer against `OfferingPayloadValidator` on upload payloads of 10k values per item.
+
+Run from `app/src`: `python -m benchmarks.bench_offering_validation`
+"""
+import os
+import random
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+django.setup()
+
+from benchmarks.common import measure, report  # noqa: E402
+from offering import values as fixed_point  # noqa: E402
+from offering.serializers import OfferingPayloadItemSerializer  # noqa: E402
+from offering.validation import OfferingPayloadValidator  # noqa: E402
+
+ITEMS = 10
+VALUES = 10_000
+
+
+def main() -> None:
+    rnd = random.Random(42)
+    payload = [
+        {
+            "reference": f"FI_client{i}_FCRN",
+            "unit": "MW",
+            "startTime": "2025-01-15T23:00:00Z",
+            "slotLength": 3600,
+            "values": [f"{rnd.uniform(0, 100):.3f}" for _ in range(VALUES)],
+        }
+        for i in range(ITEMS)
+    ]
+
+    def serializer():
+        validator = OfferingPayloadItemSerializer(data=payload, many=True)
+        validator.is_valid(raise_exception=True)
+        return [fixed_point.to_micro(item["values"]) for item in validator.validated_data]
+
+    def validator():
+        validator = OfferingPayloadValidator(data=payload, many=True)
+        assert validator.is_valid()
+        return validator.validated_data
+
+    for name, fn in (("DRF serializer + to_micro", serializer), ("OfferingPayloadValidator", validator)):
+        seconds, peak = measure(fn)
+        report(name, seconds, peak, ITEMS * VALUES)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Compares `TimeSlotIndex` overlap and stabbing queries against a linear scan.
+
+Run from `app/src`: `python -m benchmarks.bench_time_slot_index`
+"""
+import random
+
+from benchmarks.common import measure, report
+from common.epoch_time_slot import EpochTimeSlot
+from common.time_slot_index import TimeSlotIndex
+
+SLOTS = 200_000
+QUERIES = 200
+HORIZON = 5 * 365 * 24 * 3600
+
+
+def main() -> None:
+    rnd = random.Random(42)
+    starts = [rnd.randrange(0, HORIZON, 3600) for _ in range(SLOTS)]
+    slots = [(EpochTimeSlot(start, start + rnd.choice([3600, 86400, 7 * 86400])), i) for i, start in enumerate(starts)]
+    queries = [EpochTimeSlot(start, start + 3600) for start in (rnd.randrange(0, HORIZON) for _ in range(QUERIES))]
+    instants = [rnd.randrange(0, HORIZON) for _ in range(QUERIES)]
+
+    seconds, peak = measure(lambda: TimeSlotIndex.bulk(slots), repeat=1)
+    report("bulk build", seconds, peak, SLOTS)
+    index = TimeSlotIndex.bulk(slots)
+
+    cases = [
+        ("overlap query linear scan", lambda: [[v for s, v in slots if s.overlaps(q)] for q in queries]),
+        ("overlap query index", lambda: [index.overlapping(q) for q in queries]),
+        ("stabbing query linear scan", lambda: [[v for s, v in slots if s.from_ts <= t <= s.to_ts] for t in instants]),
+        ("stabbing query index", lambda: [index.at(t) for t in instants]),
+    ]
+    for name, fn in cases:
+        seconds, peak = measure(fn, repeat=1)
+        report(name, seconds, peak, QUERIES)
+
+
+if __name__ == "__main__":
+    main()
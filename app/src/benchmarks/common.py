@@ -0,0 +1,26 @@
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5) -> tuple[float, int]:
+    """Returns the best wall-clock time in seconds and the peak traced allocation in bytes of `fn`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def report(name: str, seconds: float, peak_bytes: int, count: int | None = None) -> None:
+    line = f"{name:<48} {seconds * 1000:>10.2f} ms {peak_bytes / 1024:>12.1f} KiB"
+    if count:
+        line += f" {seconds / count * 1e9:>10.0f} ns/op"
+    print(line)
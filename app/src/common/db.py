@@ -0,0 +1,71 @@
+import io
+from collections.abc import Iterable, Sequence
+
+from django.db import DEFAULT_DB_ALIAS, connections, models
+from more_itertools import chunked
+
+
+def bulk_insert(model: type[models.Model], objs: Iterable[models.Model], batch_size: int) -> None:
+    """Inserts `objs` without returning their keys, in one statement per `batch_size` rows on every backend."""
+    # resolved once, every attribute access on the `connection` proxy goes through a thread-local lookup
+    connection = connections[DEFAULT_DB_ALIAS]
+    if connection.vendor != "sqlite":
+        model.objects.bulk_create(objs, batch_size=batch_size)
+        return
+    # bulk_create splits statements at 999 parameters on SQLite, executemany sends all rows at once
+    fields = [f for f in model._meta.concrete_fields if not f.primary_key]
+    columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+    sql = (
+        f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))})"
+    )
+    rows = [[f.get_db_prep_save(getattr(obj, f.attname), connection) for f in fields] for obj in objs]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def insert_rows(model: type[models.Model], columns: Sequence[str], rows: Iterable[Sequence], batch_size: int) -> None:
+    """Inserts rows of values already prepared for the database into `columns` of the table of `model`.
+
+    COPY on Postgres and executemany elsewhere, `batch_size` rows per statement, no model instances are built.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    table = connection.ops.quote_name(model._meta.db_table)
+    quoted = ", ".join(connection.ops.quote_name(c) for c in columns)
+    sql = f"INSERT INTO {table} ({quoted}) VALUES ({', '.join(['%s'] * len(columns))})"
+    with connection.cursor() as cursor:
+        for batch in chunked(rows, batch_size):
+            if connection.vendor == "postgresql":
+                copy_rows(cursor, table, columns, batch)
+            else:
+                cursor.executemany(sql, batch)
+
+
+def copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> None:
+    connection = connections[DEFAULT_DB_ALIAS]
+    sql = f"COPY {table} ({', '.join(connection.ops.quote_name(c) for c in columns)}) FROM STDIN"
+    data = copy_text(rows)
+    raw = cursor.cursor
+    if hasattr(raw, "copy_expert"):
+        raw.copy_expert(sql, io.StringIO(data))
+    else:
+        with raw.copy(sql) as copy:
+            copy.write(data)
+
+
+def copy_text(rows: Iterable[tuple]) -> str:
+    """Renders rows in the PostgreSQL COPY text format."""
+    return "".join("\t".join(_copy_value(value) for value in row) + "\n" for row in rows)
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(value).hex()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value).translate(_COPY_ESCAPES)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from arrow import Arrow
+
+from common.time import to_seconds
+from common.time_slot import TimeSlot
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class EpochTimeSlot:
+    """Lightweight counterpart of `TimeSlot` keeping UTC epoch seconds as plain ints.
+
+    Has the same semantics as `TimeSlot` (closed-interval `overlaps`, same ordering of
+    `leftover_after_removing_common_with` results) and is meant for hot paths where
+    thousands of slots are created and compared.
+    """
+
+    __slots__ = ("from_ts", "to_ts")
+
+    def __init__(self, from_ts: int, to_ts: int) -> None:
+        self.from_ts = from_ts
+        self.to_ts = to_ts
+
+    @classmethod
+    def from_time_slot(cls, slot: TimeSlot) -> EpochTimeSlot:
+        # sub-second precision is dropped, trading slots are always aligned to whole seconds
+        return cls(slot.from_date.int_timestamp, slot.to_date.int_timestamp)
+
+    @classmethod
+    def of(cls, slot: TimeSlot | EpochTimeSlot) -> EpochTimeSlot:
+        return slot if isinstance(slot, EpochTimeSlot) else cls.from_time_slot(slot)
+
+    def to_time_slot(self) -> TimeSlot:
+        return TimeSlot(_to_arrow(self.from_ts), _to_arrow(self.to_ts))
+
+    @staticmethod
+    def empty() -> EpochTimeSlot:
+        return EpochTimeSlot.from_time_slot(TimeSlot.empty())
+
+    def within(self, other: EpochTimeSlot) -> bool:
+        return self.from_ts >= other.from_ts and self.to_ts <= other.to_ts
+
+    def overlaps(self, other: EpochTimeSlot) -> bool:
+        return self.from_ts <= other.to_ts and self.to_ts >= other.from_ts
+
+    def leftover_after_removing_common_with(self, other: EpochTimeSlot) -> list[EpochTimeSlot]:
+        result: list[EpochTimeSlot] = []
+        if self == other:
+            return []
+        if not other.overlaps(self):
+            return [self, other]
+        if self.from_ts < other.from_ts:
+            result.append(EpochTimeSlot(self.from_ts, other.from_ts))
+        elif other.from_ts < self.from_ts:
+            result.append(EpochTimeSlot(other.from_ts, self.from_ts))
+        if self.to_ts > other.to_ts:
+            result.append(EpochTimeSlot(other.to_ts, self.to_ts))
+        elif other.to_ts > self.to_ts:
+            result.append(EpochTimeSlot(self.to_ts, other.to_ts))
+        return result
+
+    def is_empty(self) -> bool:
+        return self.from_ts == self.to_ts
+
+    def common_part_with(self, other: EpochTimeSlot) -> EpochTimeSlot:
+        if not self.overlaps(other):
+            return EpochTimeSlot(self.from_ts, self.from_ts)
+        return EpochTimeSlot(max(self.from_ts, other.from_ts), min(self.to_ts, other.to_ts))
+
+    @property
+    def duration(self) -> timedelta:
+        return timedelta(seconds=self.to_ts - self.from_ts)
+
+    def split(self, duration: timedelta | int) -> list[EpochTimeSlot]:
+        step = to_seconds(duration)
+        if (self.to_ts - self.from_ts) % step != 0:
+            raise ValueError("Slot duration not divisible by split duration")
+        return [EpochTimeSlot(start, start + step) for start in range(self.from_ts, self.to_ts, step)]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EpochTimeSlot):
+            return NotImplemented
+        return self.from_ts == other.from_ts and self.to_ts == other.to_ts
+
+    def __hash__(self) -> int:
+        return hash((self.from_ts, self.to_ts))
+
+    def __repr__(self) -> str:
+        return f"EpochTimeSlot(from_ts={self.from_ts}, to_ts={self.to_ts})"
+
+
+def _to_arrow(timestamp: int) -> Arrow:
+    return Arrow.fromdatetime(_EPOCH + timedelta(seconds=timestamp))
@@ -0,0 +1,205 @@
+import codecs
+import json
+import re
+from collections.abc import Iterator
+from typing import Any, BinaryIO
+
+CHUNK_SIZE = 64 * 1024
+# longest array element accepted, in characters, a malformed or hostile element is not buffered past it
+MAX_ELEMENT_SIZE = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_STRING_END = re.compile(r'["\\]')
+_NESTING = re.compile(r'["\[\]{}]')
+_SCALAR_END = re.compile(r"[ \t\n\r,\]]")
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+class _ElementEnd:
+    """Finds where an array element ends, across chunks, by tracking nesting outside strings.
+
+    Scalars end at the first whitespace, ',' or ']', so a number split across chunks is never decoded in part.
+    """
+
+    def __init__(self, first: str) -> None:
+        self.scalar = first not in '[{"'
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def find(self, text: str, start: int) -> int | None:
+        """Index just past the element in `text`, None when it continues in the next chunk."""
+        if self.scalar:
+            match = _SCALAR_END.search(text, start)
+            return match.start() if match else None
+        position = start
+        while True:
+            if self.in_string:
+                if self.escaped:
+                    if position == len(text):
+                        return None
+                    position += 1
+                    self.escaped = False
+                match = _STRING_END.search(text, position)
+                if match is None:
+                    return None
+                position = match.end()
+                if match.group() == "\\":
+                    self.escaped = True
+                    continue
+                self.in_string = False
+                if self.depth == 0:
+                    return position
+            else:
+                match = _NESTING.search(text, position)
+                if match is None:
+                    return None
+                position = match.end()
+                char = match.group()
+                if char == '"':
+                    self.in_string = True
+                elif char in "[{":
+                    self.depth += 1
+                else:
+                    self.depth -= 1
+                    if self.depth == 0:
+                        return position
+
+
+def iter_json_array(stream: BinaryIO, chunk_size: int = CHUNK_SIZE,
+                    max_element_size: int = MAX_ELEMENT_SIZE) -> Iterator[Any]:
+    """Yields elements of a top level JSON array read from `stream` one by one.
+
+    Only the element being read and one chunk are kept in memory. An element split across chunks is decoded once,
+    after its end was found, and an element longer than `max_element_size` characters is rejected.
+    """
+    chunks = _iter_text(stream, chunk_size)
+    buffer = ""
+    position = 0
+    expect = "["
+    eof = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+        if position == len(buffer):
+            if eof:
+                raise JSONStreamError("Unexpected end of JSON array")
+            buffer, position = buffer[position:] + next(chunks, ""), 0
+            eof = position == len(buffer)
+            continue
+
+        char = buffer[position]
+        if expect == "[":
+            if char != "[":
+                raise JSONStreamError("Payload must be a JSON array")
+            position += 1
+            expect = "value or ]"
+        elif expect in ("value or ]", ", or ]") and char == "]":
+            position += 1
+            break
+        elif expect == ", or ]":
+            if char != ",":
+                raise JSONStreamError("Expected ',' or ']' after array element")
+            position += 1
+            expect = "value"
+        else:
+            value, buffer, position, eof = _read_element(buffer, position, chunks, max_element_size)
+            yield value
+            expect = ", or ]"
+
+    while True:
+        if buffer[position:].strip(_WHITESPACE):
+            raise JSONStreamError("Unexpected data after JSON array")
+        chunk = next(chunks, "")
+        if not chunk:
+            return
+        buffer, position = chunk, 0
+
+
+def _read_element(buffer: str, position: int, chunks: Iterator[str],
+                  max_element_size: int) -> tuple[Any, str, int, bool]:
+    """Decodes the element starting at `position`, returns it with the buffer, position and end of stream flag after it.
+
+    An element within the buffer is decoded in place. Only an element running past the buffer is scanned for its
+    end chunk by chunk and decoded once, when complete.
+    """
+    try:
+        value, end = _decoder.raw_decode(buffer, position)
+    except json.JSONDecodeError:
+        pass
+    else:
+        # a scalar may continue in the next chunk, it is complete once a delimiter follows
+        complete = buffer[position] in '[{"' or _SCALAR_END.match(buffer, end) is not None
+        if complete and end - position <= max_element_size:
+            return value, buffer, end, False
+
+    element_end = _ElementEnd(buffer[position])
+    parts: list[str] = []
+    size = 0
+    eof = False
+    while True:
+        end = element_end.find(buffer, position)
+        size += (len(buffer) if end is None else end) - position
+        if size > max_element_size:
+            raise JSONStreamError(f"Array element longer than {max_element_size} characters")
+        if end is not None:
+            parts.append(buffer[position:end])
+            break
+        parts.append(buffer[position:])
+        buffer, position = next(chunks, ""), 0
+        if not buffer:
+            if not element_end.scalar:
+                raise JSONStreamError("Unexpected end of JSON array")
+            # a scalar running to the end of the body, the missing ']' is reported after it
+            end, eof = 0, True
+            break
+
+    text = "".join(parts)
+    try:
+        value, text_end = _decoder.raw_decode(text)
+    except json.JSONDecodeError as e:
+        raise JSONStreamError(f"Malformed JSON: {e}")
+    if text_end != len(text):
+        raise JSONStreamError(f"Malformed JSON: unexpected data in array element at char {text_end}")
+    return value, buffer, end, eof
+
+
+def iter_ndjson(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yields one decoded value per non blank line of a newline delimited JSON stream."""
+    buffer = ""
+    line_number = 0
+    for chunk in _iter_text(stream, chunk_size):
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield _loads_line(line, line_number)
+    if buffer.strip():
+        yield _loads_line(buffer, line_number + 1)
+
+
+def _loads_line(line: str, line_number: int) -> Any:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise JSONStreamError(f"Malformed JSON in line {line_number}: {e}")
+
+
+def _iter_text(stream: BinaryIO, chunk_size: int) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+        text = decoder.decode(data)
+        if text:
+            yield text
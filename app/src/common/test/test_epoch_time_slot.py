@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+import arrow
+import pytest
+import pytz
+from arrow import Arrow
+from assertpy import assert_that
+
+from common.epoch_time_slot import EpochTimeSlot
+from common.time_slot import TimeSlot
+
+
+def epoch_slot(from_date: str, to_date: str) -> EpochTimeSlot:
+    return EpochTimeSlot(arrow.get(from_date).int_timestamp, arrow.get(to_date).int_timestamp)
+
+
+def test_round_trip_with_time_slot() -> None:
+    slot = TimeSlot.at(2024, 3, 31)
+
+    epoch = EpochTimeSlot.from_time_slot(slot)
+
+    assert_that(epoch.duration).is_equal_to(timedelta(hours=23))
+    assert_that(epoch.to_time_slot()).is_equal_to(slot)
+
+
+def test_empty_slot_round_trip() -> None:
+    epoch = EpochTimeSlot.empty()
+
+    assert_that(epoch.is_empty()).is_true()
+    assert_that(epoch.to_time_slot()).is_equal_to(TimeSlot.empty())
+
+
+def test_within() -> None:
+    inner = epoch_slot("2023-01-02T00:00:00", "2023-01-02T23:59:59")
+    outer = epoch_slot("2023-01-01T00:00:00", "2023-01-03T00:00:00")
+
+    assert_that(inner.within(outer)).is_true()
+    assert_that(outer.within(inner)).is_false()
+    assert_that(inner.within(inner)).is_true()
+
+
+def test_overlaps_uses_closed_intervals() -> None:
+    slot_1 = epoch_slot("2022-01-01", "2022-01-10")
+    touching = epoch_slot("2022-01-10", "2022-01-20")
+    separate = epoch_slot("2022-01-10T01:00:00", "2022-01-20")
+
+    assert_that(slot_1.overlaps(touching)).is_true()
+    assert_that(slot_1.overlaps(separate)).is_false()
+
+
+def test_leftover_matches_time_slot() -> None:
+    pairs = [
+        (("2022-01-01", "2022-01-10"), ("2022-01-15", "2022-01-20")),
+        (("2022-01-01", "2022-01-10"), ("2022-01-01", "2022-01-10")),
+        (("2022-01-01", "2022-01-15"), ("2022-01-10", "2022-01-20")),
+        (("2022-01-05", "2022-01-20"), ("2022-01-01", "2022-01-10")),
+        (("2022-01-01", "2022-01-20"), ("2022-01-10", "2022-01-15")),
+    ]
+    for first, second in pairs:
+        slot_1, slot_2 = TimeSlot(*map(arrow.get, first)), TimeSlot(*map(arrow.get, second))
+
+        expected = slot_1.leftover_after_removing_common_with(slot_2)
+        result = EpochTimeSlot.from_time_slot(slot_1).leftover_after_removing_common_with(
+            EpochTimeSlot.from_time_slot(slot_2)
+        )
+
+        assert_that([s.to_time_slot() for s in result]).is_equal_to(expected)
+
+
+def test_common_part_with() -> None:
+    slot_1 = epoch_slot("2022-01-01", "2022-01-15")
+    slot_2 = epoch_slot("2022-01-10", "2022-01-20")
+    slot_3 = epoch_slot("2022-02-01", "2022-02-02")
+
+    assert_that(slot_1.common_part_with(slot_2)).is_equal_to(epoch_slot("2022-01-10", "2022-01-15"))
+    assert_that(slot_1.common_part_with(slot_3).is_empty()).is_true()
+
+
+def test_split_matches_time_slot_on_dst_day() -> None:
+    day = TimeSlot.at(2024, 10, 27)
+
+    result = EpochTimeSlot.from_time_slot(day).split(3600)
+
+    assert_that(result).is_length(25)
+    assert_that([s.to_time_slot() for s in result]).is_equal_to(day.split(3600))
+
+
+def test_split_with_timedelta() -> None:
+    slot = epoch_slot("2024-01-01T00:00:00", "2024-01-01T04:00:00")
+
+    result = slot.split(timedelta(hours=2))
+
+    assert_that(result).is_equal_to([
+        epoch_slot("2024-01-01T00:00:00", "2024-01-01T02:00:00"),
+        epoch_slot("2024-01-01T02:00:00", "2024-01-01T04:00:00"),
+    ])
+
+
+def test_split_not_divisible_raises_error() -> None:
+    slot = epoch_slot("2024-01-01T00:00:00", "2024-01-01T01:30:00")
+
+    with pytest.raises(ValueError, match="Slot duration not divisible by split duration"):
+        slot.split(timedelta(hours=1))
+
+
+def test_split_non_positive_duration_raises_error() -> None:
+    slot = epoch_slot("2024-01-01T00:00:00", "2024-01-01T01:00:00")
+
+    with pytest.raises(ValueError, match="duration must be positive"):
+        slot.split(0)
+
+
+def test_equality_and_hash() -> None:
+    slot_1 = EpochTimeSlot.from_time_slot(
+        TimeSlot(Arrow(2022, 1, 1, tzinfo=pytz.timezone("CET")), Arrow(2022, 1, 2, tzinfo=pytz.timezone("CET")))
+    )
+    slot_2 = epoch_slot("2021-12-31T23:00:00", "2022-01-01T23:00:00")
+
+    assert_that(slot_1).is_equal_to(slot_2)
+    assert_that({slot_1, slot_2}).is_length(1)
@@ -0,0 +1,92 @@
+import io
+import json
+
+import pytest
+from assertpy import assert_that
+
+from common.json_stream import JSONStreamError, iter_json_array, iter_ndjson
+
+ITEMS = [{"reference": f"FI_client{i}_FCRN", "values": ["1.0"] * 24, "unit": "MW µ"} for i in range(50)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_iter_json_array_yields_items_for_any_chunk_size(chunk_size) -> None:
+    stream = io.BytesIO(json.dumps(ITEMS, ensure_ascii=False, indent=2).encode())
+
+    assert_that(list(iter_json_array(stream, chunk_size))).is_equal_to(ITEMS)
+
+
+def test_iter_json_array_is_lazy() -> None:
+    stream = io.BytesIO(json.dumps(ITEMS).encode())
+
+    items = iter_json_array(stream, chunk_size=256)
+    next(items)
+
+    assert_that(stream.tell()).is_less_than(1024)
+
+
+def test_iter_json_array_empty() -> None:
+    assert_that(list(iter_json_array(io.BytesIO(b" [ ] \n")))).is_empty()
+
+
+@pytest.mark.parametrize("payload, message", [
+    (b'{"reference": "x"}', "Payload must be a JSON array"),
+    (b'[{"a": 1}', "Unexpected end of JSON array"),
+    (b'[{"a": 1},]', "Malformed JSON"),
+    (b'[{"a": 1} {"a": 2}]', "Expected ',' or ']'"),
+    (b'[{"a": 1}] trailing', "Unexpected data after JSON array"),
+])
+def test_iter_json_array_malformed_payload_raises_error(payload, message) -> None:
+    with pytest.raises(JSONStreamError, match=message):
+        list(iter_json_array(io.BytesIO(payload), chunk_size=3))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 64 * 1024])
+def test_iter_json_array_decodes_scalars_and_strings_split_across_chunks(chunk_size) -> None:
+    items = [1234, -5.5e3, True, None, "a \\\"]} ,b", {"k": ["\\", "]"]}, [[], {}], "µ"]
+    payload = json.dumps(items, ensure_ascii=False).encode()
+
+    assert_that(list(iter_json_array(io.BytesIO(payload), chunk_size))).is_equal_to(items)
+
+
+def test_iter_json_array_fails_on_malformed_element_without_reading_the_rest() -> None:
+    stream = io.BytesIO(b'[{"a": 1}, {"a": 1 2}, ' + json.dumps(ITEMS).encode()[1:])
+
+    items = iter_json_array(stream, chunk_size=16)
+    next(items)
+
+    assert_that(next).raises(JSONStreamError).when_called_with(items).contains("Malformed JSON")
+    assert_that(stream.tell()).is_less_than(64)
+
+
+def test_iter_json_array_rejects_too_long_element() -> None:
+    stream = io.BytesIO(json.dumps([{"a": "x" * 100}, {"a": "x" * 1000}]).encode())
+
+    items = iter_json_array(stream, chunk_size=64, max_element_size=200)
+    next(items)
+
+    assert_that(next).raises(JSONStreamError).when_called_with(items).contains("longer than 200 characters")
+    assert_that(stream.tell()).is_less_than(512)
+
+
+@pytest.mark.parametrize("payload, message", [
+    (b"[12", "Unexpected end of JSON array"),
+    (b'[{"a": [1}]', "Malformed JSON"),
+    (b"[1 2]", "Expected ',' or ']'"),
+    (b"[12x]", "Malformed JSON"),
+])
+def test_iter_json_array_malformed_element_raises_error(payload, message) -> None:
+    with pytest.raises(JSONStreamError, match=message):
+        list(iter_json_array(io.BytesIO(payload), chunk_size=1))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 13, 64 * 1024])
+def test_iter_ndjson_yields_items(chunk_size) -> None:
+    stream = io.BytesIO(("\n".join(json.dumps(item) for item in ITEMS) + "\n\n").encode())
+
+    assert_that(list(iter_ndjson(stream, chunk_size))).is_equal_to(ITEMS)
+
+
+def test_iter_ndjson_malformed_line_raises_error() -> None:
+    with pytest.raises(JSONStreamError, match="line 2"):
+        list(iter_ndjson(io.BytesIO(b'{"a": 1}\n{"a": \n')))
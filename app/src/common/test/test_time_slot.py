@@ -319,3 +319,32 @@ def test_day_23_hours():
 @time_machine.travel("2024-10-11 12:00:00", tick=False)
 def test_day_24_hours():
     assert_that(TimeSlot.today("CET").split(3600)).is_length(24)
+
+
+def test_iter_split_is_lazy_and_matches_split():
+    slot = TimeSlot(arrow.get("2024-01-01T00:00:00"), arrow.get("2024-01-01T06:00:00"))
+
+    result = slot.iter_split(timedelta(hours=1))
+
+    assert_that(next(result)).is_equal_to(slot.split(3600)[0])
+    assert_that([slot.split(3600)[0], *result]).is_equal_to(slot.split(3600))
+
+
+def test_iter_split_validates_eagerly():
+    slot = TimeSlot(arrow.get("2024-01-01T00:00:00"), arrow.get("2024-01-01T01:30:00"))
+
+    with pytest.raises(ValueError, match="Slot duration not divisible by split duration"):
+        slot.iter_split(timedelta(hours=1))
+
+
+def test_slot_count_not_divisible_raises_error():
+    slot = TimeSlot(arrow.get("2024-01-01T00:00:00"), arrow.get("2024-01-01T01:30:00"))
+
+    with pytest.raises(ValueError, match="Slot duration not divisible by split duration"):
+        slot.slot_count(3600)
+
+
+@pytest.mark.parametrize("day, expected_count", [((2024, 3, 31), 23), ((2024, 10, 27), 25), ((2024, 10, 11), 24)])
+def test_slot_count_across_dst(day, expected_count):
+    assert_that(TimeSlot.at(*day).slot_count(3600)).is_equal_to(expected_count)
+    assert_that(TimeSlot.at(*day).slot_count(timedelta(minutes=15))).is_equal_to(expected_count * 4)
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+import arrow
+import numpy as np
+import pytest
+from assertpy import assert_that
+
+from common.epoch_time_slot import EpochTimeSlot
+from common.time_slot import TimeSlot
+from common.time_slot_array import TimeSlotArray
+
+
+def slot(from_date: str, to_date: str) -> TimeSlot:
+    return TimeSlot(arrow.get(from_date), arrow.get(to_date))
+
+
+@pytest.fixture
+def slots() -> list[TimeSlot]:
+    return [
+        slot("2022-01-01", "2022-01-10"),
+        slot("2022-01-05", "2022-01-15"),
+        slot("2022-01-10T01:00:00", "2022-01-20"),
+        slot("2022-01-11", "2022-01-20"),
+    ]
+
+
+def test_round_trip_with_time_slots(slots) -> None:
+    array = TimeSlotArray.from_time_slots(slots)
+
+    assert_that(array).is_length(4)
+    assert_that(array.to_time_slots()).is_equal_to(slots)
+
+
+def test_empty_array() -> None:
+    array = TimeSlotArray.from_time_slots([])
+
+    assert_that(array).is_length(0)
+    assert_that(array.to_time_slots()).is_empty()
+    assert_that(array.split(3600)).is_length(0)
+
+
+def test_mismatched_columns_raise_error() -> None:
+    with pytest.raises(ValueError, match="equal length"):
+        TimeSlotArray([1, 2], [3])
+
+
+def test_overlaps_matches_time_slot(slots) -> None:
+    probe = slot("2022-01-01", "2022-01-10")
+
+    result = TimeSlotArray.from_time_slots(slots).overlaps(probe)
+
+    assert_that(result.tolist()).is_equal_to([s.overlaps(probe) for s in slots])
+
+
+def test_within_matches_time_slot(slots) -> None:
+    probe = slot("2022-01-01", "2022-01-16")
+
+    result = TimeSlotArray.from_time_slots(slots).within(EpochTimeSlot.from_time_slot(probe))
+
+    assert_that(result.tolist()).is_equal_to([s.within(probe) for s in slots])
+
+
+def test_element_wise_against_other_array(slots) -> None:
+    others = list(reversed(slots))
+
+    result = TimeSlotArray.from_time_slots(slots).overlaps(TimeSlotArray.from_time_slots(others))
+
+    assert_that(result.tolist()).is_equal_to([s.overlaps(o) for s, o in zip(slots, others)])
+
+
+def test_matrix_operations_match_time_slot(slots) -> None:
+    array = TimeSlotArray.from_time_slots(slots)
+
+    overlaps = array.overlaps_matrix(array)
+    within = array.within_matrix(array)
+
+    assert_that(overlaps.tolist()).is_equal_to([[s.overlaps(o) for o in slots] for s in slots])
+    assert_that(within.tolist()).is_equal_to([[s.within(o) for o in slots] for s in slots])
+
+
+def test_common_part_with_matches_time_slot(slots) -> None:
+    probe = slot("2022-01-08", "2022-01-12")
+
+    result = TimeSlotArray.from_time_slots(slots).common_part_with(probe)
+
+    assert_that(result.to_time_slots()).is_equal_to([s.common_part_with(probe) for s in slots])
+
+
+def test_split_matches_time_slot_across_dst() -> None:
+    days = [TimeSlot.at(2024, 3, 31), TimeSlot.at(2024, 4, 1), TimeSlot.at(2024, 10, 27)]
+    array = TimeSlotArray.from_time_slots(days)
+
+    result = array.split(timedelta(hours=1))
+
+    assert_that(result.to_time_slots()).is_equal_to([s for day in days for s in day.split(3600)])
+    assert_that(np.bincount(array.split_owners(3600)).tolist()).is_equal_to([23, 24, 25])
+
+
+def test_split_not_divisible_raises_error() -> None:
+    array = TimeSlotArray.from_time_slots([slot("2024-01-01T00:00:00", "2024-01-01T01:30:00")])
+
+    with pytest.raises(ValueError, match="Slot duration not divisible by split duration"):
+        array.split(3600)
+
+
+def test_indexing(slots) -> None:
+    array = TimeSlotArray.from_time_slots(slots)
+
+    assert_that(array[1].to_time_slot()).is_equal_to(slots[1])
+    assert_that(array[array.overlaps(slots[0])].to_time_slots()).is_equal_to(slots[:2])
@@ -0,0 +1,78 @@
+import random
+
+import arrow
+import pytest
+from assertpy import assert_that
+
+from common.epoch_time_slot import EpochTimeSlot
+from common.time_slot import TimeSlot
+from common.time_slot_index import TimeSlotIndex
+
+
+def slot(from_date: str, to_date: str) -> TimeSlot:
+    return TimeSlot(arrow.get(from_date), arrow.get(to_date))
+
+
+@pytest.fixture
+def index() -> TimeSlotIndex[str]:
+    return TimeSlotIndex.bulk([
+        (slot("2022-01-01", "2022-01-10"), "a"),
+        (slot("2022-01-05", "2022-01-15"), "b"),
+        (slot("2022-01-10T01:00:00", "2022-01-20"), "c"),
+        (slot("2022-01-11", "2022-01-20"), "d"),
+    ], seed=1)
+
+
+def test_overlapping_uses_closed_intervals(index) -> None:
+    assert_that(index.overlapping(slot("2022-01-10", "2022-01-10"))).contains_only("a", "b")
+    assert_that(index.overlapping(slot("2022-01-20", "2022-01-25"))).contains_only("c", "d")
+    assert_that(index.overlapping(slot("2022-02-01", "2022-02-02"))).is_empty()
+
+
+def test_at_instant(index) -> None:
+    assert_that(index.at(arrow.get("2022-01-10"))).contains_only("a", "b")
+    assert_that(index.at(arrow.get("2022-01-12").datetime)).contains_only("b", "c", "d")
+    assert_that(index.at(arrow.get("2021-12-31").int_timestamp)).is_empty()
+
+
+def test_insert_and_remove(index) -> None:
+    index.insert(slot("2022-01-09", "2022-01-09T12:00:00"), "e")
+    index.insert(slot("2022-01-05", "2022-01-15"), "f")
+
+    assert_that(index).is_length(6)
+    assert_that(index.at(arrow.get("2022-01-09T06:00:00"))).contains_only("a", "b", "e", "f")
+
+    index.remove(slot("2022-01-05", "2022-01-15"), "b")
+
+    assert_that(index).is_length(5)
+    assert_that(index.at(arrow.get("2022-01-09T06:00:00"))).contains_only("a", "e", "f")
+
+
+def test_remove_missing_raises_error(index) -> None:
+    with pytest.raises(KeyError):
+        index.remove(slot("2022-01-05", "2022-01-15"), "a")
+
+
+def test_iterates_in_start_order(index) -> None:
+    assert_that([value for _, value in index]).is_equal_to(["a", "b", "c", "d"])
+
+
+def test_matches_linear_scan_for_random_slots() -> None:
+    rnd = random.Random(7)
+    slots = []
+    for i in range(500):
+        start = rnd.randrange(0, 10_000)
+        slots.append((EpochTimeSlot(start, start + rnd.randrange(0, 300)), i))
+    index = TimeSlotIndex(seed=3)
+    for epoch_slot, value in slots:
+        index.insert(epoch_slot, value)
+    for epoch_slot, value in slots[::2]:
+        index.remove(epoch_slot, value)
+    remaining = slots[1::2]
+
+    for _ in range(100):
+        start = rnd.randrange(0, 10_000)
+        query = EpochTimeSlot(start, start + rnd.randrange(0, 500))
+
+        expected = [value for epoch_slot, value in remaining if epoch_slot.overlaps(query)]
+        assert_that(sorted(index.overlapping(query))).is_equal_to(expected)
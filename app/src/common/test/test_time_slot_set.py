@@ -0,0 +1,89 @@
+import random
+from datetime import timedelta
+
+import arrow
+from assertpy import assert_that
+
+from common.epoch_time_slot import EpochTimeSlot
+from common.time_slot import TimeSlot
+from common.time_slot_set import TimeSlotSet
+
+
+def slot(from_date: str, to_date: str) -> TimeSlot:
+    return TimeSlot(arrow.get(from_date), arrow.get(to_date))
+
+
+def covered_seconds(slot_set: TimeSlotSet) -> set[int]:
+    return {second for s in slot_set for second in range(s.from_ts, s.to_ts)}
+
+
+def test_normalizes_overlapping_touching_and_empty_slots() -> None:
+    slot_set = TimeSlotSet([
+        slot("2022-01-05", "2022-01-15"),
+        slot("2022-01-01", "2022-01-10"),
+        slot("2022-01-15", "2022-01-16"),
+        slot("2022-01-20", "2022-01-20"),
+        slot("2022-01-18", "2022-01-19"),
+    ])
+
+    assert_that(slot_set.to_time_slots()).is_equal_to([
+        slot("2022-01-01", "2022-01-16"),
+        slot("2022-01-18", "2022-01-19"),
+    ])
+    assert_that(slot_set.duration).is_equal_to(timedelta(days=16))
+
+
+def test_union_intersection_difference() -> None:
+    first = TimeSlotSet([slot("2022-01-01", "2022-01-10"), slot("2022-01-20", "2022-01-30")])
+    second = TimeSlotSet([slot("2022-01-05", "2022-01-25")])
+
+    assert_that((first | second).to_time_slots()).is_equal_to([slot("2022-01-01", "2022-01-30")])
+    assert_that((first & second).to_time_slots()).is_equal_to([
+        slot("2022-01-05", "2022-01-10"),
+        slot("2022-01-20", "2022-01-25"),
+    ])
+    assert_that((first - second).to_time_slots()).is_equal_to([
+        slot("2022-01-01", "2022-01-05"),
+        slot("2022-01-25", "2022-01-30"),
+    ])
+
+
+def test_covers() -> None:
+    slot_set = TimeSlotSet([slot("2022-01-01", "2022-01-10"), slot("2022-01-10", "2022-01-12")])
+
+    assert_that(slot_set.covers(slot("2022-01-02", "2022-01-11"))).is_true()
+    assert_that(slot_set.covers(slot("2022-01-01", "2022-01-12"))).is_true()
+    assert_that(slot_set.covers(slot("2021-12-31", "2022-01-02"))).is_false()
+    assert_that(slot_set.covers(slot("2022-01-11", "2022-01-13"))).is_false()
+    assert_that(TimeSlotSet().covers(slot("2022-01-11", "2022-01-13"))).is_false()
+
+
+def test_gaps_in_delivery_day() -> None:
+    day = TimeSlot.at(2024, 3, 31)
+    hours = day.split(3600)
+    offered = TimeSlotSet(hours[:5] + hours[8:20])
+
+    gaps = offered.gaps(day)
+
+    assert_that(gaps.to_time_slots()).is_equal_to([
+        TimeSlot(hours[5].from_date, hours[7].to_date),
+        TimeSlot(hours[20].from_date, hours[22].to_date),
+    ])
+
+
+def test_operations_match_brute_force() -> None:
+    rnd = random.Random(11)
+
+    def random_set() -> TimeSlotSet:
+        slots = []
+        for _ in range(30):
+            start = rnd.randrange(0, 500)
+            slots.append(EpochTimeSlot(start, start + rnd.randrange(0, 40)))
+        return TimeSlotSet(slots)
+
+    for _ in range(20):
+        first, second = random_set(), random_set()
+
+        assert_that(covered_seconds(first | second)).is_equal_to(covered_seconds(first) | covered_seconds(second))
+        assert_that(covered_seconds(first & second)).is_equal_to(covered_seconds(first) & covered_seconds(second))
+        assert_that(covered_seconds(first - second)).is_equal_to(covered_seconds(first) - covered_seconds(second))
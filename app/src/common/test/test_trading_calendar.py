@@ -0,0 +1,63 @@
+from datetime import date, datetime
+
+import pytest
+from assertpy import assert_that
+
+from common.time_slot import TimeSlot
+from common.trading_calendar import TradingCalendar, trading_day
+
+
+@pytest.mark.parametrize("day, expected_count", [
+    (date(2024, 3, 31), 23),
+    (date(2024, 10, 27), 25),
+    (date(2024, 10, 11), 24),
+])
+def test_slot_count_follows_dst(day, expected_count) -> None:
+    result = trading_day(day, 3600, tz="CET")
+
+    assert_that(result.slot_count).is_equal_to(expected_count)
+    assert_that(result.time_slot).is_equal_to(TimeSlot.at(day, tz="CET"))
+
+
+def test_slot_starts_match_split() -> None:
+    day = date(2024, 10, 27)
+
+    result = trading_day(day, 3600, tz="CET")
+
+    expected = [s.from_date.int_timestamp for s in TimeSlot.at(day, tz="CET").split(3600)]
+    assert_that(list(result.slot_starts())).is_equal_to(expected)
+
+
+def test_not_divisible_slot_length_raises_error() -> None:
+    with pytest.raises(ValueError, match="Slot duration not divisible by split duration"):
+        TradingCalendar().get(date(2024, 1, 15), 1900)
+
+
+def test_accepts_datetime() -> None:
+    calendar = TradingCalendar()
+
+    assert_that(calendar.get(datetime(2024, 1, 15, 12), 3600)).is_same_as(calendar.get(date(2024, 1, 15), 3600))
+
+
+def test_preload_pins_days_and_skips_not_divisible_slot_lengths() -> None:
+    calendar = TradingCalendar(max_size=1)
+
+    pinned = calendar.preload(years=[2024], slot_lengths=[3600, 1900], tz_names=["CET"])
+    first = calendar.get(date(2024, 3, 31), 3600)
+    calendar.get(date(2030, 1, 1), 3600)
+    calendar.get(date(2030, 1, 2), 3600)
+
+    assert_that(pinned).is_equal_to(366)
+    assert_that(calendar.get(date(2024, 3, 31), 3600)).is_same_as(first)
+
+
+def test_lru_evicts_least_recently_used_day() -> None:
+    calendar = TradingCalendar(max_size=2)
+    first = calendar.get(date(2030, 1, 1), 3600)
+    second = calendar.get(date(2030, 1, 2), 3600)
+
+    calendar.get(date(2030, 1, 1), 3600)
+    calendar.get(date(2030, 1, 3), 3600)
+
+    assert_that(calendar.get(date(2030, 1, 1), 3600)).is_same_as(first)
+    assert_that(calendar.get(date(2030, 1, 2), 3600)).is_not_same_as(second)
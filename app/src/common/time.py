@@ -3,3 +3,11 @@ from datetime import timedelta
 
 def hours(count: int) -> timedelta:
     return timedelta(hours=count)
+
+
+def to_seconds(duration: timedelta | int) -> int:
+    if isinstance(duration, timedelta):
+        duration = int(duration.total_seconds())
+    if duration < 1:
+        raise ValueError("duration must be positive")
+    return duration
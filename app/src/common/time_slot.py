@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from functools import singledispatchmethod
@@ -83,6 +84,24 @@ class TimeSlot:
         return self.to_date - self.from_date
 
     def split(self, duration: timedelta | int) -> list[TimeSlot]:
+        return list(self.iter_split(duration))
+
+    def iter_split(self, duration: timedelta | int) -> Iterator[TimeSlot]:
+        step = self._split_step(duration)
+
+        def slots() -> Iterator[TimeSlot]:
+            current = self.from_date
+            while current < self.to_date:
+                next_time = current.shift(seconds=step)
+                yield TimeSlot(current, next_time)
+                current = next_time
+
+        return slots()
+
+    def slot_count(self, duration: timedelta | int) -> int:
+        return int(self.duration.total_seconds()) // self._split_step(duration)
+
+    def _split_step(self, duration: timedelta | int) -> int:
         if isinstance(duration, int):
             if duration < 1:
                 raise ValueError("duration must be positive")
@@ -91,13 +110,4 @@ class TimeSlot:
         total_duration = self.duration
         if total_duration.total_seconds() % duration.total_seconds() != 0:
             raise ValueError("Slot duration not divisible by split duration")
-
-        slots = []
-        current = self.from_date
-
-        while current < self.to_date:
-            next_time = current.shift(seconds=duration.total_seconds())
-            slots.append(TimeSlot(current, next_time))
-            current = next_time
-
-        return slots
\ No newline at end of file
+        return int(duration.total_seconds())
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from datetime import timedelta
+
+import numpy as np
+
+from common.epoch_time_slot import EpochTimeSlot
+from common.time import to_seconds
+from common.time_slot import TimeSlot
+
+
+class TimeSlotArray:
+    """Column-oriented collection of slots stored as int64 UTC epoch seconds.
+
+    Element-wise operations accept a single `TimeSlot`/`EpochTimeSlot` (broadcast to every row) or another
+    `TimeSlotArray` of the same length. `*_matrix` variants compare every row with every row of the other array.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, starts: Iterable[int] | np.ndarray, ends: Iterable[int] | np.ndarray) -> None:
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        if self.starts.ndim != 1 or self.starts.shape != self.ends.shape:
+            raise ValueError("starts and ends must be one-dimensional and of equal length")
+
+    @classmethod
+    def from_time_slots(cls, slots: Iterable[TimeSlot]) -> TimeSlotArray:
+        return cls.from_epoch_slots(EpochTimeSlot.from_time_slot(slot) for slot in slots)
+
+    @classmethod
+    def from_epoch_slots(cls, slots: Iterable[EpochTimeSlot]) -> TimeSlotArray:
+        bounds = [(slot.from_ts, slot.to_ts) for slot in slots]
+        if not bounds:
+            return cls.empty()
+        starts, ends = zip(*bounds)
+        return cls(starts, ends)
+
+    @classmethod
+    def empty(cls) -> TimeSlotArray:
+        return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+
+    def to_epoch_slots(self) -> list[EpochTimeSlot]:
+        return [EpochTimeSlot(start, end) for start, end in zip(self.starts.tolist(), self.ends.tolist())]
+
+    def to_time_slots(self) -> list[TimeSlot]:
+        return [slot.to_time_slot() for slot in self.to_epoch_slots()]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[EpochTimeSlot]:
+        return iter(self.to_epoch_slots())
+
+    def __getitem__(self, item: int | slice | np.ndarray) -> EpochTimeSlot | TimeSlotArray:
+        if isinstance(item, (int, np.integer)):
+            return EpochTimeSlot(int(self.starts[item]), int(self.ends[item]))
+        return TimeSlotArray(self.starts[item], self.ends[item])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TimeSlotArray):
+            return NotImplemented
+        return np.array_equal(self.starts, other.starts) and np.array_equal(self.ends, other.ends)
+
+    def __repr__(self) -> str:
+        return f"TimeSlotArray(len={len(self)})"
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self.ends - self.starts
+
+    def is_empty(self) -> np.ndarray:
+        return self.starts == self.ends
+
+    def within(self, other: TimeSlot | EpochTimeSlot | TimeSlotArray) -> np.ndarray:
+        other_starts, other_ends = _bounds(other)
+        return (self.starts >= other_starts) & (self.ends <= other_ends)
+
+    def overlaps(self, other: TimeSlot | EpochTimeSlot | TimeSlotArray) -> np.ndarray:
+        other_starts, other_ends = _bounds(other)
+        return (self.starts <= other_ends) & (self.ends >= other_starts)
+
+    def within_matrix(self, other: TimeSlotArray) -> np.ndarray:
+        return (self.starts[:, None] >= other.starts[None, :]) & (self.ends[:, None] <= other.ends[None, :])
+
+    def overlaps_matrix(self, other: TimeSlotArray) -> np.ndarray:
+        return (self.starts[:, None] <= other.ends[None, :]) & (self.ends[:, None] >= other.starts[None, :])
+
+    def common_part_with(self, other: TimeSlot | EpochTimeSlot | TimeSlotArray) -> TimeSlotArray:
+        other_starts, other_ends = _bounds(other)
+        overlapping = self.overlaps(other)
+        starts = np.where(overlapping, np.maximum(self.starts, other_starts), self.starts)
+        ends = np.where(overlapping, np.minimum(self.ends, other_ends), self.starts)
+        return TimeSlotArray(starts, ends)
+
+    def split(self, duration: timedelta | int) -> TimeSlotArray:
+        """Splits every slot into `duration` long pieces, pieces of one slot are consecutive and in slot order."""
+        step = to_seconds(duration)
+        durations = self.durations
+        if np.any(durations % step != 0):
+            raise ValueError("Slot duration not divisible by split duration")
+        counts = durations // step
+        first_piece = np.cumsum(counts) - counts
+        piece_index = np.arange(counts.sum(), dtype=np.int64) - np.repeat(first_piece, counts)
+        starts = np.repeat(self.starts, counts) + piece_index * step
+        return TimeSlotArray(starts, starts + step)
+
+    def split_owners(self, duration: timedelta | int) -> np.ndarray:
+        """Row index of the source slot for every piece returned by `split` with the same duration."""
+        step = to_seconds(duration)
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.durations // step)
+
+
+def _bounds(other: TimeSlot | EpochTimeSlot | TimeSlotArray) -> tuple[np.ndarray | int, np.ndarray | int]:
+    if isinstance(other, TimeSlotArray):
+        return other.starts, other.ends
+    other = EpochTimeSlot.of(other)
+    return other.from_ts, other.to_ts
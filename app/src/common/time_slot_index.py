@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import random
+from collections import deque
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import Generic, TypeVar
+
+from arrow import Arrow
+
+from common.epoch_time_slot import EpochTimeSlot
+from common.time_slot import TimeSlot
+
+T = TypeVar("T")
+
+
+class _Node(Generic[T]):
+    __slots__ = ("key", "end", "value", "priority", "max_end", "left", "right")
+
+    def __init__(self, key: tuple[int, int, int], value: T, priority: float) -> None:
+        self.key = key
+        self.end = key[1]
+        self.value = value
+        self.priority = priority
+        self.max_end = key[1]
+        self.left: _Node[T] | None = None
+        self.right: _Node[T] | None = None
+
+
+class TimeSlotIndex(Generic[T]):
+    """Interval tree (treap ordered by slot start, augmented with max end) mapping slots to values.
+
+    Queries use the same closed-interval semantics as `TimeSlot.overlaps`, so slots touching the queried
+    slot or instant are reported as well.
+    """
+
+    def __init__(self, seed: int | None = None) -> None:
+        self._root: _Node[T] | None = None
+        self._size = 0
+        self._sequence = 0
+        self._random = random.Random(seed)
+
+    @classmethod
+    def bulk(cls, items: Iterable[tuple[TimeSlot | EpochTimeSlot, T]], seed: int | None = None) -> TimeSlotIndex[T]:
+        index = cls(seed)
+        nodes = []
+        for slot, value in items:
+            start, end = _bounds(slot)
+            nodes.append(_Node((start, end, index._next_sequence()), value, 0.0))
+        nodes.sort(key=lambda n: n.key)
+        index._root = _build_balanced(nodes, 0, len(nodes))
+        index._size = len(nodes)
+
+        # a balanced tree gets heap ordered priorities by assigning them level by level
+        priorities = sorted((index._random.random() for _ in nodes), reverse=True)
+        queue = deque([index._root] if index._root else [])
+        for priority in priorities:
+            node = queue.popleft()
+            node.priority = priority
+            queue.extend(child for child in (node.left, node.right) if child is not None)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[tuple[EpochTimeSlot, T]]:
+        stack: list[_Node[T]] = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield EpochTimeSlot(node.key[0], node.end), node.value
+            node = node.right
+
+    def insert(self, slot: TimeSlot | EpochTimeSlot, value: T) -> None:
+        start, end = _bounds(slot)
+        node = _Node((start, end, self._next_sequence()), value, self._random.random())
+        self._root = _insert(self._root, node)
+        self._size += 1
+
+    def remove(self, slot: TimeSlot | EpochTimeSlot, value: T) -> None:
+        start, end = _bounds(slot)
+        key = _find_key(self._root, (start, end), value)
+        if key is None:
+            raise KeyError(f"{slot!r} -> {value!r} not in index")
+        self._root = _delete(self._root, key)
+        self._size -= 1
+
+    def overlapping(self, slot: TimeSlot | EpochTimeSlot) -> list[T]:
+        start, end = _bounds(slot)
+        result: list[T] = []
+        _collect(self._root, start, end, result)
+        return result
+
+    def at(self, instant: Arrow | datetime | int) -> list[T]:
+        if not isinstance(instant, int):
+            instant = int(instant.timestamp())
+        result: list[T] = []
+        _collect(self._root, instant, instant, result)
+        return result
+
+    def _next_sequence(self) -> int:
+        self._sequence += 1
+        return self._sequence
+
+
+def _bounds(slot: TimeSlot | EpochTimeSlot) -> tuple[int, int]:
+    slot = EpochTimeSlot.of(slot)
+    return slot.from_ts, slot.to_ts
+
+
+def _update(node: _Node) -> None:
+    max_end = node.end
+    if node.left is not None and node.left.max_end > max_end:
+        max_end = node.left.max_end
+    if node.right is not None and node.right.max_end > max_end:
+        max_end = node.right.max_end
+    node.max_end = max_end
+
+
+def _rotate_right(node: _Node) -> _Node:
+    pivot = node.left
+    node.left = pivot.right
+    pivot.right = node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+
+def _rotate_left(node: _Node) -> _Node:
+    pivot = node.right
+    node.right = pivot.left
+    pivot.left = node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+
+def _insert(node: _Node | None, new: _Node) -> _Node:
+    if node is None:
+        return new
+    if new.key < node.key:
+        node.left = _insert(node.left, new)
+        if node.left.priority > node.priority:
+            return _rotate_right(node)
+    else:
+        node.right = _insert(node.right, new)
+        if node.right.priority > node.priority:
+            return _rotate_left(node)
+    _update(node)
+    return node
+
+
+def _merge(left: _Node | None, right: _Node | None) -> _Node | None:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+def _delete(node: _Node | None, key: tuple[int, int, int]) -> _Node | None:
+    if key < node.key:
+        node.left = _delete(node.left, key)
+    elif key > node.key:
+        node.right = _delete(node.right, key)
+    else:
+        return _merge(node.left, node.right)
+    _update(node)
+    return node
+
+
+def _find_key(node: _Node | None, bounds: tuple[int, int], value) -> tuple[int, int, int] | None:
+    while node is not None:
+        node_bounds = node.key[:2]
+        if node_bounds < bounds:
+            node = node.right
+        elif node_bounds > bounds:
+            node = node.left
+        else:
+            if node.value == value:
+                return node.key
+            return _find_key(node.left, bounds, value) or _find_key(node.right, bounds, value)
+    return None
+
+
+def _collect(node: _Node | None, start: int, end: int, result: list) -> None:
+    while node is not None and node.max_end >= start:
+        _collect(node.left, start, end, result)
+        if node.key[0] > end:
+            return
+        if node.end >= start:
+            result.append(node.value)
+        node = node.right
+
+
+def _build_balanced(nodes: list[_Node], lo: int, hi: int) -> _Node | None:
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    node = nodes[mid]
+    node.left = _build_balanced(nodes, lo, mid)
+    node.right = _build_balanced(nodes, mid + 1, hi)
+    _update(node)
+    return node
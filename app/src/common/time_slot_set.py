@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from datetime import timedelta
+
+from common.epoch_time_slot import EpochTimeSlot
+from common.time_slot import TimeSlot
+
+
+class TimeSlotSet:
+    """Sorted list of disjoint, non-empty slots describing covered time.
+
+    Slots touching each other are merged and empty slots are dropped, so the set models the covered part
+    of the time line rather than the individual slots it was built from.
+    """
+
+    __slots__ = ("_bounds",)
+
+    def __init__(self, slots: Iterable[TimeSlot | EpochTimeSlot] = ()) -> None:
+        bounds = sorted(_bounds(slot) for slot in slots)
+        self._bounds = _merge_sorted(bounds)
+
+    @classmethod
+    def _from_normalized(cls, bounds: list[tuple[int, int]]) -> TimeSlotSet:
+        result = cls.__new__(cls)
+        result._bounds = bounds
+        return result
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    def __bool__(self) -> bool:
+        return bool(self._bounds)
+
+    def __iter__(self) -> Iterator[EpochTimeSlot]:
+        return (EpochTimeSlot(start, end) for start, end in self._bounds)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TimeSlotSet):
+            return NotImplemented
+        return self._bounds == other._bounds
+
+    def __repr__(self) -> str:
+        return f"TimeSlotSet({self._bounds!r})"
+
+    def to_time_slots(self) -> list[TimeSlot]:
+        return [slot.to_time_slot() for slot in self]
+
+    @property
+    def duration(self) -> timedelta:
+        return timedelta(seconds=sum(end - start for start, end in self._bounds))
+
+    def union(self, other: TimeSlotSet) -> TimeSlotSet:
+        merged: list[tuple[int, int]] = []
+        i = j = 0
+        left, right = self._bounds, other._bounds
+        while i < len(left) or j < len(right):
+            if j == len(right) or (i < len(left) and left[i] < right[j]):
+                merged.append(left[i])
+                i += 1
+            else:
+                merged.append(right[j])
+                j += 1
+        return TimeSlotSet._from_normalized(_merge_sorted(merged))
+
+    def intersection(self, other: TimeSlotSet) -> TimeSlotSet:
+        result: list[tuple[int, int]] = []
+        i = j = 0
+        left, right = self._bounds, other._bounds
+        while i < len(left) and j < len(right):
+            start = max(left[i][0], right[j][0])
+            end = min(left[i][1], right[j][1])
+            if start < end:
+                result.append((start, end))
+            if left[i][1] < right[j][1]:
+                i += 1
+            else:
+                j += 1
+        return TimeSlotSet._from_normalized(result)
+
+    def difference(self, other: TimeSlotSet) -> TimeSlotSet:
+        result: list[tuple[int, int]] = []
+        j = 0
+        right = other._bounds
+        for start, end in self._bounds:
+            while j < len(right) and right[j][1] <= start:
+                j += 1
+            k = j
+            while k < len(right) and right[k][0] < end:
+                if right[k][0] > start:
+                    result.append((start, right[k][0]))
+                start = max(start, right[k][1])
+                k += 1
+            if start < end:
+                result.append((start, end))
+        return TimeSlotSet._from_normalized(result)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def covers(self, slot: TimeSlot | EpochTimeSlot) -> bool:
+        start, end = _bounds(slot)
+        i = bisect_right(self._bounds, (start, float("inf"))) - 1
+        return i >= 0 and self._bounds[i][0] <= start and end <= self._bounds[i][1]
+
+    def gaps(self, within: TimeSlot | EpochTimeSlot) -> TimeSlotSet:
+        return TimeSlotSet([within]).difference(self)
+
+
+def _bounds(slot: TimeSlot | EpochTimeSlot) -> tuple[int, int]:
+    slot = EpochTimeSlot.of(slot)
+    return slot.from_ts, slot.to_ts
+
+
+def _merge_sorted(bounds: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in bounds:
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from common.const import trading_timezone_name
+from common.epoch_time_slot import EpochTimeSlot
+from common.time_slot import TimeSlot
+
+
+@dataclass(frozen=True)
+class TradingDay:
+    day: date
+    tz_name: str
+    slot_length: int
+    from_ts: int
+    to_ts: int
+    slot_offsets: range
+
+    @property
+    def slot_count(self) -> int:
+        return len(self.slot_offsets)
+
+    @property
+    def epoch_slot(self) -> EpochTimeSlot:
+        return EpochTimeSlot(self.from_ts, self.to_ts)
+
+    @property
+    def time_slot(self) -> TimeSlot:
+        return self.epoch_slot.to_time_slot()
+
+    def slot_starts(self) -> range:
+        return range(self.from_ts, self.to_ts, self.slot_length)
+
+
+class TradingCalendar:
+    """Cache of `TradingDay` entries keyed by (date, timezone name, slot length).
+
+    Days preloaded with `preload` stay pinned for the life of the process, other days are kept in an LRU
+    of `max_size` entries.
+    """
+
+    def __init__(self, max_size: int = 4096) -> None:
+        self.max_size = max_size
+        self._preloaded: dict[tuple[date, str, int], TradingDay] = {}
+        self._lru: OrderedDict[tuple[date, str, int], TradingDay] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, day: date, slot_length: int, tz: str = trading_timezone_name) -> TradingDay:
+        key = (_as_date(day), str(tz), int(slot_length))
+        trading_day = self._preloaded.get(key)
+        if trading_day is not None:
+            return trading_day
+
+        with self._lock:
+            trading_day = self._lru.get(key)
+            if trading_day is not None:
+                self._lru.move_to_end(key)
+                return trading_day
+
+        trading_day = _build_trading_day(*key)
+        with self._lock:
+            self._lru[key] = trading_day
+            if len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+        return trading_day
+
+    def preload(self, years: Iterable[int], slot_lengths: Iterable[int], tz_names: Iterable[str]) -> int:
+        """Pins every day of `years` for each slot length that divides the days evenly. Returns pinned count."""
+        preloaded: dict[tuple[date, str, int], TradingDay] = {}
+        slot_lengths, tz_names = list(slot_lengths), list(tz_names)
+        for year in years:
+            day = date(year, 1, 1)
+            while day.year == year:
+                for tz_name in tz_names:
+                    for slot_length in slot_lengths:
+                        try:
+                            preloaded[(day, tz_name, slot_length)] = _build_trading_day(day, tz_name, slot_length)
+                        except ValueError:
+                            continue
+                day += timedelta(days=1)
+        self._preloaded = {**self._preloaded, **preloaded}
+        return len(preloaded)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._preloaded = {}
+            self._lru.clear()
+
+
+def _as_date(day: date) -> date:
+    return day.date() if isinstance(day, datetime) else day
+
+
+def _build_trading_day(day: date, tz_name: str, slot_length: int) -> TradingDay:
+    day_slot = TimeSlot.at(day, tz=tz_name)
+    slot_count = day_slot.slot_count(slot_length)
+    epoch_slot = EpochTimeSlot.from_time_slot(day_slot)
+    return TradingDay(
+        day=day,
+        tz_name=tz_name,
+        slot_length=slot_length,
+        from_ts=epoch_slot.from_ts,
+        to_ts=epoch_slot.to_ts,
+        slot_offsets=range(0, slot_count * slot_length, slot_length),
+    )
+
+
+trading_calendar = TradingCalendar()
+
+
+def trading_day(day: date, slot_length: int, tz: str = trading_timezone_name) -> TradingDay:
+    return trading_calendar.get(day, slot_length, tz)
@@ -66,7 +66,8 @@ INSTALLED_APPS = [
 
 USER_APPS = [
     "rules",
-    "offering"
+    "offering",
+    "simulation",
 ]
 
 INSTALLED_APPS += USER_APPS
@@ -231,6 +232,32 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_WORKER_PREFETCH_MULTIPLIER = env.int("CELERY_WORKER_PREFETCH_MULTIPLIER", default=10)
 CELERY_BROKER_POOL_LIMIT = env.int("CELERY_BROKER_POOL_LIMIT", default=50)
+# gate close tasks are one-off clocked tasks, beat checks for due tasks at least this often (seconds)
+CELERY_BEAT_MAX_LOOP_INTERVAL = env.int("CELERY_BEAT_MAX_LOOP_INTERVAL", default=5)
+CELERY_BEAT_SCHEDULE = {
+    # extends the sale schedules to the coming days, SaleDefinition changes are applied right away
+    "refresh-sale-schedules": {
+        "task": "simulation.tasks.refresh_sale_schedules",
+        "schedule": timedelta(hours=1),
+    },
+}
+
+TRADING_CALENDAR_YEARS_BACK = env.int("TRADING_CALENDAR_YEARS_BACK", default=1)
+TRADING_CALENDAR_YEARS_AHEAD = env.int("TRADING_CALENDAR_YEARS_AHEAD", default=2)
+TRADING_CALENDAR_CACHE_SIZE = env.int("TRADING_CALENDAR_CACHE_SIZE", default=4096)
+
+# offering values are always stored packed, the JSON copy can be dropped once all readers use the packed column
+OFFERING_STORE_JSON_VALUES = env.bool("OFFERING_STORE_JSON_VALUES", default=True)
+# position-days stored per transaction by asynchronous uploads
+OFFERING_UPLOAD_CHUNK_SIZE = env.int("OFFERING_UPLOAD_CHUNK_SIZE", default=1000)
+# how long responses of uploads sent with an Idempotency-Key header are replayed
+OFFERING_IDEMPOTENCY_KEY_TTL = timedelta(hours=env.int("OFFERING_IDEMPOTENCY_KEY_TTL_HOURS", default=24))
+# days of sales whose gate close and result tasks are registered in advance
+SALE_SCHEDULE_DAYS_AHEAD = env.int("SALE_SCHEDULE_DAYS_AHEAD", default=7)
+# days the one-off sale tasks beat already sent and disabled are kept before they are deleted
+SALE_SCHEDULE_RETENTION_DAYS = env.int("SALE_SCHEDULE_RETENTION_DAYS", default=7)
+# processes clearing the markets of a sale when celery tasks run eagerly, workers run one task per market otherwise
+SIMULATION_WORKERS = env.int("SIMULATION_WORKERS", default=os.cpu_count() or 1)
 
 LOGGING = {
     "version": 1,
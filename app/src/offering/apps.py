@@ -1,6 +1,22 @@
+import arrow
 from django.apps import AppConfig
+from django.conf import settings
+
+from common import const
+from common.slot_length import SlotLength
+from common.trading_calendar import trading_calendar
 
 
 class OfferingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'offering'
+
+    def ready(self):
+        current_year = arrow.now(const.trading_timezone_name).year
+        trading_calendar.max_size = settings.TRADING_CALENDAR_CACHE_SIZE
+        trading_calendar.preload(
+            years=range(current_year - settings.TRADING_CALENDAR_YEARS_BACK,
+                        current_year + settings.TRADING_CALENDAR_YEARS_AHEAD + 1),
+            slot_lengths=[s.value for s in SlotLength],
+            tz_names=[const.trading_timezone_name],
+        )
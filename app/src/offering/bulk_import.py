@@ -0,0 +1,236 @@
+import csv
+import io
+import json
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+import django
+from django.db import connection, transaction
+from more_itertools import chunked
+
+from common.db import copy_rows
+from common.json_stream import iter_ndjson
+from offering.ingestion import (
+    OfferingDay,
+    advance_current_entries,
+    replace_offering_slots,
+    resolve_offerings,
+    skip_unchanged,
+    split_into_days,
+    store_offering_days,
+)
+from offering.models import DailyOffering, DailyOfferingEntry
+from offering.rollups import refresh_rollups
+from offering.validation import OfferingPayloadValidator
+
+RECORD_FIELDS = ("reference", "startTime", "slotLength", "values")
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet", ".pq": "parquet"}
+
+
+def detect_format(path: Path) -> str:
+    try:
+        return FORMATS[path.suffix.lower()]
+    except KeyError:
+        raise ValueError(f"Cannot detect format of '{path.name}', use one of: {', '.join(sorted(set(FORMATS.values())))}")
+
+
+def read_records(path: Path, file_format: str) -> Iterator[dict]:
+    """Yields upload items of a file one by one, without loading the whole file."""
+    if file_format == "csv":
+        return _read_csv(path)
+    if file_format == "ndjson":
+        return _read_ndjson(path)
+    if file_format == "parquet":
+        return _read_parquet(path)
+    raise ValueError(f"Unknown format '{file_format}'")
+
+
+def _read_csv(path: Path) -> Iterator[dict]:
+    # values are either a JSON array or separated with ';'
+    with path.open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            values = (row.get("values") or "").strip()
+            if values.startswith("["):
+                try:
+                    row["values"] = json.loads(values)
+                except json.JSONDecodeError:
+                    # left as text, the row is rejected by validation like any other invalid row
+                    row["values"] = values
+            else:
+                row["values"] = values.split(";") if values else []
+            yield row
+
+
+def _read_ndjson(path: Path) -> Iterator[dict]:
+    with path.open("rb") as f:
+        yield from iter_ndjson(f)
+
+
+def _read_parquet(path: Path) -> Iterator[dict]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet import requires the 'pyarrow' package")
+    for batch in pq.ParquetFile(path).iter_batches(columns=list(RECORD_FIELDS)):
+        yield from batch.to_pylist()
+
+
+@dataclass
+class ParsedBatch:
+    first_row: int
+    rows: int
+    days: list[OfferingDay] = field(default_factory=list)
+    errors: list[dict] = field(default_factory=list)
+
+
+def parse_records(first_row: int, records: Sequence[dict]) -> ParsedBatch:
+    """Validates and splits records into position-days with the same rules as the upload endpoints."""
+    batch = ParsedBatch(first_row, len(records))
+    for row, record in enumerate(records, start=first_row):
+        validator = OfferingPayloadValidator(data=record)
+        if not validator.is_valid():
+            batch.errors.append({"row": row, "error": "serialisation error", "error_details": validator.errors})
+            continue
+        item = validator.validated_data
+        try:
+            batch.days += split_into_days(
+                item["reference"], item["startTime"], item["slotLength"], item["values"], item["micro_values"]
+            )
+        except ValueError as e:
+            batch.errors.append({"row": row, "error": str(e)})
+    return batch
+
+
+def iter_parsed_batches(records: Iterable[dict], batch_size: int, workers: int = 1,
+                        first_row: int = 0) -> Iterator[ParsedBatch]:
+    """Parses `records` in batches, in `workers` processes if more than one, yielding batches in input order."""
+    batches = ((first_row + i * batch_size, chunk) for i, chunk in enumerate(chunked(records, batch_size)))
+    if workers <= 1:
+        for start, chunk in batches:
+            yield parse_records(start, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+        # bounded number of batches in flight keeps memory flat for arbitrarily large files
+        in_flight = deque()
+        for start, chunk in batches:
+            in_flight.append(executor.submit(parse_records, start, chunk))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def write_offering_days(days: Sequence[OfferingDay]) -> None:
+    """Stores one entry per day with COPY on Postgres and executemany on SQLite, must run inside a transaction."""
+    if connection.vendor not in ("postgresql", "sqlite"):
+        store_offering_days(days)
+        return
+    if not days:
+        return
+    offering_ids = resolve_offerings({(day.position_name, day.date) for day in days})
+    days = skip_unchanged(days, offering_ids)
+    if not days:
+        return
+    if connection.vendor == "postgresql":
+        _copy_offering_days(days, offering_ids)
+    else:
+        _insert_offering_days(days, offering_ids)
+    refresh_rollups((day.position_name, day.date) for day in days)
+
+
+_ENTRY_FIELDS = ("slot_length", "values", "packed_values", "content_hash", "created_at")
+
+
+def _entry_rows(days: Sequence[OfferingDay], ids: Sequence[int]) -> tuple[list[str], list[tuple]]:
+    columns = ["id", *(DailyOfferingEntry._meta.get_field(name).column for name in _ENTRY_FIELDS)]
+    created_at = DailyOfferingEntry._meta.get_field("created_at").get_default()
+    rows = []
+    for pk, day in zip(ids, days):
+        entry = DailyOfferingEntry.build(day.slot_length, day.values, day.micro_values, day.content_hash)
+        values = None if entry.values is None else json.dumps(entry.values)
+        rows.append((pk, entry.slot_length, values, entry.packed_values, entry.content_hash, created_at))
+    return columns, rows
+
+
+def _through_rows(days: Sequence[OfferingDay], ids: Sequence[int],
+                  offering_ids: dict[tuple[str, date], int]) -> tuple[list[str], list[tuple]]:
+    through = DailyOffering.entries.through
+    columns = [through._meta.get_field(name).column for name in ("dailyoffering", "dailyofferingentry")]
+    return columns, [(offering_ids[(day.position_name, day.date)], pk) for day, pk in zip(days, ids)]
+
+
+def _insert_offering_days(days: Sequence[OfferingDay], offering_ids: dict[tuple[str, date], int]) -> None:
+    entry_table = connection.ops.quote_name(DailyOfferingEntry._meta.db_table)
+    through_table = connection.ops.quote_name(DailyOffering.entries.through._meta.db_table)
+    created_at_field = DailyOfferingEntry._meta.get_field("created_at")
+    with connection.cursor() as cursor:
+        # SQLite transactions hold the database lock, so ids following the current maximum cannot be taken
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {entry_table}")
+        first_id = cursor.fetchone()[0] + 1
+        ids = range(first_id, first_id + len(days))
+
+        columns, rows = _entry_rows(days, ids)
+        rows = [(*row[:-1], created_at_field.get_db_prep_save(row[-1], connection)) for row in rows]
+        cursor.executemany(_insert_sql(entry_table, columns), rows)
+
+        columns, rows = _through_rows(days, ids, offering_ids)
+        cursor.executemany(_insert_sql(through_table, columns), rows)
+    advance_current_entries(days, ids, offering_ids)
+    replace_offering_slots(days, ids, offering_ids)
+
+
+def _insert_sql(table: str, columns: Sequence[str]) -> str:
+    quoted = ", ".join(connection.ops.quote_name(c) for c in columns)
+    return f"INSERT INTO {table} ({quoted}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+
+def _copy_offering_days(days: Sequence[OfferingDay], offering_ids: dict[tuple[str, date], int]) -> None:
+    entry_table = connection.ops.quote_name(DailyOfferingEntry._meta.db_table)
+    through_table = connection.ops.quote_name(DailyOffering.entries.through._meta.db_table)
+    with connection.cursor() as cursor:
+        # COPY does not return generated keys, entry ids are taken from the sequence upfront
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [DailyOfferingEntry._meta.db_table, len(days)],
+        )
+        ids = [pk for pk, in cursor.fetchall()]
+        copy_rows(cursor, entry_table, *_entry_rows(days, ids))
+        copy_rows(cursor, through_table, *_through_rows(days, ids, offering_ids))
+    advance_current_entries(days, ids, offering_ids)
+    replace_offering_slots(days, ids, offering_ids)
+
+
+class Checkpoint:
+    """Number of committed rows of an import, stored next to the imported file."""
+
+    def __init__(self, path: Path, source: Path) -> None:
+        self.path = path
+        self.source = source
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> int:
+        state = json.loads(self.path.read_text())
+        if state["source"] != str(self.source.resolve()) or state["size"] != self.source.stat().st_size:
+            raise ValueError(f"Checkpoint {self.path} belongs to a different file")
+        return state["rows"]
+
+    def save(self, rows: int) -> None:
+        state = {"source": str(self.source.resolve()), "size": self.source.stat().st_size, "rows": rows}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self.path)
+
+
+def import_batch(batch: ParsedBatch, checkpoint: Checkpoint | None = None) -> None:
+    with transaction.atomic():
+        write_offering_days(batch.days)
+    if checkpoint is not None:
+        checkpoint.save(batch.first_row + batch.rows)
@@ -0,0 +1,124 @@
+import csv
+import io
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+
+import numpy as np
+
+from common import const
+from common.trading_calendar import trading_day
+from offering import values as fixed_point
+from offering.models import DailyOffering, DailyOfferingQuerySet
+
+EXPORT_COLUMNS = ("position_name", "slot_start", "slot_length", "value")
+EXPORT_FORMATS = {"csv": "text/csv", "arrow": "application/vnd.apache.arrow.stream"}
+CHUNK_SIZE = 2000
+
+ExportedDay = tuple[str, range, int, np.ndarray]
+
+
+def export_offerings(offerings: DailyOfferingQuerySet) -> DailyOfferingQuerySet:
+    """Current entries of `offerings` in export order, without the JSON copy of their values."""
+    # entries without packed values failed numeric validation and can not be exported
+    return (
+        offerings.filter(current_entry__packed_values__isnull=False)
+        .select_related("current_entry")
+        .only("position_name", "date", "current_entry__slot_length", "current_entry__packed_values")
+        .order_by("date", "position_name")
+    )
+
+
+def iter_days(offerings: DailyOfferingQuerySet, chunk_size: int = CHUNK_SIZE) -> Iterator[ExportedDay]:
+    """Yields (position name, UTC slot starts, slot length, micro values) per position-day.
+
+    Rows are read with a server-side cursor, so memory does not grow with the exported range.
+    """
+    offering: DailyOffering
+    for offering in offerings.iterator(chunk_size=chunk_size):
+        entry = offering.current_entry
+        starts = trading_day(offering.date, entry.slot_length, tz=const.trading_timezone_name).slot_starts()
+        yield offering.position_name, starts, entry.slot_length, entry.micro_values()
+
+
+def iter_csv(days: Iterable[ExportedDay]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    for position_name, starts, slot_length, micro_values in days:
+        writer.writerows(
+            (position_name, _utc_iso(start), slot_length, fixed_point.from_micro(value))
+            for start, value in zip(starts, micro_values.tolist())
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_arrow(days: Iterable[ExportedDay], batch_rows: int = 50_000) -> Iterator[bytes]:
+    """Arrow IPC stream of record batches of about `batch_rows` slots, values are float64 MW."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError("Arrow export requires the 'pyarrow' package")
+
+    schema = pa.schema([
+        ("position_name", pa.string()),
+        ("slot_start", pa.timestamp("s", tz="UTC")),
+        ("slot_length", pa.int32()),
+        ("value", pa.float64()),
+    ])
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    yield sink.drain()
+
+    columns: tuple[list, list, list, list] = ([], [], [], [])
+    rows = 0
+    for position_name, starts, slot_length, micro_values in days:
+        columns[0].append(np.full(len(starts), position_name, dtype=object))
+        columns[1].append(np.asarray(starts, dtype=np.int64))
+        columns[2].append(np.full(len(starts), slot_length, dtype=np.int32))
+        columns[3].append(micro_values / fixed_point.SCALE)
+        rows += len(starts)
+        if rows >= batch_rows:
+            writer.write_batch(_record_batch(pa, schema, columns))
+            columns, rows = ([], [], [], []), 0
+            yield sink.drain()
+    if rows:
+        writer.write_batch(_record_batch(pa, schema, columns))
+    writer.close()
+    yield sink.drain()
+
+
+def _record_batch(pa, schema, columns):
+    return pa.record_batch([pa.array(np.concatenate(c), type=f.type) for c, f in zip(columns, schema)], schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream handing out what was written since the last `drain`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._written += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._written
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _utc_iso(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z")
@@ -0,0 +1,76 @@
+import functools
+import hashlib
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from offering.models import OfferingUploadRequest
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = OfferingUploadRequest._meta.get_field("idempotency_key").max_length
+
+
+def idempotent(view_method):
+    """Replays the stored response of a successful request sent again with the same `Idempotency-Key` header.
+
+    The lookup, the view and storing its response share one transaction, so a request is either applied together
+    with its key or not at all. A key reused with a different body is rejected.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            return view_method(self, request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"error": f"{IDEMPOTENCY_KEY_HEADER} must have 1 to {MAX_KEY_LENGTH} characters"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # reading the body first keeps it available to the parsers
+        request_hash = hashlib.sha256(request.body).hexdigest()
+        with transaction.atomic():
+            expired_before = timezone.now() - settings.OFFERING_IDEMPOTENCY_KEY_TTL
+            stored = OfferingUploadRequest.objects.filter(idempotency_key=key, created_at__gte=expired_before).first()
+            if stored is not None:
+                return _replay(stored, request_hash)
+
+            response = view_method(self, request, *args, **kwargs)
+            if not status.is_success(response.status_code):
+                return response
+            try:
+                with transaction.atomic():
+                    OfferingUploadRequest.objects.filter(created_at__lt=expired_before).delete()
+                    OfferingUploadRequest.objects.update_or_create(
+                        idempotency_key=key,
+                        defaults={
+                            "request_hash": request_hash,
+                            "status_code": response.status_code,
+                            "response": response.data,
+                            "created_at": timezone.now(),
+                        },
+                    )
+            except IntegrityError:
+                # a concurrent request with the same key committed first, its changes win
+                transaction.set_rollback(True)
+                return Response(
+                    {"error": f"A request with this {IDEMPOTENCY_KEY_HEADER} is already being processed"},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            return response
+
+    return wrapper
+
+
+def _replay(stored: OfferingUploadRequest, request_hash: str) -> Response:
+    if stored.request_hash != request_hash:
+        return Response(
+            {"error": f"{IDEMPOTENCY_KEY_HEADER} was already used with a different payload"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(stored.response, status=stored.status_code, headers={REPLAYED_HEADER: "true"})
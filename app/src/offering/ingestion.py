@@ -0,0 +1,235 @@
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from functools import cached_property
+
+import arrow
+import numpy as np
+import pytz
+from django.db import DEFAULT_DB_ALIAS, connections
+from more_itertools import chunked
+
+from common import const
+from common.db import insert_rows
+from common.slot_length import SlotLength
+from common.trading_calendar import trading_day
+from offering import values as fixed_point
+from offering.models import DailyOffering, DailyOfferingEntry, OfferingSlot
+from offering.rollups import refresh_rollups
+
+SLOT_BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True, eq=False)
+class OfferingDay:
+    position_name: str
+    date: date
+    slot_length: int
+    values: list[str]
+    micro_values: np.ndarray
+
+    @cached_property
+    def content_hash(self) -> str:
+        return fixed_point.content_hash(self.position_name, self.date, self.slot_length, self.micro_values)
+
+
+def split_into_days(position_name: str, start_time: datetime | str, slot_length: int,
+                    values: Sequence[str | Decimal], micro_values: np.ndarray | None = None) -> list[OfferingDay]:
+    current_date = arrow.get(start_time).to(pytz.timezone(const.trading_timezone_name)).date()
+    if micro_values is None:
+        micro_values = fixed_point.to_micro(values)
+    value_index = 0
+    days = []
+
+    while value_index < len(values):
+        hours_in_day = trading_day(current_date, slot_length, tz=const.trading_timezone_name).slot_count
+
+        if value_index + hours_in_day > len(values):
+            raise ValueError(f"Not enough values for day {current_date}")
+
+        day_slice = slice(value_index, value_index + hours_in_day)
+        day_values = [str(v) for v in values[day_slice]]
+        days.append(OfferingDay(position_name, current_date, slot_length, day_values, micro_values[day_slice]))
+
+        value_index += hours_in_day
+        current_date += timedelta(days=1)
+
+    return days
+
+
+def store_offering_days(days: Sequence[OfferingDay], batch_size: int | None = None) -> list[DailyOfferingEntry]:
+    """Stores one entry per day with a constant number of queries (per `batch_size` rows).
+
+    Days identical to the latest stored entry of their position-day are skipped, only new entries are returned.
+    """
+    if not days:
+        return []
+    offering_ids = resolve_offerings({(day.position_name, day.date) for day in days}, batch_size)
+    days = skip_unchanged(days, offering_ids)
+
+    entries = [
+        DailyOfferingEntry.build(day.slot_length, day.values, day.micro_values, day.content_hash) for day in days
+    ]
+    DailyOfferingEntry.objects.bulk_create(entries, batch_size=batch_size)
+
+    through = DailyOffering.entries.through
+    through.objects.bulk_create(
+        [
+            through(dailyoffering_id=offering_ids[(day.position_name, day.date)], dailyofferingentry_id=entry.pk)
+            for day, entry in zip(days, entries)
+        ],
+        batch_size=batch_size,
+    )
+    entry_ids = [entry.pk for entry in entries]
+    advance_current_entries(days, entry_ids, offering_ids, batch_size)
+    replace_offering_slots(days, entry_ids, offering_ids)
+    refresh_rollups((day.position_name, day.date) for day in days)
+    return entries
+
+
+def add_entry(offering: DailyOffering, slot_length: int, values: Sequence[str | Decimal]) -> DailyOfferingEntry:
+    """Stores one entry of `offering`, saved first when new, like `store_offering_days` but also when unchanged."""
+    if slot_length not in dict(SlotLength.choices()).keys():
+        raise ValueError(f"Slot length must be one of the following: {dict(SlotLength.choices()).keys()}")
+    expected_values_count = trading_day(offering.date, slot_length, tz=const.trading_timezone_name).slot_count
+    received_values_count = len(values)
+    if expected_values_count != received_values_count:
+        raise ValueError(f"Values count should be: {expected_values_count}, but are: {received_values_count}")
+
+    day = OfferingDay(
+        offering.position_name, offering.date, slot_length, [str(v) for v in values], fixed_point.to_micro(values)
+    )
+    if offering.pk is None:
+        offering.save()
+    entry = DailyOfferingEntry.build(day.slot_length, day.values, day.micro_values, day.content_hash)
+    entry.save()
+    offering.entries.add(entry)
+
+    offering_ids = {(day.position_name, day.date): offering.pk}
+    advance_current_entries([day], [entry.pk], offering_ids)
+    replace_offering_slots([day], [entry.pk], offering_ids)
+    refresh_rollups([(day.position_name, day.date)])
+    # the same move as the UPDATE, without reading the row back
+    if entry.pk > (offering.current_entry_id or 0):
+        offering.current_entry = entry
+    offering.version += 1
+    return entry
+
+
+def advance_current_entries(days: Sequence[OfferingDay], entry_ids: Sequence[int],
+                            offering_ids: dict[tuple[str, date], int], batch_size: int | None = None) -> None:
+    """Points every stored position-day at its newest entry and bumps its version by the number of new entries.
+
+    One `UPDATE ... FROM (VALUES ...)` per batch on Postgres and one executemany elsewhere, keyed by offering id and
+    in id order, so concurrent uploads lock the rows they share in the same order.
+    """
+    latest: dict[int, tuple[int, int]] = {}
+    for day, entry_id in zip(days, entry_ids):
+        offering_id = offering_ids[(day.position_name, day.date)]
+        _, count = latest.get(offering_id, (None, 0))
+        latest[offering_id] = (entry_id, count + 1)
+    rows = [(offering_id, entry_id, count) for offering_id, (entry_id, count) in sorted(latest.items())]
+
+    connection = connections[DEFAULT_DB_ALIAS]
+    table = connection.ops.quote_name(DailyOffering._meta.db_table)
+    with connection.cursor() as cursor:
+        for batch in chunked(rows, batch_size or SLOT_BATCH_SIZE):
+            # the current entry never moves back when a concurrent upload with a newer entry committed first
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    f"UPDATE {table} AS o "
+                    f"SET current_entry_id = GREATEST(COALESCE(o.current_entry_id, 0), v.entry_id), "
+                    f"version = o.version + v.count "
+                    f"FROM (VALUES {', '.join(['(%s, %s, %s)'] * len(batch))}) AS v (id, entry_id, count) "
+                    f"WHERE o.id = v.id",
+                    [value for row in batch for value in row],
+                )
+            else:
+                cursor.executemany(
+                    f"UPDATE {table} SET current_entry_id = MAX(COALESCE(current_entry_id, 0), %s), "
+                    f"version = version + %s WHERE id = %s",
+                    [(entry_id, count, offering_id) for offering_id, entry_id, count in batch],
+                )
+
+
+SLOT_COLUMNS = [
+    OfferingSlot._meta.get_field(name).column
+    for name in ("offering", "entry", "position_name", "slot_start", "slot_length", "value")
+]
+
+
+def offering_slot_rows(days: Sequence[OfferingDay], entry_ids: Sequence[int],
+                       offering_ids: dict[tuple[str, date], int]) -> Iterator[tuple]:
+    """Rows of `SLOT_COLUMNS` with values ready for the database, slot starts are prepared once per day."""
+    connection = connections[DEFAULT_DB_ALIAS]
+    starts: dict[tuple[date, int], list] = {}
+    # a later day of the same position-day replaces the earlier one, like the latest entry does
+    latest = {(day.position_name, day.date): (day, entry_id) for day, entry_id in zip(days, entry_ids)}
+    for key, (day, entry_id) in latest.items():
+        day_starts = starts.get((day.date, day.slot_length))
+        if day_starts is None:
+            day_starts = starts[(day.date, day.slot_length)] = [
+                connection.ops.adapt_datetimefield_value(datetime.fromtimestamp(start, timezone.utc))
+                for start in trading_day(day.date, day.slot_length, tz=const.trading_timezone_name).slot_starts()
+            ]
+        offering_id = offering_ids[key]
+        for start, value in zip(day_starts, day.micro_values.tolist()):
+            yield offering_id, entry_id, day.position_name, start, day.slot_length, value
+
+
+def replace_offering_slots(days: Sequence[OfferingDay], entry_ids: Sequence[int],
+                           offering_ids: dict[tuple[str, date], int]) -> None:
+    """Replaces the per slot rows of every stored position-day with the values of its new entry."""
+    if not days:
+        return
+    changed = sorted({offering_ids[(day.position_name, day.date)] for day in days})
+    for batch in chunked(changed, SLOT_BATCH_SIZE):
+        OfferingSlot.objects.filter(offering_id__in=batch).delete()
+    insert_rows(OfferingSlot, SLOT_COLUMNS, offering_slot_rows(days, entry_ids, offering_ids), SLOT_BATCH_SIZE)
+
+
+def skip_unchanged(days: Sequence[OfferingDay], offering_ids: dict[tuple[str, date], int]) -> list[OfferingDay]:
+    latest_hashes = _latest_content_hashes(offering_ids.values())
+    changed = []
+    for day in days:
+        offering_id = offering_ids[(day.position_name, day.date)]
+        if latest_hashes.get(offering_id) != day.content_hash:
+            latest_hashes[offering_id] = day.content_hash
+            changed.append(day)
+    return changed
+
+
+def _latest_content_hashes(offering_ids: Iterable[int]) -> dict[int, str | None]:
+    hashes = {}
+    # bounded IN lists, a large import touches hundreds of thousands of position-days
+    for batch in chunked(sorted(offering_ids), SLOT_BATCH_SIZE):
+        hashes.update(
+            DailyOffering.objects.filter(id__in=batch, current_entry__isnull=False)
+            .order_by()
+            .values_list("id", "current_entry__content_hash")
+        )
+    return hashes
+
+
+def resolve_offerings(keys: set[tuple[str, date]], batch_size: int | None = None) -> dict[tuple[str, date], int]:
+    offering_ids = _lookup_offerings(keys)
+    missing = keys - offering_ids.keys()
+    if missing:
+        # INSERT ... ON CONFLICT DO NOTHING, rows created by concurrent uploads are picked up by the second lookup
+        DailyOffering.objects.bulk_create(
+            [DailyOffering.for_position(name, day) for name, day in sorted(missing)],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        offering_ids = _lookup_offerings(keys)
+    return offering_ids
+
+
+def _lookup_offerings(keys: Iterable[tuple[str, date]]) -> dict[tuple[str, date], int]:
+    keys = set(keys)
+    dates = [day for _, day in keys]
+    rows = DailyOffering.objects.filter(
+        position_name__in={name for name, _ in keys}, date__range=(min(dates), max(dates))
+    ).values_list("id", "position_name", "date")
+    return {(name, day): pk for pk, name, day in rows if (name, day) in keys}
@@ -0,0 +1,40 @@
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from offering.export import EXPORT_FORMATS, export_offerings, iter_arrow, iter_csv, iter_days
+from offering.models import DailyOffering
+
+
+class Command(BaseCommand):
+    help = "Streams current offering values per UTC slot as CSV or Arrow IPC stream to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+        parser.add_argument("--output", help="defaults to stdout")
+        parser.add_argument("--position", help="position name prefix")
+        parser.add_argument("--date-from", type=date.fromisoformat)
+        parser.add_argument("--date-to", type=date.fromisoformat)
+        parser.add_argument("--chunk-size", type=int, default=2000, help="rows fetched per database round trip")
+
+    def handle(self, *args, format: str, output: str | None, position: str | None, date_from: date | None,
+               date_to: date | None, chunk_size: int, **options):
+        offerings = export_offerings(
+            DailyOffering.objects.matching(position=position, date_from=date_from, date_to=date_to)
+        )
+        days = iter_days(offerings, chunk_size)
+        binary = format == "arrow"
+        if output is None:
+            write = sys.stdout.buffer.write if binary else lambda chunk: self.stdout.write(chunk, ending="")
+            self._export(days, binary, write)
+            return
+        with open(output, "wb" if binary else "w", newline=None if binary else "") as stream:
+            self._export(days, binary, stream.write)
+
+    def _export(self, days, binary: bool, write) -> None:
+        try:
+            for chunk in iter_arrow(days) if binary else iter_csv(days):
+                write(chunk)
+        except ValueError as e:
+            raise CommandError(str(e))
@@ -0,0 +1,68 @@
+import itertools
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.json_stream import JSONStreamError
+from offering.bulk_import import Checkpoint, detect_format, import_batch, iter_parsed_batches, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports historical offerings from a CSV, NDJSON or Parquet file of (reference, startTime, slotLength, values) "
+        "records. Every batch is committed separately and recorded in a checkpoint file, an interrupted import "
+        "continues after the last committed batch with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], help="detected from the file suffix")
+        parser.add_argument("--batch-size", type=int, default=1000, help="records per transaction")
+        parser.add_argument("--workers", type=int, default=1, help="processes parsing records")
+        parser.add_argument("--checkpoint", type=Path, help="defaults to <path>.checkpoint")
+        parser.add_argument("--resume", action="store_true", help="skip records committed by a previous run")
+
+    def handle(self, *args, path: Path, format: str | None, batch_size: int, workers: int,
+               checkpoint: Path | None, resume: bool, **options):
+        if not path.is_file():
+            raise CommandError(f"File {path} does not exist")
+        if batch_size < 1 or workers < 1:
+            raise CommandError("--batch-size and --workers must be positive")
+        checkpoint = Checkpoint(checkpoint or path.with_name(path.name + ".checkpoint"), path)
+
+        skip = 0
+        if checkpoint.exists():
+            if not resume:
+                raise CommandError(f"Checkpoint {checkpoint.path} exists, pass --resume or remove it")
+            try:
+                skip = checkpoint.load()
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"Resuming after {skip} rows")
+
+        try:
+            records = itertools.islice(read_records(path, format or detect_format(path)), skip, None)
+            rows, days, errors = self._import(iter_parsed_batches(records, batch_size, workers, skip), checkpoint, skip)
+        except (ValueError, JSONStreamError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {rows - errors} of {rows} rows ({days} position-days), {errors} rejected")
+        )
+
+    def _import(self, batches, checkpoint: Checkpoint, skip: int) -> tuple[int, int, int]:
+        rows = days = errors = 0
+        start = time.perf_counter()
+        for batch in batches:
+            import_batch(batch, checkpoint)
+            rows += batch.rows
+            days += len(batch.days)
+            errors += len(batch.errors)
+            for error in batch.errors:
+                self.stderr.write(f"row {error['row']}: {error['error']} {error.get('error_details', '')}".rstrip())
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{skip + rows} rows, {days} position-days, {rows / elapsed if elapsed else 0:.0f} rows/s"
+            )
+        return rows, days, errors
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+def merge_duplicated_offerings(apps, schema_editor):
+    DailyOffering = apps.get_model('offering', 'DailyOffering')
+    duplicated = (
+        DailyOffering.objects.values('position_name', 'date')
+        .annotate(count=models.Count('id'))
+        .filter(count__gt=1)
+    )
+    for key in duplicated:
+        offerings = list(
+            DailyOffering.objects.filter(position_name=key['position_name'], date=key['date']).order_by('id')
+        )
+        kept, *merged = offerings
+        for offering in merged:
+            kept.entries.add(*offering.entries.all())
+            offering.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offering', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicated_offerings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailyoffering',
+            constraint=models.UniqueConstraint(fields=('position_name', 'date'), name='offering_unique_position_date'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+from django.db import migrations, models
+
+
+# frozen copies of the helpers of offering.values at the time of this migration, later changes to the app code
+# must not change what this migration does
+SCALE_DIGITS = 6
+PACKED_DTYPE = np.dtype('<i8')
+
+
+def to_micro(values):
+    micro = []
+    for value in values:
+        try:
+            scaled = Decimal(value).scaleb(SCALE_DIGITS)
+        except InvalidOperation:
+            raise ValueError(f"Value '{value}' is not a number")
+        if not scaled.is_finite() or scaled != scaled.to_integral_value():
+            raise ValueError(f"Value '{value}' is not a fixed point number")
+        if not -2 ** 63 <= scaled < 2 ** 63:
+            raise ValueError(f"Value '{value}' is out of range")
+        micro.append(int(scaled))
+    return np.array(micro, dtype=PACKED_DTYPE)
+
+
+def pack_existing_values(apps, schema_editor):
+    DailyOfferingEntry = apps.get_model('offering', 'DailyOfferingEntry')
+    batch = []
+    for entry in DailyOfferingEntry.objects.filter(packed_values__isnull=True).only('id', 'values').iterator(
+        chunk_size=2000
+    ):
+        try:
+            entry.packed_values = to_micro(entry.values).tobytes()
+        except (ValueError, TypeError):
+            # rows with non numeric values keep the JSON representation only
+            continue
+        batch.append(entry)
+        if len(batch) == 2000:
+            DailyOfferingEntry.objects.bulk_update(batch, ['packed_values'])
+            batch = []
+    DailyOfferingEntry.objects.bulk_update(batch, ['packed_values'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offering', '0002_dailyoffering_unique_position_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyofferingentry',
+            name='packed_values',
+            field=models.BinaryField(editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailyofferingentry',
+            name='values',
+            field=models.JSONField(null=True),
+        ),
+        migrations.RunPython(pack_existing_values, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offering', '0003_dailyofferingentry_packed_values'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferingUploadJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('payload', models.JSONField(null=True)),
+                ('total_items', models.IntegerField(default=0)),
+                ('processed_items', models.IntegerField(default=0)),
+                ('stored_days', models.IntegerField(default=0)),
+                ('errors', models.JSONField(default=list)),
+                ('trading_days', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+            ],
+        ),
+    ]
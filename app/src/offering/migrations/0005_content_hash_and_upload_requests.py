@@ -0,0 +1,67 @@
+import hashlib
+from importlib import import_module
+
+import django.core.serializers.json
+import numpy as np
+from django.db import migrations, models
+
+# 0003 backfilled the packed values of every numeric entry and holds the frozen fixed point helpers
+packed_values_migration = import_module('offering.migrations.0003_dailyofferingentry_packed_values')
+
+
+def content_hash(position_name, day, slot_length, micro_values):
+    """A copy of `offering.values.content_hash` at the time of this migration."""
+    digest = hashlib.sha256(f"{position_name}\x00{day.isoformat()}\x00{slot_length}\x00".encode())
+    digest.update(micro_values.tobytes())
+    return digest.hexdigest()
+
+
+def hash_existing_entries(apps, schema_editor):
+    DailyOfferingEntry = apps.get_model('offering', 'DailyOfferingEntry')
+    Through = apps.get_model('offering', 'DailyOffering').entries.through
+    # rows with non numeric values have no packed values and are never deduplicated
+    rows = Through.objects.filter(
+        dailyofferingentry__content_hash__isnull=True, dailyofferingentry__packed_values__isnull=False
+    ).values_list(
+        'dailyofferingentry_id',
+        'dailyofferingentry__slot_length',
+        'dailyofferingentry__packed_values',
+        'dailyoffering__position_name',
+        'dailyoffering__date',
+    )
+    batch = []
+    for entry_id, slot_length, packed_values, position_name, day in rows.iterator(chunk_size=2000):
+        micro_values = np.frombuffer(packed_values, dtype=packed_values_migration.PACKED_DTYPE)
+        entry_hash = content_hash(position_name, day, slot_length, micro_values)
+        batch.append(DailyOfferingEntry(id=entry_id, content_hash=entry_hash))
+        if len(batch) == 2000:
+            DailyOfferingEntry.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    DailyOfferingEntry.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offering', '0004_offeringuploadjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyofferingentry',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(hash_existing_entries, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='OfferingUploadRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=255, unique=True)),
+                ('request_hash', models.CharField(max_length=64)),
+                ('status_code', models.IntegerField()),
+                ('response', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
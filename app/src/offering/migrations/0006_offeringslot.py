@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+from importlib import import_module
+
+import arrow
+import django.db.models.deletion
+import numpy as np
+import pytz
+from django.db import migrations, models
+from django.db.models import Max
+from more_itertools import chunked
+
+# 0003 backfilled the packed values of every numeric entry and holds the frozen fixed point helpers
+packed_values_migration = import_module('offering.migrations.0003_dailyofferingentry_packed_values')
+
+
+def slot_starts(day, slot_length):
+    """UTC timestamps of the slots of a CET trading day, a copy of `common.trading_calendar` at this migration."""
+    start = arrow.get(day, tzinfo=pytz.timezone('CET')).floor('day')
+    return range(start.int_timestamp, start.shift(days=1).int_timestamp, slot_length)
+
+
+def fill_slots(apps, schema_editor):
+    DailyOffering = apps.get_model('offering', 'DailyOffering')
+    DailyOfferingEntry = apps.get_model('offering', 'DailyOfferingEntry')
+    OfferingSlot = apps.get_model('offering', 'OfferingSlot')
+    offerings = DailyOffering.objects.annotate(latest_entry_id=Max('entries__id')).filter(latest_entry_id__isnull=False)
+    batch = []
+    for chunk in chunked(offerings.order_by('id').iterator(chunk_size=500), 500):
+        entries = DailyOfferingEntry.objects.only('id', 'slot_length', 'packed_values').in_bulk(
+            [offering.latest_entry_id for offering in chunk]
+        )
+        for offering in chunk:
+            batch += offering_slots(OfferingSlot, offering, entries[offering.latest_entry_id])
+        if len(batch) >= 5000:
+            OfferingSlot.objects.bulk_create(batch)
+            batch = []
+    OfferingSlot.objects.bulk_create(batch)
+
+
+def offering_slots(OfferingSlot, offering, entry):
+    if entry.packed_values is None:
+        # entries with non numeric values have no slots
+        return []
+    micro_values = np.frombuffer(entry.packed_values, dtype=packed_values_migration.PACKED_DTYPE)
+    return [
+        OfferingSlot(
+            offering_id=offering.id,
+            entry_id=entry.id,
+            position_name=offering.position_name,
+            slot_start=datetime.fromtimestamp(start, timezone.utc),
+            slot_length=entry.slot_length,
+            value=value,
+        )
+        for start, value in zip(slot_starts(offering.date, entry.slot_length), micro_values.tolist())
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offering', '0005_content_hash_and_upload_requests'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferingSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position_name', models.CharField(max_length=100)),
+                ('slot_start', models.DateTimeField()),
+                ('slot_length', models.IntegerField(choices=[(3600, 'HOUR'), (1900, 'QUARTER')])),
+                ('value', models.BigIntegerField()),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='offering.dailyofferingentry')),
+                ('offering', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='offering.dailyoffering')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('position_name', 'slot_start'), name='offering_slot_unique_position_start')],
+            },
+        ),
+        migrations.RunPython(fill_slots, migrations.RunPython.noop),
+    ]
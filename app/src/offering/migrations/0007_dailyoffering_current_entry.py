@@ -0,0 +1,40 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def point_at_latest_entries(apps, schema_editor):
+    DailyOffering = apps.get_model('offering', 'DailyOffering')
+    offerings = DailyOffering.objects.annotate(latest_entry_id=Max('entries__id'), entry_count=Count('entries')).filter(
+        entry_count__gt=0
+    )
+    batch = []
+    for offering in offerings.iterator(chunk_size=2000):
+        offering.current_entry_id = offering.latest_entry_id
+        offering.version = offering.entry_count
+        batch.append(offering)
+        if len(batch) == 2000:
+            DailyOffering.objects.bulk_update(batch, ['current_entry', 'version'])
+            batch = []
+    DailyOffering.objects.bulk_update(batch, ['current_entry', 'version'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offering', '0006_offeringslot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyoffering',
+            name='current_entry',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='offering.dailyofferingentry'),
+        ),
+        migrations.AddField(
+            model_name='dailyoffering',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(point_at_latest_entries, migrations.RunPython.noop),
+    ]
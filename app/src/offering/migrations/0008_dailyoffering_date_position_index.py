@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offering', '0007_dailyoffering_current_entry'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='dailyoffering',
+            name='offering_da_date_779078_idx',
+        ),
+        migrations.AddIndex(
+            model_name='dailyoffering',
+            index=models.Index(fields=['date', 'position_name', 'id'], name='offering_date_position_idx'),
+        ),
+    ]
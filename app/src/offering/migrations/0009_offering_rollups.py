@@ -0,0 +1,133 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Case, Count, Max, Min, Sum, Value, When
+
+
+# slot starts aggregated per statement and position names mapped to their groups per statement
+DAY_BATCH = timedelta(days=100)
+POSITION_BATCH_SIZE = 1000
+
+# frozen copy of offering.positions.parse_position_name at the time of this migration
+COUNTRIES = {'FI', 'SE'}
+
+
+def parse_position_name(position_name):
+    """(country, client, product) of a `COUNTRY_client_PRODUCT` reference, None when it does not follow the scheme."""
+    country, _, rest = position_name.partition('_')
+    client, _, product = rest.rpartition('_')
+    if country not in COUNTRIES or not client or not product:
+        return None
+    return {'country': country, 'client': client, 'product': product}
+
+
+def fill_rollups(apps, schema_editor):
+    """Aggregates the existing slots into the rollups in the database, `DAY_BATCH` of slot starts per statement."""
+    OfferingSlot = apps.get_model('offering', 'OfferingSlot')
+    rollups = {
+        'product': apps.get_model('offering', 'OfferingProductRollup'),
+        'client': apps.get_model('offering', 'OfferingClientRollup'),
+    }
+    bounds = OfferingSlot.objects.aggregate(first=Min('slot_start'), last=Max('slot_start'))
+    start = bounds['first']
+    while start is not None and start <= bounds['last']:
+        slots = OfferingSlot.objects.filter(slot_start__gte=start, slot_start__lt=start + DAY_BATCH)
+        identities = {}
+        for position_name in slots.values_list('position_name', flat=True).distinct().order_by().iterator():
+            identity = parse_position_name(position_name)
+            if identity is not None:
+                identities[position_name] = identity
+        for dimension, model in rollups.items():
+            groups = defaultdict(list)
+            for position_name, identity in identities.items():
+                groups[(identity['country'], identity[dimension])].append(position_name)
+            for group_batch in batch_groups(groups):
+                insert_aggregates(schema_editor.connection, model, dimension, slots, group_batch)
+        start += DAY_BATCH
+
+
+def batch_groups(groups):
+    """Whole groups of at most `POSITION_BATCH_SIZE` position names in total, a larger group is a batch of its own."""
+    batch, size = {}, 0
+    for key, position_names in groups.items():
+        if batch and size + len(position_names) > POSITION_BATCH_SIZE:
+            yield batch
+            batch, size = {}, 0
+        batch[key] = position_names
+        size += len(position_names)
+    if batch:
+        yield batch
+
+
+def insert_aggregates(connection, model, dimension, slots, groups):
+    """INSERT ... SELECT of the per slot aggregates of `groups`, (country, group) -> position names."""
+    labels = {
+        field: Case(
+            *(When(position_name__in=position_names, then=Value(key[index])) for key, position_names in groups.items()),
+            output_field=models.CharField(),
+        )
+        for index, field in enumerate(('country', dimension))
+    }
+    cells = (
+        slots.filter(position_name__in=[name for position_names in groups.values() for name in position_names])
+        .annotate(**labels)
+        .values('country', dimension, 'slot_start', 'slot_length')
+        .annotate(total=Sum('value'), count=Count('id'), min_value=Min('value'), max_value=Max('value'))
+        .order_by()
+    )
+    select, params = cells.query.sql_with_params()
+    quote = connection.ops.quote_name
+    names = ('country', dimension, 'slot_start', 'slot_length', 'total', 'count', 'min_value', 'max_value')
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in names)
+    # the select lists plain fields before annotations, the subquery puts them in the column order by name
+    aliases = ', '.join(quote(name) for name in names)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(model._meta.db_table)} ({columns}) SELECT {aliases} FROM ({select}) AS cells', params
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offering', '0008_dailyoffering_date_position_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferingProductRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot_start', models.DateTimeField()),
+                ('slot_length', models.IntegerField(choices=[(3600, 'HOUR'), (1900, 'QUARTER')])),
+                ('total', models.BigIntegerField()),
+                ('count', models.IntegerField()),
+                ('min_value', models.BigIntegerField()),
+                ('max_value', models.BigIntegerField()),
+                ('country', models.CharField(choices=[('FI', 'FI'), ('SE', 'SE')], max_length=2)),
+                ('product', models.CharField(max_length=50)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('country', 'product', 'slot_length', 'slot_start'), name='offering_product_rollup_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OfferingClientRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot_start', models.DateTimeField()),
+                ('slot_length', models.IntegerField(choices=[(3600, 'HOUR'), (1900, 'QUARTER')])),
+                ('total', models.BigIntegerField()),
+                ('count', models.IntegerField()),
+                ('min_value', models.BigIntegerField()),
+                ('max_value', models.BigIntegerField()),
+                ('country', models.CharField(choices=[('FI', 'FI'), ('SE', 'SE')], max_length=2)),
+                ('client', models.CharField(max_length=100)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('country', 'client', 'slot_length', 'slot_start'), name='offering_client_rollup_unique')],
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+from importlib import import_module
+
+from django.db import migrations, models
+
+# 0009 holds the frozen position name scheme
+rollups_migration = import_module('offering.migrations.0009_offering_rollups')
+
+
+def fill_identity(apps, schema_editor):
+    DailyOffering = apps.get_model('offering', 'DailyOffering')
+    position_names = DailyOffering.objects.values_list('position_name', flat=True).distinct().order_by()
+    for position_name in list(position_names):
+        fields = rollups_migration.parse_position_name(position_name)
+        if fields is not None:
+            DailyOffering.objects.filter(position_name=position_name).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offering', '0009_offering_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyoffering',
+            name='country',
+            field=models.CharField(choices=[('FI', 'FI'), ('SE', 'SE')], editable=False, max_length=2, null=True),
+        ),
+        migrations.AddField(
+            model_name='dailyoffering',
+            name='client',
+            field=models.CharField(editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='dailyoffering',
+            name='product',
+            field=models.CharField(editable=False, max_length=50, null=True),
+        ),
+        migrations.RunPython(fill_identity, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='dailyoffering',
+            index=models.Index(fields=['country', 'product', 'date'], name='offering_country_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyoffering',
+            index=models.Index(fields=['country', 'client', 'date'], name='offering_country_client_idx'),
+        ),
+    ]
@@ -1,12 +1,19 @@
+import uuid
+from datetime import date, datetime
 from decimal import Decimal
 
 import arrow
+import numpy as np
 import pytz
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 from common import const
+from common.country import Country
 from common.slot_length import SlotLength
-from common.time_slot import TimeSlot
+from offering import values as fixed_point
+from offering.positions import identity_fields
 
 
 # Create your models here.
@@ -34,40 +41,212 @@ from common.time_slot import TimeSlot
 
 class DailyOfferingEntry(models.Model):
     slot_length = models.IntegerField(default=3600, choices=SlotLength.choices())
-    values = models.JSONField()
+    values = models.JSONField(null=True)
+    packed_values = models.BinaryField(null=True, editable=False)
+    # identifies (position, date, slot length, values), identical re-uploads of the latest entry are skipped
+    content_hash = models.CharField(max_length=64, null=True, editable=False)
     created_at = models.DateTimeField(default=lambda: arrow.now(pytz.timezone(const.trading_timezone_name)).datetime,
                                       editable=False)
 
+    @classmethod
+    def build(cls, slot_length: int, values: list[Decimal] | list[str], micro_values: np.ndarray | None = None,
+              content_hash: str | None = None) -> "DailyOfferingEntry":
+        json_values = [str(v) for v in values] if settings.OFFERING_STORE_JSON_VALUES else None
+        packed_values = fixed_point.pack(values if micro_values is None else micro_values)
+        return cls(slot_length=slot_length, values=json_values, packed_values=packed_values, content_hash=content_hash)
+
+    def micro_values(self) -> np.ndarray:
+        if self.packed_values is None:
+            return fixed_point.to_micro(self.values)
+        return fixed_point.unpack(self.packed_values)
+
+    def values_array(self) -> np.ndarray:
+        return self.micro_values() / fixed_point.SCALE
+
+    def decimal_values(self) -> list[Decimal]:
+        if self.packed_values is None:
+            return [Decimal(v) for v in self.values]
+        return fixed_point.micro_to_decimals(self.micro_values())
+
     def __str__(self):
         return f"DailyOfferingEntry('{arrow.get(self.created_at).format('YYYY-MM-DD HH:mm:ss')}')"
 
 
+class DailyOfferingQuerySet(models.QuerySet):
+    def current_on(self, day: date) -> "DailyOfferingQuerySet":
+        """Offerings of a trading day with their current entry, without going through the `entries` table."""
+        return self.filter(date=day, current_entry__isnull=False).select_related("current_entry")
+
+    def matching(self, position: str | None = None, date_from: date | None = None, date_to: date | None = None,
+                 slot_length: int | None = None, country: str | None = None, client: str | None = None,
+                 product: str | None = None) -> "DailyOfferingQuerySet":
+        """Filters of the read and export APIs, `position` is a position name prefix."""
+        queryset = self
+        if position is not None:
+            queryset = queryset.filter(position_name__startswith=position)
+        if country is not None:
+            queryset = queryset.filter(country=country)
+        if client is not None:
+            queryset = queryset.filter(client=client)
+        if product is not None:
+            queryset = queryset.filter(product=product)
+        if date_from is not None:
+            queryset = queryset.filter(date__gte=date_from)
+        if date_to is not None:
+            queryset = queryset.filter(date__lte=date_to)
+        if slot_length is not None:
+            queryset = queryset.filter(current_entry__slot_length=slot_length)
+        return queryset
+
+
 class DailyOffering(models.Model):
     position_name = models.CharField(null=False, blank=False, max_length=100)
     date = models.DateField(null=False, blank=False)
+    # parsed from `position_name`, null when the name does not follow the COUNTRY_client_PRODUCT scheme
+    country = models.CharField(max_length=2, choices=Country.choices(), null=True, editable=False)
+    client = models.CharField(max_length=100, null=True, editable=False)
+    product = models.CharField(max_length=50, null=True, editable=False)
     entries = models.ManyToManyField(DailyOfferingEntry)
+    # latest of `entries` and the number of entries stored so far, maintained by ingestion
+    current_entry = models.ForeignKey(
+        DailyOfferingEntry, null=True, editable=False, on_delete=models.SET_NULL, related_name="+"
+    )
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = DailyOfferingQuerySet.as_manager()
 
     class Meta:
         ordering = ['date']
-        indexes = [models.Index(fields=['date'])]
+        # serves date range filters and the (date, position_name, id) keyset pagination of the read API
+        indexes = [
+            models.Index(fields=['date', 'position_name', 'id'], name='offering_date_position_idx'),
+            models.Index(fields=['country', 'product', 'date'], name='offering_country_product_idx'),
+            models.Index(fields=['country', 'client', 'date'], name='offering_country_client_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['position_name', 'date'], name='offering_unique_position_date'),
+        ]
+
+    @classmethod
+    def for_position(cls, position_name: str, day: date) -> "DailyOffering":
+        return cls(position_name=position_name, date=day, **identity_fields(position_name))
+
+    def save(self, *args, **kwargs):
+        for name, value in identity_fields(self.position_name).items():
+            setattr(self, name, value)
+        super().save(*args, **kwargs)
 
     def add_entry(self, slot_length: int, values: list[Decimal] | list[str]) -> DailyOfferingEntry:
-        if slot_length not in dict(SlotLength.choices()).keys():
-            raise ValueError(f"Slot length must be one of the following: {dict(SlotLength.choices()).keys()}")
-        expected_values_count = len(TimeSlot.at(self.date, tz=const.trading_timezone_name).split(slot_length))
-        received_values_count = len(values)
-        if expected_values_count != received_values_count:
-            raise ValueError(f"Values count should be: {expected_values_count}, but are: {received_values_count}")
+        """Stores one more entry of this offering, see `offering.ingestion.add_entry`."""
+        from offering.ingestion import add_entry
+
+        return add_entry(self, slot_length, values)
 
-        if self.pk is None:
-            self.save()
+    def __str__(self):
+        return f"{self.date} - {self.position_name}"
 
-        if isinstance(values[0], Decimal):
-            values = [str(v) for v in values]
 
-        entry = DailyOfferingEntry.objects.create(values=values, slot_length=slot_length)
-        self.entries.add(entry)
-        return entry
+class OfferingSlotQuerySet(models.QuerySet):
+    def between(self, position_name: str, start: datetime, end: datetime) -> "OfferingSlotQuerySet":
+        """Slots of a position starting within [start, end), served by the (position_name, slot_start) index."""
+        return self.filter(position_name=position_name, slot_start__gte=start, slot_start__lt=end).order_by(
+            "slot_start"
+        )
+
+
+class OfferingSlot(models.Model):
+    """Per slot value of the latest entry of every position-day, kept in sync by ingestion for time range reads."""
+
+    offering = models.ForeignKey(DailyOffering, on_delete=models.CASCADE, related_name="slots")
+    entry = models.ForeignKey(DailyOfferingEntry, on_delete=models.CASCADE, related_name="+")
+    position_name = models.CharField(max_length=100)
+    slot_start = models.DateTimeField()
+    slot_length = models.IntegerField(choices=SlotLength.choices())
+    # micro-MW, see offering.values
+    value = models.BigIntegerField()
+
+    objects = OfferingSlotQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["position_name", "slot_start"], name="offering_slot_unique_position_start"),
+        ]
+
+    def decimal_value(self) -> Decimal:
+        return fixed_point.from_micro(self.value)
 
     def __str__(self):
-        return f"{self.date} - {self.position_name}"
+        return f"{self.position_name} {self.slot_start.isoformat()}"
+
+
+class SlotRollup(models.Model):
+    """Per slot aggregate of the current values (micro-MW) of a group of positions, see offering.rollups."""
+
+    slot_start = models.DateTimeField()
+    slot_length = models.IntegerField(choices=SlotLength.choices())
+    total = models.BigIntegerField()
+    count = models.IntegerField()
+    min_value = models.BigIntegerField()
+    max_value = models.BigIntegerField()
+
+    class Meta:
+        abstract = True
+
+
+class OfferingProductRollup(SlotRollup):
+    country = models.CharField(max_length=2, choices=Country.choices())
+    product = models.CharField(max_length=50)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["country", "product", "slot_length", "slot_start"], name="offering_product_rollup_unique"
+            ),
+        ]
+
+
+class OfferingClientRollup(SlotRollup):
+    country = models.CharField(max_length=2, choices=Country.choices())
+    client = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["country", "client", "slot_length", "slot_start"], name="offering_client_rollup_unique"
+            ),
+        ]
+
+
+class OfferingUploadJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    payload = models.JSONField(null=True)
+    total_items = models.IntegerField(default=0)
+    processed_items = models.IntegerField(default=0)
+    stored_days = models.IntegerField(default=0)
+    errors = models.JSONField(default=list)
+    trading_days = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f"OfferingUploadJob('{self.id}', {self.status})"
+
+
+class OfferingUploadRequest(models.Model):
+    """Response of an upload sent with an `Idempotency-Key` header, replayed for retries of the same request."""
+
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.IntegerField()
+    response = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"OfferingUploadRequest('{self.idempotency_key}', {self.status_code})"
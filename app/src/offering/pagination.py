@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import date
+from typing import Any
+
+from django.db import connections
+from django.db.models import BooleanField, QuerySet
+from django.db.models.expressions import RawSQL
+
+KEYSET_FIELDS = ("date", "position_name", "id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: tuple) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        day, position_name, pk = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return date.fromisoformat(day), str(position_name), int(pk)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def keyset_page(queryset: QuerySet, cursor: str | None, page_size: int) -> tuple[list[Any], str | None]:
+    """Returns the page following `cursor` ordered by (date, position_name, id) and the cursor of the next page.
+
+    Unlike offsets, the row comparison `(date, position_name, id) > (...)` keeps every page a range scan of the
+    (date, position_name, id) index however deep the client pages.
+    """
+    queryset = queryset.order_by(*KEYSET_FIELDS)
+    if cursor is not None:
+        queryset = queryset.filter(_after(queryset, decode_cursor(cursor)))
+    rows = list(queryset[: page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    last = rows[page_size - 1]
+    return rows[:page_size], encode_cursor(tuple(getattr(last, f) for f in KEYSET_FIELDS))
+
+
+def _after(queryset: QuerySet, values: tuple) -> RawSQL:
+    # Django has no row value lookup, both SQLite and Postgres compare row values natively
+    quote = connections[queryset.db].ops.quote_name
+    table = quote(queryset.model._meta.db_table)
+    columns = ", ".join(f"{table}.{quote(queryset.model._meta.get_field(f).column)}" for f in KEYSET_FIELDS)
+    placeholders = ", ".join(["%s"] * len(KEYSET_FIELDS))
+    return RawSQL(f"({columns}) > ({placeholders})", values, output_field=BooleanField())
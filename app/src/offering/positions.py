@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+
+from common.country import Country
+
+
+@dataclass(frozen=True)
+class PositionIdentity:
+    country: Country
+    client: str
+    product: str
+
+
+def parse_position_name(position_name: str) -> PositionIdentity | None:
+    """Splits a `COUNTRY_client_PRODUCT` reference, e.g. `FI_client1_FCRN`; None when it does not follow the scheme."""
+    country, _, rest = position_name.partition("_")
+    client, _, product = rest.rpartition("_")
+    if country not in Country._value2member_map_ or not client or not product:
+        return None
+    return PositionIdentity(Country(country), client, product)
+
+
+def identity_fields(position_name: str) -> dict[str, str | None]:
+    """`country`, `client` and `product` column values of a position, all None for names outside the scheme."""
+    identity = parse_position_name(position_name)
+    if identity is None:
+        return {"country": None, "client": None, "product": None}
+    return {"country": identity.country.value, "client": identity.client, "product": identity.product}
@@ -0,0 +1,132 @@
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime, timedelta, timezone
+from functools import reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from more_itertools import chunked
+
+from common import const
+from common.slot_length import SlotLength
+from common.trading_calendar import trading_day
+from offering.models import OfferingClientRollup, OfferingProductRollup, OfferingSlot, SlotRollup
+from offering.positions import parse_position_name
+
+# touched days refreshed per statement, each run of consecutive days is one slot start range
+DAY_BATCH_SIZE = 100
+
+# rollup model and the position attribute it groups by, next to the country
+ROLLUPS: dict[str, tuple[type[SlotRollup], str]] = {
+    "product": (OfferingProductRollup, "product"),
+    "client": (OfferingClientRollup, "client"),
+}
+
+
+def refresh_rollups(changed: Iterable[tuple[str, date]]) -> None:
+    """Recomputes the rollup rows of the groups and trading days of changed (position name, date) pairs.
+
+    Sums and counts could be updated by deltas, but min and max can not once a value is replaced, so the touched
+    cells are aggregated again from `OfferingSlot` by the database, `DAY_BATCH_SIZE` touched days per statement.
+    The refreshed region is every combination of touched countries and products (clients) over the touched days
+    only, so the filters stay plain `IN` lists however many groups an upload touches.
+    """
+    countries, days = set(), set()
+    values: dict[str, set[str]] = {dimension: set() for dimension in ROLLUPS}
+    for position_name, day in changed:
+        identity = parse_position_name(position_name)
+        if identity is None:
+            continue
+        countries.add(identity.country.value)
+        days.add(day)
+        for dimension, dimension_values in values.items():
+            dimension_values.add(getattr(identity, dimension))
+    if not days:
+        return
+
+    # the locks are held and the rows replaced until the caller's transaction commits
+    with transaction.atomic(savepoint=False):
+        _lock_groups(countries, values)
+        for dimension, (model, field) in ROLLUPS.items():
+            for day_batch in chunked(sorted(days), DAY_BATCH_SIZE):
+                model.objects.filter(
+                    _within_days(day_batch), country__in=countries, **{f"{field}__in": values[dimension]}
+                ).delete()
+                _insert_aggregates(model, field, dimension, countries, values[dimension], day_batch)
+
+
+def _lock_groups(countries: set[str], values: dict[str, set[str]]) -> None:
+    """Serializes refreshes of the same groups until commit, concurrent uploads would insert the same rows."""
+    if connection.vendor != "postgresql":
+        # SQLite transactions hold the database lock
+        return
+    keys = sorted(
+        f"offering-rollup:{dimension}:{country}:{group}"
+        for dimension, groups in values.items()
+        for country in countries
+        for group in groups
+    )
+    with connection.cursor() as cursor:
+        # taken in sorted order, two refreshes never wait for each other's locks
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(key)) FROM unnest(%s::text[]) AS key", [keys])
+
+
+def _within_days(days: Sequence[date]) -> Q:
+    """Slot starts of `days` (sorted), one range per run of consecutive days."""
+    ranges = []
+    for day in days:
+        if ranges and ranges[-1][1] == day - timedelta(days=1):
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return reduce(
+        or_, (Q(slot_start__gte=_day_start(first), slot_start__lt=_day_start(last, offset=1)) for first, last in ranges)
+    )
+
+
+def _insert_aggregates(model: type[SlotRollup], field: str, dimension: str, countries: set[str], groups: set[str],
+                       days: Sequence[date]) -> None:
+    """INSERT ... SELECT of the aggregated current slot values, the values never leave the database."""
+    slots = (
+        OfferingSlot.objects.filter(
+            offering__country__in=countries, **{f"offering__{dimension}__in": groups}, offering__date__in=days
+        )
+        .values("offering__country", f"offering__{dimension}", "slot_start", "slot_length")
+        .annotate(total=Sum("value"), count=Count("id"), min_value=Min("value"), max_value=Max("value"))
+        .order_by()
+    )
+    select, params = slots.query.sql_with_params()
+    columns = ", ".join(
+        connection.ops.quote_name(model._meta.get_field(name).column)
+        for name in ("country", field, "slot_start", "slot_length", "total", "count", "min_value", "max_value")
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) {select}", params)
+
+
+def _day_start(day: date, offset: int = 0) -> datetime:
+    trading = trading_day(day, SlotLength.HOUR, tz=const.trading_timezone_name)
+    return datetime.fromtimestamp(trading.to_ts if offset else trading.from_ts, timezone.utc)
+
+
+def aggregate(by: str, start: datetime, end: datetime, slot_length: int, country: str | None = None,
+              product: str | None = None, client: str | None = None) -> list[dict]:
+    """Per slot totals within [start, end) grouped by country, (country, product) or (country, client).
+
+    Country totals are summed from the client rollup when filtered by client, from the product rollup otherwise.
+    """
+    model = OfferingClientRollup if by == "client" or client is not None else OfferingProductRollup
+    rows = model.objects.filter(slot_length=slot_length, slot_start__gte=start, slot_start__lt=end)
+    if country is not None:
+        rows = rows.filter(country=country)
+    if product is not None:
+        rows = rows.filter(product=product)
+    if client is not None:
+        rows = rows.filter(client=client)
+
+    group_by = ["country"] if by == "country" else ["country", by]
+    return list(
+        rows.values(*group_by, "slot_start")
+        .annotate(total=Sum("total"), count=Sum("count"), min_value=Min("min_value"), max_value=Max("max_value"))
+        .order_by(*group_by, "slot_start")
+    )
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 
+from common.country import Country
 from common.slot_length import SlotLength
+from offering.models import OfferingUploadJob
 
 
 class OfferingPayloadItemSerializer(serializers.Serializer):
@@ -15,4 +17,128 @@ class StoredOfferingDetailsSerializer(serializers.Serializer):
 
 class StoreOfferingResponseSerializer(serializers.Serializer):
     message = serializers.CharField()
-    details = StoredOfferingDetailsSerializer()
\ No newline at end of file
+    details = StoredOfferingDetailsSerializer()
+
+
+class OfferingUploadJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OfferingUploadJob
+        fields = (
+            "id",
+            "status",
+            "total_items",
+            "processed_items",
+            "stored_days",
+            "errors",
+            "trading_days",
+            "created_at",
+            "finished_at",
+        )
+
+
+class OfferingUploadAcceptedSerializer(serializers.Serializer):
+    job_id = serializers.UUIDField()
+    status_url = serializers.CharField()
+
+
+class OfferingSlotQuerySerializer(serializers.Serializer):
+    position = serializers.CharField(max_length=100)
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        if attrs["start"] >= attrs["end"]:
+            raise serializers.ValidationError("start must be before end")
+        return attrs
+
+
+class OfferingSlotValueSerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    slot_length = serializers.IntegerField()
+    value = serializers.CharField()
+
+
+class OfferingSlotsResponseSerializer(serializers.Serializer):
+    position_name = serializers.CharField()
+    slots = OfferingSlotValueSerializer(many=True)
+
+
+class OfferingFilterSerializer(serializers.Serializer):
+    position = serializers.CharField(max_length=100, required=False, help_text="position name prefix")
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    slot_length = serializers.ChoiceField(choices=[c[0] for c in SlotLength.choices()], required=False)
+    country = serializers.ChoiceField(choices=[c[0] for c in Country.choices()], required=False)
+    client = serializers.CharField(max_length=100, required=False)
+    product = serializers.CharField(max_length=50, required=False)
+
+    def validate(self, attrs):
+        if "date_from" in attrs and "date_to" in attrs and attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from must not be after date_to")
+        return attrs
+
+
+class OfferingListQuerySerializer(OfferingFilterSerializer):
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+
+class CurrentEntrySerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    slot_length = serializers.IntegerField()
+    created_at = serializers.DateTimeField()
+    values = serializers.SerializerMethodField()
+
+    def get_values(self, entry) -> list[str]:
+        return [str(v) for v in entry.decimal_values()]
+
+
+class OfferingSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    position_name = serializers.CharField()
+    country = serializers.CharField(allow_null=True)
+    client = serializers.CharField(allow_null=True)
+    product = serializers.CharField(allow_null=True)
+    date = serializers.DateField()
+    version = serializers.IntegerField()
+    current_entry = CurrentEntrySerializer(allow_null=True)
+
+
+class OfferingListResponseSerializer(serializers.Serializer):
+    results = OfferingSerializer(many=True)
+    next = serializers.CharField(allow_null=True)
+
+
+class OfferingRollupQuerySerializer(serializers.Serializer):
+    by = serializers.ChoiceField(choices=["country", "product", "client"], default="country")
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    slot_length = serializers.ChoiceField(choices=[c[0] for c in SlotLength.choices()], default=SlotLength.HOUR.value)
+    country = serializers.ChoiceField(choices=[c[0] for c in Country.choices()], required=False)
+    product = serializers.CharField(max_length=50, required=False)
+    client = serializers.CharField(max_length=100, required=False)
+
+    def validate(self, attrs):
+        if attrs["start"] >= attrs["end"]:
+            raise serializers.ValidationError("start must be before end")
+        if "product" in attrs and "client" in attrs:
+            raise serializers.ValidationError("filter by either product or client")
+        if attrs["by"] == "product" and "client" in attrs or attrs["by"] == "client" and "product" in attrs:
+            raise serializers.ValidationError(f"{attrs['by']} totals can not be filtered by another dimension")
+        return attrs
+
+
+class OfferingRollupSerializer(serializers.Serializer):
+    country = serializers.CharField()
+    product = serializers.CharField(required=False)
+    client = serializers.CharField(required=False)
+    start = serializers.DateTimeField()
+    total = serializers.CharField()
+    count = serializers.IntegerField()
+    min = serializers.CharField()
+    max = serializers.CharField()
+
+
+class OfferingRollupsResponseSerializer(serializers.Serializer):
+    slot_length = serializers.IntegerField()
+    results = OfferingRollupSerializer(many=True)
@@ -0,0 +1,79 @@
+from datetime import date
+
+import structlog
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from offering.ingestion import OfferingDay, split_into_days, store_offering_days
+from offering.models import OfferingUploadJob
+from offering.validation import OfferingPayloadValidator
+
+log = structlog.get_logger("offering")
+
+
+@shared_task
+def ingest_offering_upload(job_id: str) -> None:
+    job = OfferingUploadJob.objects.get(pk=job_id)
+    job.status = OfferingUploadJob.Status.RUNNING
+    job.save(update_fields=["status"])
+    try:
+        _ingest(job, settings.OFFERING_UPLOAD_CHUNK_SIZE)
+    except Exception as e:
+        log.exception("offering upload failed", job_id=job_id)
+        job.status = OfferingUploadJob.Status.FAILED
+        job.errors = [*job.errors, {"error": str(e)}]
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "errors", "finished_at"])
+        raise
+
+
+def _ingest(job: OfferingUploadJob, chunk_size: int) -> None:
+    """Stores the payload in transactions of at most `chunk_size` position-days, reporting progress after each.
+
+    A retried job resumes after the items whose progress the previous attempt saved.
+    """
+    start = job.processed_items
+    # item errors past the saved progress are reported again when their items are processed again
+    job.errors = [error for error in job.errors if error.get("index", -1) < start]
+    trading_days = {date.fromisoformat(day) for day in job.trading_days}
+    pending: list[OfferingDay] = []
+
+    def flush(processed_items: int) -> None:
+        if pending:
+            with transaction.atomic():
+                store_offering_days(pending)
+            job.stored_days += len(pending)
+            pending.clear()
+        job.processed_items = processed_items
+        job.trading_days = sorted(day.isoformat() for day in trading_days)
+        job.save(update_fields=["processed_items", "stored_days", "errors", "trading_days"])
+
+    for index, item in enumerate(job.payload[start:], start=start):
+        validator = OfferingPayloadValidator(data=item)
+        if not validator.is_valid():
+            job.errors.append({"index": index, "error": "serialisation error", "error_details": validator.errors})
+            continue
+        item_data = validator.validated_data
+        try:
+            days = split_into_days(
+                item_data["reference"],
+                item_data["startTime"],
+                item_data["slotLength"],
+                item_data["values"],
+                item_data["micro_values"],
+            )
+        except ValueError as e:
+            job.errors.append({"index": index, "error": str(e)})
+            continue
+        pending.extend(days)
+        trading_days.update(day.date for day in days)
+        if len(pending) >= chunk_size:
+            flush(index + 1)
+
+    flush(len(job.payload))
+    job.status = OfferingUploadJob.Status.SUCCEEDED
+    job.payload = None
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "payload", "finished_at"])
@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+from assertpy import assert_that
+
+from offering.ingestion import add_entry, advance_current_entries, split_into_days, store_offering_days
+from offering.models import DailyOffering
+
+pytestmark = pytest.mark.django_db
+
+
+def store(position_name: str, value: str, days: int = 1) -> None:
+    store_offering_days(split_into_days(position_name, "2025-01-15T23:00:00Z", 3600, [value] * 24 * days))
+
+
+def test_current_entry_follows_latest_upload():
+    store("FI_client1_FCRN", "1.0", days=2)
+    store("FI_client1_FCRN", "2.0")
+
+    first_day = DailyOffering.objects.get(date=date(2025, 1, 16))
+    second_day = DailyOffering.objects.get(date=date(2025, 1, 17))
+    assert_that(first_day.version).is_equal_to(2)
+    assert_that(first_day.current_entry_id).is_equal_to(first_day.entries.order_by("id").last().pk)
+    assert_that(first_day.current_entry.values[0]).is_equal_to("2.0")
+    assert_that(second_day.version).is_equal_to(1)
+    assert_that(second_day.current_entry.values[0]).is_equal_to("1.0")
+
+
+def test_unchanged_upload_keeps_version():
+    store("FI_client1_FCRN", "1.0")
+    store("FI_client1_FCRN", "1.0")
+
+    assert_that(DailyOffering.objects.get().version).is_equal_to(1)
+
+
+def test_repeated_day_in_one_batch_counts_every_entry():
+    days = split_into_days("FI_client1_FCRN", "2025-01-15T23:00:00Z", 3600, ["1.0"] * 24)
+    days += split_into_days("FI_client1_FCRN", "2025-01-15T23:00:00Z", 3600, ["3.0"] * 24)
+
+    entries = store_offering_days(days)
+
+    offering = DailyOffering.objects.get()
+    assert_that(offering.version).is_equal_to(2)
+    assert_that(offering.current_entry_id).is_equal_to(entries[-1].pk)
+
+
+def test_older_entry_committed_later_does_not_move_current_entry_back():
+    first = split_into_days("FI_client1_FCRN", "2025-01-15T23:00:00Z", 3600, ["1.0"] * 24)
+    [entry] = store_offering_days(first)
+    store("FI_client1_FCRN", "2.0")
+    offering = DailyOffering.objects.get()
+
+    advance_current_entries(first, [entry.pk], {("FI_client1_FCRN", date(2025, 1, 16)): offering.pk})
+
+    offering.refresh_from_db()
+    assert_that(offering.current_entry.values[0]).is_equal_to("2.0")
+    assert_that(offering.version).is_equal_to(3)
+
+
+def test_add_entry_updates_current_entry():
+    offering = DailyOffering.objects.create(position_name="FI_client1_FCRN", date=date(2025, 1, 16))
+
+    add_entry(offering, 3600, ["1.0"] * 24)
+    entry = add_entry(offering, 3600, ["2.0"] * 24)
+
+    assert_that(offering.current_entry_id).is_equal_to(entry.pk)
+    assert_that(offering.version).is_equal_to(2)
+
+
+def test_current_offers_of_a_day_are_read_with_one_query(django_assert_num_queries):
+    for position in range(5):
+        store(f"FI_client{position}_FCRN", "1.0", days=2)
+        store(f"FI_client{position}_FCRN", f"{position}.5", days=1)
+
+    with django_assert_num_queries(1):
+        current = {
+            o.position_name: o.current_entry.values[0] for o in DailyOffering.objects.current_on(date(2025, 1, 16))
+        }
+
+    assert_that(current).is_equal_to({f"FI_client{p}_FCRN": f"{p}.5" for p in range(5)})
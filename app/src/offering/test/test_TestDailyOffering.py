@@ -4,7 +4,7 @@ from datetime import date
 import time_machine
 from assertpy import assert_that
 
-from offering.models import DailyOffering
+from offering.models import DailyOffering, DailyOfferingEntry
 
 
 @pytest.mark.django_db
@@ -92,4 +92,46 @@ class TestDailyOffering:
         values = ["10.5"] * 24
 
         with pytest.raises(ValueError, match="Values count should be: 25, but are: 24"):
-            offering.add_entry(3600, values)
\ No newline at end of file
+            offering.add_entry(3600, values)
+
+    def test_add_entry_packs_values_as_fixed_point(self):
+        offering = DailyOffering.objects.create(position_name="Test Position", date=date(2024, 1, 15))
+        values = ["10.5", "0.000001"] + ["-3"] * 22
+
+        offering.add_entry(3600, values)
+
+        entry = offering.entries.get()
+        assert_that(entry.micro_values().tolist()).is_equal_to([10_500_000, 1] + [-3_000_000] * 22)
+        assert_that(entry.values_array()[0]).is_equal_to(10.5)
+        assert_that(entry.decimal_values()).is_equal_to([Decimal(v) for v in values])
+
+    def test_add_entry_with_too_precise_value_raises_error(self):
+        offering = DailyOffering(position_name="Test Position", date=date(2024, 1, 15))
+        values = ["10.5"] * 23 + ["0.0000001"]
+
+        with pytest.raises(ValueError, match="has more than 6 decimal places"):
+            offering.add_entry(3600, values)
+        assert_that(offering.pk).is_none()
+
+    def test_add_entry_with_non_numeric_value_raises_error(self):
+        offering = DailyOffering(position_name="Test Position", date=date(2024, 1, 15))
+        values = ["10.5"] * 23 + ["abc"]
+
+        with pytest.raises(ValueError, match="is not a number"):
+            offering.add_entry(3600, values)
+
+    def test_binary_only_storage_skips_json_values(self, settings):
+        settings.OFFERING_STORE_JSON_VALUES = False
+        offering = DailyOffering.objects.create(position_name="Test Position", date=date(2024, 1, 15))
+
+        offering.add_entry(3600, [Decimal("1.25")] * 24)
+
+        entry = offering.entries.get()
+        assert_that(entry.values).is_none()
+        assert_that(entry.decimal_values()).is_equal_to([Decimal("1.25")] * 24)
+
+    def test_entry_without_packed_values_falls_back_to_json(self):
+        entry = DailyOfferingEntry(slot_length=3600, values=["1.5"] * 24)
+
+        assert_that(entry.micro_values().tolist()).is_equal_to([1_500_000] * 24)
+        assert_that(entry.decimal_values()).is_equal_to([Decimal("1.5")] * 24)
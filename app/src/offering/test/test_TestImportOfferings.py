@@ -0,0 +1,134 @@
+import csv
+import json
+from datetime import date
+from io import StringIO
+
+import pytest
+from assertpy import assert_that
+from django.core.management import CommandError, call_command
+
+from common.db import copy_text
+from offering.ingestion import add_entry
+from offering.models import DailyOffering, DailyOfferingEntry, OfferingSlot
+
+pytestmark = pytest.mark.django_db
+
+
+def record(reference: str, values_count: int = 24, start_time: str = "2025-01-15T23:00:00Z") -> dict:
+    return {"reference": reference, "startTime": start_time, "slotLength": 3600, "values": ["1.5"] * values_count}
+
+
+def write_ndjson(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+    return path
+
+
+def write_csv(path, records):
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["reference", "startTime", "slotLength", "values"])
+        writer.writeheader()
+        for r in records:
+            writer.writerow({**r, "values": ";".join(r["values"])})
+    return path
+
+
+def run(*args) -> tuple[str, str]:
+    out, err = StringIO(), StringIO()
+    call_command("import_offerings", *[str(a) for a in args], stdout=out, stderr=err)
+    return out.getvalue(), err.getvalue()
+
+
+def test_imports_csv(tmp_path):
+    path = write_csv(tmp_path / "offerings.csv", [record("FI_client1_FCRN", 48), record("FI_client2_FCRN")])
+
+    out, _ = run(path)
+
+    assert_that(out).contains("Imported 2 of 2 rows (3 position-days), 0 rejected", "rows/s")
+    assert_that(DailyOffering.objects.count()).is_equal_to(3)
+    offering = DailyOffering.objects.get(position_name="FI_client1_FCRN", date="2025-01-17")
+    entry = offering.entries.get()
+    assert_that(entry.values).is_equal_to(["1.5"] * 24)
+    assert_that(entry.micro_values().tolist()).is_equal_to([1_500_000] * 24)
+    assert_that(OfferingSlot.objects.count()).is_equal_to(72)
+    assert_that((offering.current_entry_id, offering.version)).is_equal_to((entry.pk, 1))
+    assert_that(set(offering.slots.values_list("entry_id", flat=True))).is_equal_to({entry.pk})
+
+
+def test_imports_ndjson_in_batches_and_reports_rejected_rows(tmp_path):
+    records = [record("FI_client1_FCRN"), record("FI_client2_FCRN", 10), {"reference": "x"}, record("FI_client3_FCRN")]
+    path = write_ndjson(tmp_path / "offerings.ndjson", records)
+
+    out, err = run(path, "--batch-size", 2)
+
+    assert_that(out).contains("Imported 2 of 4 rows (2 position-days), 2 rejected")
+    assert_that(err).contains("row 1: Not enough values for day 2025-01-16", "row 2: serialisation error")
+    assert_that(set(DailyOffering.objects.values_list("position_name", flat=True))).is_equal_to(
+        {"FI_client1_FCRN", "FI_client3_FCRN"}
+    )
+
+
+def test_malformed_json_values_reject_only_their_row(tmp_path):
+    path = tmp_path / "offerings.csv"
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["reference", "startTime", "slotLength", "values"])
+        writer.writerow(["FI_client1_FCRN", "2025-01-15T23:00:00Z", 3600, '["1.5", "2.5"'])
+        writer.writerow(["FI_client2_FCRN", "2025-01-15T23:00:00Z", 3600, json.dumps(["1.5"] * 24)])
+
+    out, err = run(path)
+
+    assert_that(out).contains("Imported 1 of 2 rows (1 position-days), 1 rejected")
+    assert_that(err).contains("row 0: serialisation error")
+    assert_that(list(DailyOffering.objects.values_list("position_name", flat=True))).is_equal_to(["FI_client2_FCRN"])
+
+
+def test_appends_entries_to_existing_offerings(tmp_path):
+    add_entry(DailyOffering.objects.create(position_name="FI_client1_FCRN", date=date(2025, 1, 16)), 3600, ["1.0"] * 24)
+    path = write_ndjson(tmp_path / "offerings.jsonl", [record("FI_client1_FCRN")])
+
+    run(path)
+
+    offering = DailyOffering.objects.get()
+    assert_that(offering.entries.count()).is_equal_to(2)
+    assert_that(DailyOfferingEntry.objects.order_by("id").last().values).is_equal_to(["1.5"] * 24)
+
+
+def test_parses_in_worker_processes(tmp_path):
+    records = [record(f"FI_client{i}_FCRN") for i in range(10)]
+    path = write_ndjson(tmp_path / "offerings.ndjson", records)
+
+    run(path, "--batch-size", 3, "--workers", 2)
+
+    assert_that(DailyOffering.objects.count()).is_equal_to(10)
+    assert_that(DailyOfferingEntry.objects.count()).is_equal_to(10)
+
+
+def test_resumes_after_last_committed_batch(tmp_path):
+    path = write_ndjson(tmp_path / "offerings.ndjson", [record(f"FI_client{i}_FCRN") for i in range(5)])
+    checkpoint = tmp_path / "offerings.ndjson.checkpoint"
+    run(path, "--batch-size", 2)
+    state = json.loads(checkpoint.read_text())
+    checkpoint.write_text(json.dumps({**state, "rows": 2}))
+    DailyOffering.objects.exclude(position_name__in=["FI_client0_FCRN", "FI_client1_FCRN"]).delete()
+
+    with pytest.raises(CommandError, match="--resume"):
+        run(path)
+    out, _ = run(path, "--resume")
+
+    assert_that(out).contains("Resuming after 2 rows", "Imported 3 of 3 rows")
+    assert_that(DailyOffering.objects.count()).is_equal_to(5)
+    assert_that(DailyOfferingEntry.objects.filter(dailyoffering__isnull=False).count()).is_equal_to(5)
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    path = tmp_path / "offerings.txt"
+    path.write_text("")
+
+    with pytest.raises(CommandError, match="Cannot detect format"):
+        run(path)
+
+
+def test_copy_text_escapes_values():
+    rows = [(1, '["1.0", "a\\tb"]', b"\x01\xff", None)]
+
+    assert_that(copy_text(rows)).is_equal_to('1\t["1.0", "a\\\\tb"]\t\\\\x01ff\t\\N\n')
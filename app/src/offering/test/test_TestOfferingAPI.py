@@ -224,3 +224,19 @@ def test_empty_payload_returns_validation_error(api_client, url):
     response = api_client.post(url, data=payload, format='json')
 
     assert_that(response.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+
+
+def test_non_numeric_value_returns_error(api_client, url):
+    payload = [{
+        "reference": "FI_client1_FCRN",
+        "unit": "MW",
+        "startTime": "2025-01-15T23:00:00Z",
+        "slotLength": 3600,
+        "values": ["1.0"] * 23 + ["abc"]
+    }]
+
+    response = api_client.post(url, data=payload, format='json')
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+    assert_that(response.data).contains_key("error")
+    assert_that(DailyOffering.objects.count()).is_equal_to(0)
@@ -0,0 +1,113 @@
+import csv
+import io
+import tracemalloc
+from datetime import date, timedelta
+from io import StringIO
+
+import pytest
+from assertpy import assert_that
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from offering.ingestion import split_into_days, store_offering_days
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def store(position_name: str, values: list[str], start_time: str = "2025-01-15T23:00:00Z") -> None:
+    store_offering_days(split_into_days(position_name, start_time, 3600, values))
+
+
+def content(response) -> bytes:
+    return b"".join(response.streaming_content)
+
+
+def test_csv_export_expands_current_values_to_utc_slots(api_client):
+    store("FI_client1_FCRN", ["1.0"] * 24)
+    store("FI_client1_FCRN", [f"{i}.5" for i in range(24)])
+    store("FI_client2_FCRN", ["2.0"] * 48)
+
+    response = api_client.get("/api/offering/export/csv/", {"date_to": "2025-01-16"})
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_200_OK)
+    assert_that(response["Content-Type"]).is_equal_to("text/csv")
+    rows = list(csv.reader(io.StringIO(content(response).decode())))
+    assert_that(rows[0]).is_equal_to(["position_name", "slot_start", "slot_length", "value"])
+    assert_that(rows[1:]).is_length(48)
+    assert_that(rows[1]).is_equal_to(["FI_client1_FCRN", "2025-01-15T23:00:00Z", "3600", "0.500000"])
+    assert_that(rows[24]).is_equal_to(["FI_client1_FCRN", "2025-01-16T22:00:00Z", "3600", "23.500000"])
+    assert_that(rows[25]).is_equal_to(["FI_client2_FCRN", "2025-01-15T23:00:00Z", "3600", "2.000000"])
+
+
+def test_csv_export_of_dst_day_has_25_distinct_slots(api_client):
+    store("FI_client1_FCRN", ["1.0"] * 25, start_time="2024-10-26T22:00:00Z")
+
+    rows = list(csv.reader(io.StringIO(content(api_client.get("/api/offering/export/csv/")).decode())))[1:]
+
+    assert_that([r[1] for r in rows]).does_not_contain_duplicates().is_length(25)
+    assert_that(rows[2][1]).is_equal_to("2024-10-27T00:00:00Z")
+
+
+def test_export_streams_one_chunk_per_day(api_client):
+    for day in range(10):
+        store("FI_client1_FCRN", ["1.0"] * 24, start_time=f"2025-01-{15 + day}T23:00:00Z")
+
+    response = api_client.get("/api/offering/export/csv/")
+
+    assert_that(response.streaming).is_true()
+    assert_that(list(response.streaming_content)).is_length(10)
+
+
+def test_unknown_format_is_rejected(api_client):
+    assert_that(api_client.get("/api/offering/export/xlsx/").status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+
+
+def test_arrow_export(api_client):
+    pa = pytest.importorskip("pyarrow")
+    store("FI_client1_FCRN", ["1.25"] * 48)
+
+    response = api_client.get("/api/offering/export/arrow/")
+
+    table = pa.ipc.open_stream(content(response)).read_all()
+    assert_that(table.num_rows).is_equal_to(48)
+    assert_that(table.column("value").to_pylist()).contains_only(1.25)
+    assert_that(str(table.column("slot_start")[0])).is_equal_to("2025-01-15 23:00:00+00:00")
+
+
+def test_export_command_writes_csv(tmp_path):
+    store("FI_client1_FCRN", ["1.0"] * 24)
+    output = tmp_path / "offerings.csv"
+
+    call_command("export_offerings", "--output", str(output), "--position", "FI_")
+    stdout = StringIO()
+    call_command("export_offerings", "--position", "SE_", stdout=stdout)
+
+    assert_that(output.read_text().splitlines()).is_length(25)
+    assert_that(stdout.getvalue()).is_equal_to("position_name,slot_start,slot_length,value\n")
+
+
+def test_export_memory_does_not_grow_with_range(api_client):
+    def export(days: int) -> tuple[int, int]:
+        response = api_client.get("/api/offering/export/csv/", {"date_to": date(2025, 1, 1) + timedelta(days=days)})
+        size = 0
+        tracemalloc.start()
+        for chunk in response.streaming_content:
+            size += len(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak, size
+
+    store("FI_client1_FCRN", ["1.0"] * 24 * 80, start_time="2024-12-31T23:00:00Z")
+    # one-off allocations of the first request (imports, compiled queries) are not part of either peak
+    export(1)
+    short_peak, short_size = export(7)
+    long_peak, long_size = export(70)
+
+    # buffering the response would grow the peak by about the size of the additional rows
+    assert_that(long_peak - short_peak).is_less_than((long_size - short_size) // 2)
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+import pytest
+from assertpy import assert_that
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from offering import tasks
+from offering.models import DailyOffering, DailyOfferingEntry, OfferingUploadJob, OfferingUploadRequest
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def payload(value: str = "1.0") -> list[dict]:
+    return [{
+        "reference": "FI_client1_FCRN",
+        "unit": "MW",
+        "startTime": "2025-01-15T23:00:00Z",
+        "slotLength": 3600,
+        "values": [value] * 48,
+    }]
+
+
+def upload(api_client, data, key=None, url="/api/offering/upload/"):
+    headers = {"Idempotency-Key": key} if key is not None else {}
+    return api_client.post(url, data=data, format="json", headers=headers)
+
+
+def test_identical_retry_without_key_does_not_add_entries(api_client):
+    first = upload(api_client, payload())
+    retry = upload(api_client, payload())
+    changed = upload(api_client, payload("2.0"))
+
+    assert_that([first.status_code, retry.status_code, changed.status_code]).is_equal_to([201, 201, 201])
+    assert_that(retry.data).is_equal_to(first.data)
+    assert_that(DailyOffering.objects.count()).is_equal_to(2)
+    assert_that(DailyOfferingEntry.objects.count()).is_equal_to(4)
+
+
+def test_retry_with_key_replays_response(api_client):
+    first = upload(api_client, payload(), key="upload-1")
+    retry = upload(api_client, payload(), key="upload-1")
+
+    assert_that(first.status_code).is_equal_to(status.HTTP_201_CREATED)
+    assert_that(first.has_header("Idempotent-Replayed")).is_false()
+    assert_that(retry.status_code).is_equal_to(status.HTTP_201_CREATED)
+    assert_that(retry["Idempotent-Replayed"]).is_equal_to("true")
+    assert_that(retry.json()).is_equal_to(first.json())
+    assert_that(OfferingUploadRequest.objects.count()).is_equal_to(1)
+
+
+def test_key_reused_with_different_payload_is_rejected(api_client):
+    upload(api_client, payload(), key="upload-1")
+
+    response = upload(api_client, payload("2.0"), key="upload-1")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_422_UNPROCESSABLE_ENTITY)
+    assert_that(DailyOfferingEntry.objects.count()).is_equal_to(2)
+
+
+def test_failed_requests_are_not_remembered(api_client):
+    invalid = upload(api_client, [{"reference": "FI_client1_FCRN"}], key="upload-1")
+    valid = upload(api_client, payload(), key="upload-1")
+
+    assert_that(invalid.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+    assert_that(valid.status_code).is_equal_to(status.HTTP_201_CREATED)
+
+
+def test_expired_key_is_processed_again(api_client, settings):
+    upload(api_client, payload(), key="upload-1")
+    OfferingUploadRequest.objects.update(created_at=timezone.now() - settings.OFFERING_IDEMPOTENCY_KEY_TTL)
+
+    response = upload(api_client, payload("2.0"), key="upload-1")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_201_CREATED)
+    assert_that(response.has_header("Idempotent-Replayed")).is_false()
+    assert_that(OfferingUploadRequest.objects.get().created_at).is_greater_than(timezone.now() - timedelta(minutes=1))
+
+
+def test_async_retry_with_key_returns_the_same_job(api_client, monkeypatch):
+    monkeypatch.setattr(tasks.ingest_offering_upload, "delay", lambda job_id: None)
+
+    first = upload(api_client, payload(), key="upload-1", url="/api/offering/upload/async/")
+    retry = upload(api_client, payload(), key="upload-1", url="/api/offering/upload/async/")
+
+    assert_that(retry.status_code).is_equal_to(status.HTTP_202_ACCEPTED)
+    assert_that(retry.json()).is_equal_to(first.json())
+    assert_that(OfferingUploadJob.objects.count()).is_equal_to(1)
+
+
+def test_too_long_key_is_rejected(api_client):
+    response = upload(api_client, payload(), key="k" * 256)
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,139 @@
+from datetime import date
+
+import pytest
+from assertpy import assert_that
+from django.db import IntegrityError, transaction
+
+from offering import ingestion
+from offering.ingestion import OfferingDay, resolve_offerings, split_into_days, store_offering_days
+from offering.models import DailyOffering
+
+pytestmark = pytest.mark.django_db
+
+
+def offering_days(positions: int, days: int, value: str = "1.0") -> list[OfferingDay]:
+    return [
+        day
+        for position in range(positions)
+        for day in split_into_days(f"FI_client{position}_FCRN", "2025-01-15T23:00:00Z", 3600, [value] * 24 * days)
+    ]
+
+
+def test_split_into_days_across_dst() -> None:
+    result = split_into_days("FI_client1_FCRN", "2024-10-26T22:00:00Z", 3600, ["1.0"] * 49)
+
+    assert_that([(d.date, len(d.values)) for d in result]).is_equal_to([
+        (date(2024, 10, 27), 25),
+        (date(2024, 10, 28), 24),
+    ])
+
+
+def test_split_into_days_not_enough_values_raises_error() -> None:
+    with pytest.raises(ValueError, match="Not enough values for day 2025-01-17"):
+        split_into_days("FI_client1_FCRN", "2025-01-15T23:00:00Z", 3600, ["1.0"] * 30)
+
+
+def test_store_reuses_existing_offerings() -> None:
+    existing = DailyOffering.objects.create(position_name="FI_client0_FCRN", date=date(2025, 1, 16))
+
+    store_offering_days(offering_days(positions=2, days=2))
+
+    assert_that(DailyOffering.objects.count()).is_equal_to(4)
+    assert_that(existing.entries.count()).is_equal_to(1)
+    assert_that(existing.entries.first().values).is_length(24)
+
+
+def test_store_packed_values_only_when_json_copy_is_disabled(settings) -> None:
+    settings.OFFERING_STORE_JSON_VALUES = False
+
+    store_offering_days(offering_days(positions=1, days=1, value="1.5"))
+
+    offering = DailyOffering.objects.get()
+    assert_that(offering.current_entry.values).is_none()
+    assert_that(offering.current_entry.micro_values().tolist()).is_equal_to([1_500_000] * 24)
+    assert_that(list(offering.slots.values_list("value", flat=True))).is_equal_to([1_500_000] * 24)
+
+
+def test_store_uses_constant_number_of_queries(django_assert_max_num_queries) -> None:
+    small, large = offering_days(positions=1, days=1), offering_days(positions=20, days=10, value="2.0")
+
+    with django_assert_max_num_queries(16):
+        store_offering_days(small)
+    with django_assert_max_num_queries(16):
+        store_offering_days(large)
+
+    assert_that(DailyOffering.objects.count()).is_equal_to(200)
+    assert_that(DailyOffering.entries.through.objects.count()).is_equal_to(201)
+
+
+def test_offerings_store_parsed_position_identity() -> None:
+    resolve_offerings({("FI_client_1_FCRN", date(2025, 1, 16)), ("legacy", date(2025, 1, 16))})
+    DailyOffering(position_name="SE_client2_FCRD", date=date(2025, 1, 16)).save()
+
+    assert_that(list(DailyOffering.objects.order_by("position_name").values_list(
+        "position_name", "country", "client", "product"
+    ))).is_equal_to([
+        ("FI_client_1_FCRN", "FI", "client_1", "FCRN"),
+        ("SE_client2_FCRD", "SE", "client2", "FCRD"),
+        ("legacy", None, None, None),
+    ])
+
+
+def test_position_and_date_are_unique() -> None:
+    DailyOffering.objects.create(position_name="FI_client0_FCRN", date=date(2025, 1, 16))
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        DailyOffering.objects.create(position_name="FI_client0_FCRN", date=date(2025, 1, 16))
+
+
+def test_resolve_offerings_upserts_missing_keys() -> None:
+    existing = DailyOffering.objects.create(position_name="FI_client0_FCRN", date=date(2025, 1, 16))
+    keys = {("FI_client0_FCRN", date(2025, 1, 16)), ("FI_client0_FCRN", date(2025, 1, 17))}
+
+    first = resolve_offerings(keys)
+    second = resolve_offerings(keys)
+
+    assert_that(first).is_equal_to(second)
+    assert_that(first[("FI_client0_FCRN", date(2025, 1, 16))]).is_equal_to(existing.pk)
+    assert_that(DailyOffering.objects.count()).is_equal_to(2)
+
+
+def test_repeated_store_adds_entries_to_the_same_offering() -> None:
+    store_offering_days(offering_days(positions=1, days=1))
+    store_offering_days(offering_days(positions=1, days=1, value="2.0"))
+
+    assert_that(DailyOffering.objects.count()).is_equal_to(1)
+    assert_that(DailyOffering.objects.get().entries.count()).is_equal_to(2)
+
+
+def test_store_skips_days_identical_to_latest_entry() -> None:
+    store_offering_days(offering_days(positions=2, days=1))
+    store_offering_days(offering_days(positions=1, days=1, value="2.0"))
+
+    stored = store_offering_days(
+        offering_days(positions=2, days=1) + offering_days(positions=1, days=1) + offering_days(positions=1, days=1)
+    )
+
+    assert_that(stored).is_length(1)
+    offering = DailyOffering.objects.get(position_name="FI_client0_FCRN")
+    assert_that([e.values[0] for e in offering.entries.order_by("id")]).is_equal_to(["1.0", "2.0", "1.0"])
+    assert_that(DailyOffering.objects.get(position_name="FI_client1_FCRN").entries.count()).is_equal_to(1)
+
+
+def test_skip_unchanged_reads_latest_hashes_in_batches(monkeypatch, django_assert_num_queries) -> None:
+    store_offering_days(offering_days(positions=3, days=2))
+    monkeypatch.setattr(ingestion, "SLOT_BATCH_SIZE", 4)
+    days = offering_days(positions=3, days=2)
+    offering_ids = resolve_offerings({(day.position_name, day.date) for day in days})
+
+    with django_assert_num_queries(2):
+        assert_that(ingestion.skip_unchanged(days, offering_ids)).is_empty()
+
+
+def test_content_hash_covers_position_date_slot_length_and_values() -> None:
+    day = offering_days(positions=1, days=1)[0]
+
+    assert_that(day.content_hash).is_equal_to(offering_days(positions=1, days=1)[0].content_hash)
+    assert_that(day.content_hash).is_not_equal_to(offering_days(positions=1, days=1, value="1.000001")[0].content_hash)
+    assert_that(day.content_hash).is_not_equal_to(offering_days(positions=2, days=1)[1].content_hash)
+    assert_that(store_offering_days([day])[0].content_hash).is_equal_to(day.content_hash)
@@ -0,0 +1,126 @@
+from datetime import date
+
+import pytest
+from assertpy import assert_that
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from offering.ingestion import split_into_days, store_offering_days
+from offering.models import DailyOffering, DailyOfferingEntry
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/offering/offerings/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def store(position_name: str, value: str = "1.0", days: int = 1, start_time: str = "2025-01-15T23:00:00Z") -> None:
+    store_offering_days(split_into_days(position_name, start_time, 3600, [value] * 24 * days))
+
+
+def keys(response) -> list[tuple[str, str]]:
+    return [(o["date"], o["position_name"]) for o in response.data["results"]]
+
+
+def test_lists_current_values(api_client):
+    store("FI_client1_FCRN", "1.0")
+    store("FI_client1_FCRN", "2.5")
+
+    response = api_client.get(URL)
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_200_OK)
+    [offering] = response.data["results"]
+    assert_that(offering).contains_entry({"position_name": "FI_client1_FCRN"}, {"date": "2025-01-16"}, {"version": 2})
+    assert_that(offering["current_entry"]["values"]).is_equal_to(["2.500000"] * 24)
+    assert_that(response.data["next"]).is_none()
+
+
+def test_filters_by_position_prefix_date_range_and_slot_length(api_client):
+    store("FI_client1_FCRN", days=3)
+    store("FI_client2_FCRN", days=3)
+    store("SE_client1_FCRN", days=3)
+
+    response = api_client.get(URL, {"position": "FI_", "date_from": "2025-01-17", "date_to": "2025-01-18"})
+
+    assert_that(keys(response)).is_equal_to([
+        ("2025-01-17", "FI_client1_FCRN"),
+        ("2025-01-17", "FI_client2_FCRN"),
+        ("2025-01-18", "FI_client1_FCRN"),
+        ("2025-01-18", "FI_client2_FCRN"),
+    ])
+    assert_that(api_client.get(URL, {"slot_length": 1900}).data["results"]).is_empty()
+
+
+def test_filters_by_country_client_and_product(api_client):
+    store("FI_client1_FCRN")
+    store("FI_client1_FCRD")
+    store("FI_client_1_FCRN")
+    store("SE_client1_FCRN")
+
+    response = api_client.get(URL, {"country": "FI", "product": "FCRN"})
+
+    assert_that(keys(response)).is_equal_to([("2025-01-16", "FI_client1_FCRN"), ("2025-01-16", "FI_client_1_FCRN")])
+    assert_that(response.data["results"][1]).contains_entry({"client": "client_1"}, {"product": "FCRN"})
+    assert_that(keys(api_client.get(URL, {"client": "client1", "product": "FCRD"}))).is_equal_to(
+        [("2025-01-16", "FI_client1_FCRD")]
+    )
+    assert_that(api_client.get(URL, {"country": "DE"}).status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+
+
+def test_keyset_pagination_walks_all_rows_once(api_client, django_assert_max_num_queries):
+    for position in range(7):
+        store(f"FI_client{position}_FCRN", days=2)
+
+    seen, url, params = [], URL, {"page_size": 3}
+    while url:
+        with django_assert_max_num_queries(1):
+            response = api_client.get(url, params)
+        seen += keys(response)
+        url, params = response.data["next"], None
+
+    assert_that(seen).is_length(14)
+    assert_that(seen).is_equal_to(sorted(seen))
+    assert_that(set(seen)).is_length(14)
+
+
+def test_entries_without_packed_values_are_read_in_the_same_query(api_client, django_assert_num_queries):
+    for position in range(3):
+        offering = DailyOffering.objects.create(position_name=f"FI_client{position}_FCRN", date=date(2025, 1, 16))
+        entry = DailyOfferingEntry.objects.create(slot_length=3600, values=[f"{position}.5"] * 24)
+        offering.entries.add(entry)
+        DailyOffering.objects.filter(pk=offering.pk).update(current_entry=entry, version=1)
+    store("FI_client3_FCRN", "3.5")
+
+    with django_assert_num_queries(1):
+        response = api_client.get(URL)
+
+    assert_that([o["current_entry"]["values"][0] for o in response.data["results"]]).is_equal_to(
+        ["0.5", "1.5", "2.5", "3.500000"]
+    )
+
+
+def test_invalid_cursor_is_rejected(api_client):
+    response = api_client.get(URL, {"cursor": "not-a-cursor"})
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+
+
+def test_conditional_get_returns_not_modified_until_data_changes(api_client):
+    store("FI_client1_FCRN")
+    first = api_client.get(URL)
+
+    etag = first["ETag"]
+    unchanged = api_client.get(URL, headers={"If-None-Match": etag})
+    since = api_client.get(URL, headers={"If-Modified-Since": first["Last-Modified"]})
+    store("FI_client1_FCRN", "3.0")
+    changed = api_client.get(URL, headers={"If-None-Match": etag})
+
+    assert_that(unchanged.status_code).is_equal_to(status.HTTP_304_NOT_MODIFIED)
+    assert_that(unchanged["ETag"]).is_equal_to(etag)
+    assert_that(since.status_code).is_equal_to(status.HTTP_304_NOT_MODIFIED)
+    assert_that(changed.status_code).is_equal_to(status.HTTP_200_OK)
+    assert_that(changed["ETag"]).is_not_equal_to(etag)
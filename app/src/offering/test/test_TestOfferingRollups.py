@@ -0,0 +1,129 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from assertpy import assert_that
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from offering.ingestion import add_entry, split_into_days, store_offering_days
+from offering.models import DailyOffering, OfferingClientRollup, OfferingProductRollup
+from offering.positions import PositionIdentity, parse_position_name
+from offering.rollups import refresh_rollups
+
+pytestmark = pytest.mark.django_db
+
+DAY_START = datetime(2025, 1, 15, 23, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def store(position_name: str, values: list[str], start_time: str = "2025-01-15T23:00:00Z") -> None:
+    store_offering_days(split_into_days(position_name, start_time, 3600, values))
+
+
+def rollups(api_client, **params):
+    params = {"start": "2025-01-15T23:00:00Z", "end": "2025-01-16T23:00:00Z", **params}
+    return api_client.get(reverse("offering-rollups"), params)
+
+
+def test_parse_position_name():
+    assert_that(parse_position_name("FI_client_1_FCRN")).is_equal_to(PositionIdentity("FI", "client_1", "FCRN"))
+    assert_that(parse_position_name("DE_client1_FCRN")).is_none()
+    assert_that(parse_position_name("FI_FCRN")).is_none()
+
+
+def test_rollups_follow_replaced_values():
+    store("FI_client1_FCRN", ["1.5"] * 24)
+    store("FI_client2_FCRN", ["2"] * 24)
+    store("FI_client2_FCRN", ["0.5"] * 24)
+
+    rollup = OfferingProductRollup.objects.get(country="FI", product="FCRN", slot_start=DAY_START)
+    assert_that((rollup.total, rollup.count, rollup.min_value, rollup.max_value)).is_equal_to(
+        (2_000_000, 2, 500_000, 1_500_000)
+    )
+    assert_that(OfferingClientRollup.objects.filter(client="client2").values_list("total", flat=True).distinct()) \
+        .contains_only(500_000)
+
+
+def test_add_entry_refreshes_rollups():
+    offering = DailyOffering(position_name="SE_client1_FCRD", date=date(2025, 1, 16))
+    add_entry(offering, 3600, ["3"] * 24)
+    add_entry(offering, 3600, ["4"] * 24)
+
+    assert_that(OfferingProductRollup.objects.filter(country="SE", product="FCRD").count()).is_equal_to(24)
+    assert_that(set(OfferingProductRollup.objects.values_list("total", flat=True))).is_equal_to({4_000_000})
+
+
+def test_rollups_endpoint_groups_by_dimension(api_client):
+    store("FI_client1_FCRN", ["1"] * 24)
+    store("FI_client1_FCRD", ["2"] * 24)
+    store("FI_client2_FCRN", ["4"] * 24)
+    store("SE_client1_FCRN", ["8"] * 24)
+    store("unparsed", ["16"] * 24)
+
+    response = rollups(api_client)
+    assert_that(response.status_code).is_equal_to(status.HTTP_200_OK)
+    results = response.json()["results"]
+    assert_that(results).is_length(48)
+    assert_that(results[0]).is_equal_to({
+        "country": "FI",
+        "start": "2025-01-15T23:00:00Z",
+        "total": "7.000000",
+        "count": 3,
+        "min": "1.000000",
+        "max": "4.000000",
+    })
+    assert_that(results[-1]).has_country("SE").has_total("8.000000").has_start("2025-01-16T22:00:00Z")
+
+    results = rollups(api_client, by="product", country="FI").json()["results"]
+    assert_that({(r["product"], r["total"]) for r in results}).is_equal_to(
+        {("FCRD", "2.000000"), ("FCRN", "5.000000")}
+    )
+
+    results = rollups(api_client, by="client", country="FI").json()["results"]
+    assert_that({(r["client"], r["total"]) for r in results}).is_equal_to(
+        {("client1", "3.000000"), ("client2", "4.000000")}
+    )
+
+    results = rollups(api_client, product="FCRN").json()["results"]
+    assert_that({(r["country"], r["total"]) for r in results}).is_equal_to({("FI", "5.000000"), ("SE", "8.000000")})
+
+    response = rollups(api_client, by="country", client="client1")
+    assert_that(response.status_code).is_equal_to(status.HTTP_200_OK)
+    assert_that({(r["country"], r["total"]) for r in response.json()["results"]}).is_equal_to(
+        {("FI", "3.000000"), ("SE", "8.000000")}
+    )
+
+
+def test_rollups_rejects_invalid_query(api_client):
+    assert_that(rollups(api_client, by="position").status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+    assert_that(rollups(api_client, by="product", client="client1").status_code).is_equal_to(
+        status.HTTP_400_BAD_REQUEST
+    )
+    assert_that(rollups(api_client, end="2025-01-15T23:00:00Z").status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+
+
+def test_refresh_touching_many_groups_at_once():
+    store("FI_client1_FCRN", ["1"] * 24)
+
+    refresh_rollups([(f"FI_client{i}_FCRN", date(2025, 1, 16)) for i in range(1200)])
+
+    assert_that(OfferingClientRollup.objects.count()).is_equal_to(24)
+    assert_that(OfferingProductRollup.objects.get(slot_start=DAY_START).total).is_equal_to(1_000_000)
+
+
+def test_refresh_leaves_days_between_touched_days_alone():
+    store("FI_client1_FCRN", ["1"] * 72)
+    middle = OfferingProductRollup.objects.filter(slot_start__gte=datetime(2025, 1, 16, 23, tzinfo=timezone.utc),
+                                                  slot_start__lt=datetime(2025, 1, 17, 23, tzinfo=timezone.utc))
+    middle.update(total=0)
+
+    refresh_rollups([("FI_client1_FCRN", date(2025, 1, 16)), ("FI_client1_FCRN", date(2025, 1, 18))])
+
+    assert_that(middle.count()).is_equal_to(24)
+    assert_that(set(middle.values_list("total", flat=True))).is_equal_to({0})
+    assert_that(OfferingProductRollup.objects.filter(total=1_000_000).count()).is_equal_to(48)
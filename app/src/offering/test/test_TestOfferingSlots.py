@@ -0,0 +1,97 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from assertpy import assert_that
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from offering.ingestion import add_entry, split_into_days, store_offering_days
+from offering.models import DailyOffering, OfferingSlot
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def store(position_name: str, start_time: str, values: list[str]) -> None:
+    store_offering_days(split_into_days(position_name, start_time, 3600, values))
+
+
+def test_slots_follow_latest_entry_of_each_day():
+    store("FI_client1_FCRN", "2025-01-15T23:00:00Z", [str(i) for i in range(48)])
+    store("FI_client1_FCRN", "2025-01-16T23:00:00Z", ["7.5"] * 24)
+
+    slots = list(OfferingSlot.objects.between("FI_client1_FCRN", utc(2025, 1, 15, 23), utc(2025, 1, 17, 23)))
+
+    assert_that(slots).is_length(48)
+    assert_that(slots[0].slot_start).is_equal_to(utc(2025, 1, 15, 23))
+    assert_that(slots[-1].slot_start).is_equal_to(utc(2025, 1, 17, 22))
+    assert_that([s.value for s in slots[:24]]).is_equal_to([i * 1_000_000 for i in range(24)])
+    assert_that({s.value for s in slots[24:]}).is_equal_to({7_500_000})
+    latest_entry = DailyOffering.objects.get(date=date(2025, 1, 17)).entries.order_by("id").last()
+    assert_that({s.entry_id for s in slots[24:]}).is_equal_to({latest_entry.pk})
+
+
+def test_slots_of_dst_day_are_consecutive_utc_hours():
+    store("FI_client1_FCRN", "2024-10-26T22:00:00Z", ["1.0"] * 25)
+
+    starts = [s.slot_start for s in OfferingSlot.objects.between("FI_client1_FCRN", utc(2024, 1, 1), utc(2025, 1, 1))]
+
+    assert_that(starts).is_length(25)
+    assert_that(starts[0]).is_equal_to(utc(2024, 10, 26, 22))
+    assert_that(starts[-1]).is_equal_to(utc(2024, 10, 27, 22))
+
+
+def test_add_entry_replaces_slots():
+    offering = DailyOffering.objects.create(position_name="FI_client1_FCRN", date=date(2025, 1, 16))
+    add_entry(offering, 3600, ["1.0"] * 24)
+    entry = add_entry(offering, 3600, ["2.5"] * 24)
+
+    assert_that(offering.slots.count()).is_equal_to(24)
+    assert_that({s.entry_id for s in offering.slots.all()}).is_equal_to({entry.pk})
+    assert_that(offering.slots.first().decimal_value()).is_equal_to(2.5)
+
+
+def test_range_query_uses_position_and_start_bounds(django_assert_num_queries):
+    store("FI_client1_FCRN", "2025-01-15T23:00:00Z", ["1.0"] * 24)
+    store("FI_client2_FCRN", "2025-01-15T23:00:00Z", ["2.0"] * 24)
+
+    with django_assert_num_queries(1):
+        slots = list(OfferingSlot.objects.between("FI_client2_FCRN", utc(2025, 1, 16, 5), utc(2025, 1, 16, 8)))
+
+    assert_that([s.slot_start.hour for s in slots]).is_equal_to([5, 6, 7])
+    assert_that({s.position_name for s in slots}).is_equal_to({"FI_client2_FCRN"})
+
+
+def test_slots_endpoint(api_client):
+    store("FI_client1_FCRN", "2025-01-15T23:00:00Z", ["1.25"] * 24)
+
+    response = api_client.get(
+        "/api/offering/slots/",
+        {"position": "FI_client1_FCRN", "start": "2025-01-16T00:00:00Z", "end": "2025-01-16T02:00:00Z"},
+    )
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_200_OK)
+    assert_that(response.json()).is_equal_to({
+        "position_name": "FI_client1_FCRN",
+        "slots": [
+            {"start": "2025-01-16T00:00:00Z", "slot_length": 3600, "value": "1.250000"},
+            {"start": "2025-01-16T01:00:00Z", "slot_length": 3600, "value": "1.250000"},
+        ],
+    })
+
+
+def test_slots_endpoint_rejects_invalid_range(api_client):
+    response = api_client.get(
+        "/api/offering/slots/",
+        {"position": "FI_client1_FCRN", "start": "2025-01-16T02:00:00Z", "end": "2025-01-16T00:00:00Z"},
+    )
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,115 @@
+import pytest
+from assertpy import assert_that
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from offering import tasks
+from offering.models import DailyOffering, OfferingUploadJob
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def queued_jobs(monkeypatch):
+    queued = []
+    monkeypatch.setattr(tasks.ingest_offering_upload, "delay", queued.append)
+    return queued
+
+
+def item(reference: str, values_count: int) -> dict:
+    return {
+        "reference": reference,
+        "unit": "MW",
+        "startTime": "2025-01-15T23:00:00Z",
+        "slotLength": 3600,
+        "values": ["1.0"] * values_count,
+    }
+
+
+def test_upload_is_accepted_and_ingested_by_task(api_client, queued_jobs, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post("/api/offering/upload/async/", data=[item("FI_client1_FCRN", 48)], format="json")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_202_ACCEPTED)
+    assert_that(queued_jobs).is_equal_to([str(response.data["job_id"])])
+    assert_that(DailyOffering.objects.count()).is_equal_to(0)
+
+    tasks.ingest_offering_upload(queued_jobs[0])
+
+    job_status = api_client.get(response.data["status_url"])
+    assert_that(job_status.status_code).is_equal_to(status.HTTP_200_OK)
+    assert_that(job_status.data).contains_entry(
+        {"status": "succeeded"}, {"total_items": 1}, {"processed_items": 1}, {"stored_days": 2}, {"errors": []}
+    )
+    assert_that(job_status.data["trading_days"]).is_equal_to(["2025-01-16", "2025-01-17"])
+    assert_that(DailyOffering.objects.count()).is_equal_to(2)
+
+
+def test_invalid_items_are_reported_and_valid_ones_stored(settings):
+    settings.OFFERING_UPLOAD_CHUNK_SIZE = 1
+    payload = [item("FI_client1_FCRN", 24), item("FI_client2_FCRN", 10), {"reference": "FI_client3_FCRN"},
+               item("FI_client4_FCRN", 24)]
+    job = OfferingUploadJob.objects.create(payload=payload, total_items=len(payload))
+
+    tasks.ingest_offering_upload(str(job.id))
+
+    job.refresh_from_db()
+    assert_that(job.status).is_equal_to(OfferingUploadJob.Status.SUCCEEDED)
+    assert_that(job.processed_items).is_equal_to(4)
+    assert_that(job.stored_days).is_equal_to(2)
+    assert_that(job.payload).is_none()
+    assert_that([error["index"] for error in job.errors]).is_equal_to([1, 2])
+    assert_that(job.errors[0]["error"]).is_equal_to("Not enough values for day 2025-01-16")
+    assert_that(job.errors[1]["error_details"]).contains_key("startTime", "slotLength", "values")
+    assert_that(set(DailyOffering.objects.values_list("position_name", flat=True))).is_equal_to(
+        {"FI_client1_FCRN", "FI_client4_FCRN"}
+    )
+
+
+def test_invalid_envelope_returns_error(api_client, queued_jobs):
+    response = api_client.post("/api/offering/upload/async/", data={"reference": "x"}, format="json")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+    assert_that(OfferingUploadJob.objects.count()).is_equal_to(0)
+
+
+def test_empty_payload_returns_error(api_client, queued_jobs):
+    response = api_client.post("/api/offering/upload/async/", data=[], format="json")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+
+
+def test_unknown_job_returns_not_found(api_client):
+    response = api_client.get("/api/offering/upload/jobs/3f6c1d0e-3a5e-4c4b-9a3e-7e4f8e3b2a10/")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_404_NOT_FOUND)
+
+
+def test_retried_job_resumes_after_saved_progress(settings):
+    settings.OFFERING_UPLOAD_CHUNK_SIZE = 1
+    payload = [item("FI_client0_FCRN", 24), item("FI_client1_FCRN", 48), item("FI_client2_FCRN", 10)]
+    job = OfferingUploadJob.objects.create(
+        payload=payload,
+        total_items=len(payload),
+        status=OfferingUploadJob.Status.FAILED,
+        processed_items=1,
+        stored_days=1,
+        trading_days=["2025-01-16"],
+        errors=[{"index": 2, "error": "Not enough values for day 2025-01-16"}, {"error": "connection lost"}],
+    )
+
+    tasks.ingest_offering_upload(str(job.id))
+
+    job.refresh_from_db()
+    assert_that(job.status).is_equal_to(OfferingUploadJob.Status.SUCCEEDED)
+    assert_that((job.processed_items, job.stored_days)).is_equal_to((3, 3))
+    assert_that(job.trading_days).is_equal_to(["2025-01-16", "2025-01-17"])
+    assert_that(job.errors).is_equal_to(
+        [{"error": "connection lost"}, {"index": 2, "error": "Not enough values for day 2025-01-16"}]
+    )
+    assert_that(set(DailyOffering.objects.values_list("position_name", flat=True))).is_equal_to({"FI_client1_FCRN"})
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from assertpy import assert_that
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from offering.models import DailyOffering
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def url():
+    return "/api/offering/upload/stream/"
+
+
+def item(reference: str, values_count: int) -> dict:
+    return {
+        "reference": reference,
+        "unit": "MW",
+        "startTime": "2025-01-15T23:00:00Z",
+        "slotLength": 3600,
+        "values": ["1.0"] * values_count,
+    }
+
+
+def test_json_array_body(api_client, url):
+    body = json.dumps([item("FI_client1_FCRN", 48), item("FI_client2_FCRN", 24)])
+
+    response = api_client.post(url, data=body, content_type="application/json")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_201_CREATED)
+    assert_that(response.data["details"]["trading_days"]).is_length(2)
+    assert_that(DailyOffering.objects.count()).is_equal_to(3)
+
+
+def test_ndjson_body(api_client, url):
+    body = "\n".join(json.dumps(i) for i in [item("FI_client1_FCRN", 24), item("FI_client2_FCRN", 24)])
+
+    response = api_client.post(url, data=body, content_type="application/x-ndjson")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_201_CREATED)
+    assert_that(DailyOffering.objects.count()).is_equal_to(2)
+
+
+def test_invalid_item_rolls_back_stored_items(api_client, url):
+    body = json.dumps([item("FI_client1_FCRN", 24), item("FI_client2_FCRN", 10)])
+
+    response = api_client.post(url, data=body, content_type="application/json")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+    assert_that(response.data).is_equal_to({"error": "Not enough values for day 2025-01-16", "index": 1})
+    assert_that(DailyOffering.objects.count()).is_equal_to(0)
+
+
+def test_serializer_errors_are_reported(api_client, url):
+    body = json.dumps([{"reference": "FI_client1_FCRN"}])
+
+    response = api_client.post(url, data=body, content_type="application/json")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+    assert_that(response.data["error_details"]).contains_key("startTime", "slotLength", "values")
+
+
+def test_malformed_body_returns_error(api_client, url):
+    response = api_client.post(url, data='[{"reference": ', content_type="application/json")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
+    assert_that(response.data).contains_key("error")
+
+
+@pytest.mark.parametrize("body", ["", "[]"])
+def test_empty_payload_returns_error(api_client, url, body):
+    response = api_client.post(url, data=body, content_type="application/json")
+
+    assert_that(response.status_code).is_equal_to(status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from assertpy import assert_that
+
+from offering.serializers import OfferingPayloadItemSerializer
+from offering.validation import OfferingPayloadValidator
+
+
+def item(**overrides) -> dict:
+    return {
+        "reference": "FI_client1_FCRN",
+        "unit": "MW",
+        "startTime": "2025-01-15T23:00:00Z",
+        "slotLength": 3600,
+        "values": ["1.0"] * 24,
+        **overrides,
+    }
+
+
+def without(key: str) -> dict:
+    data = item()
+    del data[key]
+    return data
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        [item()],
+        [item(slotLength="3600", values=[1, 2.5, "3"])],
+        [without("unit")],
+        [without("reference"), without("startTime"), without("slotLength"), without("values")],
+        [item(reference=""), item(reference="x" * 101), item(unit="megawatts!!")],
+        [item(reference=None), item(startTime=None), item(values=None)],
+        [item(startTime="yesterday"), item(startTime=12)],
+        [item(slotLength=1234), item(slotLength="hour")],
+        [item(values="1.0"), item(values=["1.0", True, None, {}])],
+        [item(values=["", " "]), item(values=["1.0", "", "2.0"])],
+        [item(unit=None), item(unit="")],
+        [item(slotLength=3600.0), item(slotLength=True), item(slotLength=None)],
+        [item(), "not an object", item(reference="")],
+        [],
+        {"reference": "FI_client1_FCRN"},
+        "payload",
+    ],
+)
+def test_errors_match_serializer(payload):
+    serializer = OfferingPayloadItemSerializer(data=payload, many=True)
+    validator = OfferingPayloadValidator(data=payload, many=True)
+
+    assert_that(validator.is_valid()).is_equal_to(serializer.is_valid())
+    assert_that(validator.errors).is_equal_to(serializer.errors)
+
+
+def test_validated_data_contains_fixed_point_values():
+    validator = OfferingPayloadValidator(data=[item(values=[" 1.5", "2", 3])], many=True)
+
+    assert_that(validator.is_valid()).is_true()
+    data = validator.validated_data[0]
+    assert_that(data["reference"]).is_equal_to("FI_client1_FCRN")
+    assert_that(data["startTime"].isoformat()).is_equal_to("2025-01-15T23:00:00+00:00")
+    assert_that(data["values"]).is_equal_to(["1.5", "2", "3"])
+    assert_that(data["micro_values"].tolist()).is_equal_to([1_500_000, 2_000_000, 3_000_000])
+    assert_that(data["micro_values"].dtype).is_equal_to(np.dtype("<i8"))
+
+
+def test_non_numeric_values_are_reported_per_item():
+    validator = OfferingPayloadValidator(data=[item(), item(values=["1.0", "abc", "2.0", "1e999"])], many=True)
+
+    assert_that(validator.is_valid()).is_false()
+    assert_that(validator.errors).is_equal_to(
+        [{}, {"values": {1: ["Value 'abc' is not a number"], 3: ["Value '1e999' is out of range"]}}]
+    )
+    assert_that(validator.validated_data).is_empty()
+
+
+def test_errors_require_validation_first():
+    with pytest.raises(AssertionError):
+        _ = OfferingPayloadValidator(data=item()).errors
@@ -1,7 +1,23 @@
 from django.urls import path
 
-from offering.views import StoreOfferingDataView
+from offering.views import (
+    OfferingExportView,
+    OfferingListView,
+    OfferingRollupsView,
+    OfferingSlotsView,
+    OfferingUploadJobView,
+    StoreOfferingDataAsyncView,
+    StoreOfferingDataStreamView,
+    StoreOfferingDataView,
+)
 
 urlpatterns = [
     path("upload/", StoreOfferingDataView.as_view(), name="offering-upload"),
+    path("upload/stream/", StoreOfferingDataStreamView.as_view(), name="offering-upload-stream"),
+    path("upload/async/", StoreOfferingDataAsyncView.as_view(), name="offering-upload-async"),
+    path("upload/jobs/<uuid:job_id>/", OfferingUploadJobView.as_view(), name="offering-upload-job"),
+    path("offerings/", OfferingListView.as_view(), name="offering-list"),
+    path("export/<str:file_format>/", OfferingExportView.as_view(), name="offering-export"),
+    path("slots/", OfferingSlotsView.as_view(), name="offering-slots"),
+    path("rollups/", OfferingRollupsView.as_view(), name="offering-rollups"),
 ]
\ No newline at end of file
@@ -0,0 +1,151 @@
+from datetime import datetime
+from typing import Annotated, Any
+
+from django.utils.dateparse import parse_datetime
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+from common.slot_length import SlotLength
+from offering import values as fixed_point
+
+# looked up by string like DRF's ChoiceField does, so "3600" is accepted while 3600.0 and True are not
+_SLOT_LENGTHS = {str(value): value for value, _ in SlotLength.choices()}
+_DATETIME_ERROR = (
+    "Datetime has wrong format. Use one of these formats instead: YYYY-MM-DDThh:mm[:ss[.uuuuuu]][+HH:MM|-HH:MM|Z]."
+)
+
+
+class OfferingPayloadItem(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, coerce_numbers_to_str=True)
+
+    reference: str = Field(min_length=1, max_length=100)
+    # may be left out but not null, the default is not validated
+    unit: str = Field(default=None, min_length=1, max_length=10)
+    startTime: datetime
+    slotLength: int
+    values: list[Annotated[str, Field(min_length=1)]]
+
+    @field_validator("startTime", mode="before")
+    @classmethod
+    def _start_time_is_iso_8601(cls, value: Any) -> Any:
+        # same parser as DRF, pydantic would also accept unix timestamps
+        if isinstance(value, str):
+            try:
+                parsed = parse_datetime(value)
+            except ValueError:
+                parsed = None
+            if parsed is not None:
+                return parsed
+        if value is None or isinstance(value, datetime):
+            return value
+        raise ValueError("invalid datetime")
+
+    @field_validator("slotLength", mode="before")
+    @classmethod
+    def _slot_length_is_known(cls, value: Any) -> int:
+        try:
+            return _SLOT_LENGTHS[str(value)]
+        except KeyError:
+            raise ValueError("invalid choice")
+
+
+class OfferingPayloadValidator:
+    """Drop-in replacement of `OfferingPayloadItemSerializer` validation for the ingestion endpoints.
+
+    Mirrors the serializer interface (`is_valid`, `errors`, `validated_data`) and its error structure, additionally
+    checks that values are numbers and exposes them as fixed point under `micro_values`.
+    """
+
+    def __init__(self, data: Any, many: bool = False) -> None:
+        self.initial_data = data
+        self.many = many
+        self._errors: list[dict] | dict | None = None
+        self._validated_data: list[dict] | dict | None = None
+
+    def is_valid(self) -> bool:
+        if self.many:
+            if not isinstance(self.initial_data, list):
+                self._errors = {"non_field_errors": [_list_expected(self.initial_data)]}
+                self._validated_data = []
+                return False
+            results = [_validate_item(item) for item in self.initial_data]
+            self._validated_data = [data for data, _ in results]
+            self._errors = [errors for _, errors in results] if any(errors for _, errors in results) else []
+        else:
+            self._validated_data, self._errors = _validate_item(self.initial_data)
+        return not self._errors
+
+    @property
+    def errors(self) -> list[dict] | dict:
+        if self._errors is None:
+            raise AssertionError("You must call `.is_valid()` before accessing `.errors`.")
+        return self._errors
+
+    @property
+    def validated_data(self) -> list[dict] | dict:
+        if self._validated_data is None:
+            raise AssertionError("You must call `.is_valid()` before accessing `.validated_data`.")
+        return self._validated_data if not self._errors else ([] if self.many else {})
+
+
+def _validate_item(data: Any) -> tuple[dict, dict]:
+    if not isinstance(data, dict):
+        return {}, {"non_field_errors": [f"Invalid data. Expected a dictionary, but got {type(data).__name__}."]}
+    try:
+        item = OfferingPayloadItem.model_validate(data)
+    except ValidationError as e:
+        return {}, _to_drf_errors(e)
+
+    validated = item.model_dump(exclude_none=True)
+    try:
+        validated["micro_values"] = fixed_point.to_micro(item.values)
+    except ValueError:
+        return {}, {"values": _value_errors(item.values)}
+    return validated, {}
+
+
+def _value_errors(values: list[str]) -> dict[int, list[str]]:
+    """Errors of the values that are not fixed point numbers by index, like the errors of a DRF `ListField`."""
+    errors = {}
+    for index, value in enumerate(values):
+        try:
+            fixed_point.to_micro([value])
+        except ValueError as e:
+            errors[index] = [str(e)]
+    return errors
+
+
+def _to_drf_errors(error: ValidationError) -> dict:
+    errors: dict = {}
+    for detail in error.errors():
+        field, *path = detail["loc"]
+        message = _drf_message(detail)
+        if path:
+            errors.setdefault(field, {}).setdefault(path[0], []).append(message)
+        else:
+            errors.setdefault(field, []).append(message)
+    return errors
+
+
+def _drf_message(detail: dict) -> str:
+    error_type, value = detail["type"], detail.get("input")
+    if error_type == "missing":
+        return "This field is required."
+    if value is None:
+        return "This field may not be null."
+    if error_type == "string_too_short":
+        return "This field may not be blank."
+    if error_type == "string_too_long":
+        return f"Ensure this field has no more than {detail['ctx']['max_length']} characters."
+    if detail["loc"][0] == "startTime":
+        return _DATETIME_ERROR
+    if detail["loc"][0] == "slotLength":
+        return f'"{value}" is not a valid choice.'
+    if error_type == "list_type":
+        return _list_expected(value)
+    if error_type == "string_type":
+        return "Not a valid string."
+    return detail["msg"]
+
+
+def _list_expected(value: Any) -> str:
+    return f'Expected a list of items but got type "{type(value).__name__}".'
@@ -0,0 +1,69 @@
+import hashlib
+import re
+from collections.abc import Sequence
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+
+# offered volumes are stored as int64 micro-MW
+SCALE_DIGITS = 6
+SCALE = 10 ** SCALE_DIGITS
+PACKED_DTYPE = np.dtype("<i8")
+
+_PLAIN_VALUE = rf"-?\d{{1,9}}(?:\.\d{{1,{SCALE_DIGITS}}})?"
+_PLAIN_VALUES = re.compile(rf"{_PLAIN_VALUE}(?:,{_PLAIN_VALUE})*", re.ASCII)
+
+
+def to_micro(values: Sequence[str | Decimal]) -> np.ndarray:
+    # plain decimals of at most 15 significant digits are parsed exactly by float64, so the common case is
+    # validated by one regex pass and converted in bulk, anything else goes through Decimal
+    try:
+        joined = ",".join(values)
+    except TypeError:
+        return _exact_to_micro(values)
+    if joined.count(",") == len(values) - 1 and _PLAIN_VALUES.fullmatch(joined):
+        return np.rint(np.array(values, dtype=np.float64) * SCALE).astype(PACKED_DTYPE)
+    return _exact_to_micro(values)
+
+
+def _exact_to_micro(values: Sequence[str | Decimal]) -> np.ndarray:
+    micro = np.empty(len(values), dtype=PACKED_DTYPE)
+    for i, value in enumerate(values):
+        try:
+            scaled = Decimal(value).scaleb(SCALE_DIGITS)
+        except InvalidOperation:
+            raise ValueError(f"Value '{value}' is not a number")
+        if not scaled.is_finite():
+            raise ValueError(f"Value '{value}' is not a number")
+        if scaled != scaled.to_integral_value():
+            raise ValueError(f"Value '{value}' has more than {SCALE_DIGITS} decimal places")
+        try:
+            micro[i] = int(scaled)
+        except OverflowError:
+            raise ValueError(f"Value '{value}' is out of range")
+    return micro
+
+
+def pack(values: Sequence[str | Decimal] | np.ndarray) -> bytes:
+    if isinstance(values, np.ndarray):
+        return values.astype(PACKED_DTYPE, copy=False).tobytes()
+    return to_micro(values).tobytes()
+
+
+def unpack(data: bytes | memoryview) -> np.ndarray:
+    return np.frombuffer(data, dtype=PACKED_DTYPE)
+
+
+def content_hash(position_name: str, day: date, slot_length: int, micro_values: np.ndarray) -> str:
+    digest = hashlib.sha256(f"{position_name}\x00{day.isoformat()}\x00{slot_length}\x00".encode())
+    digest.update(micro_values.astype(PACKED_DTYPE, copy=False).tobytes())
+    return digest.hexdigest()
+
+
+def from_micro(micro: int) -> Decimal:
+    return Decimal(micro).scaleb(-SCALE_DIGITS)
+
+
+def micro_to_decimals(micro: np.ndarray) -> list[Decimal]:
+    return [from_micro(v) for v in micro.tolist()]
@@ -1,19 +1,59 @@
-import arrow
-import pytz
+import hashlib
+import itertools
+
 import structlog
 from django.db import transaction
+from django.db.models import Case, F, JSONField, When
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.views import APIView
 
-from common.time_slot import TimeSlot
-from offering.models import DailyOffering
-from offering.serializers import OfferingPayloadItemSerializer, StoreOfferingResponseSerializer
+from common.json_stream import JSONStreamError, iter_json_array, iter_ndjson
+from offering.idempotency import IDEMPOTENCY_KEY_HEADER, idempotent
+from offering.ingestion import split_into_days, store_offering_days
+from offering import values as fixed_point
+from offering.export import EXPORT_FORMATS, export_offerings, iter_arrow, iter_csv, iter_days
+from offering.models import DailyOffering, OfferingSlot, OfferingUploadJob
+from offering.pagination import InvalidCursor, keyset_page
+from offering.rollups import aggregate
+from offering.serializers import (
+    OfferingFilterSerializer,
+    OfferingListQuerySerializer,
+    OfferingListResponseSerializer,
+    OfferingPayloadItemSerializer,
+    OfferingRollupQuerySerializer,
+    OfferingRollupsResponseSerializer,
+    OfferingSerializer,
+    OfferingSlotQuerySerializer,
+    OfferingSlotsResponseSerializer,
+    OfferingUploadAcceptedSerializer,
+    OfferingUploadJobSerializer,
+    StoreOfferingResponseSerializer,
+)
+from offering.tasks import ingest_offering_upload
+from offering.validation import OfferingPayloadValidator
 
 log = structlog.get_logger("offering")
 
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+
+OFFERING_FILTERS = ("position", "date_from", "date_to", "slot_length", "country", "client", "product")
+
+idempotency_key_parameter = openapi.Parameter(
+    IDEMPOTENCY_KEY_HEADER,
+    openapi.IN_HEADER,
+    description="Retries with the same key and payload return the response of the first successful request.",
+    type=openapi.TYPE_STRING,
+    required=False,
+)
+
 
 # Create your views here.
 
@@ -22,6 +62,7 @@ class StoreOfferingDataView(APIView):
     @swagger_auto_schema(
         operation_summary="Store Daily Offering Data",
         request_body=OfferingPayloadItemSerializer(many=True),
+        manual_parameters=[idempotency_key_parameter],
         responses={
             201: openapi.Response(description="Data stored successfully.", schema=StoreOfferingResponseSerializer),
             400: openapi.Response(description="Invalid input data."),
@@ -63,55 +104,293 @@ class StoreOfferingDataView(APIView):
             ]
         },
     )
+    @idempotent
     def post(self, request, *args, **kwargs):
-        serializer = OfferingPayloadItemSerializer(data=request.data, many=True)
-        trading_days = set()
-        if not serializer.is_valid():
+        validator = OfferingPayloadValidator(data=request.data, many=True)
+        if not validator.is_valid():
             return Response(
-                {"error_details": serializer.errors, "error": "serialisation error"}, status=status.HTTP_400_BAD_REQUEST
+                {"error_details": validator.errors, "error": "serialisation error"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        if not serializer.validated_data:
+        if not validator.validated_data:
             return Response({"error": "Empty payload not allowed"}, status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
-            for item_data in serializer.validated_data:
-                try:
-                    trading_days |= self._process_offering_data(item_data)
-                except ValueError as e:
-                    log.error(e)
-                    return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        offering_days = []
+        try:
+            for item_data in validator.validated_data:
+                offering_days += split_into_days(
+                    item_data["reference"],
+                    item_data["startTime"],
+                    item_data["slotLength"],
+                    item_data["values"],
+                    item_data["micro_values"],
+                )
+            with transaction.atomic():
+                store_offering_days(offering_days)
+        except ValueError as e:
+            log.error(e)
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        trading_days = {day.date for day in offering_days}
         return Response(
             {"message": "Data stored successfully", "details": {"trading_days": sorted(trading_days)}},
             status=status.HTTP_201_CREATED,
         )
 
-    def _process_offering_data(self, item_data):
+
+class StoreOfferingDataAsyncView(APIView):
+    @swagger_auto_schema(
+        operation_summary="Store Daily Offering Data asynchronously",
+        request_body=OfferingPayloadItemSerializer(many=True),
+        manual_parameters=[idempotency_key_parameter],
+        responses={
+            202: openapi.Response(description="Upload accepted.", schema=OfferingUploadAcceptedSerializer),
+            400: openapi.Response(description="Invalid envelope."),
+        },
+    )
+    @idempotent
+    def post(self, request, *args, **kwargs):
+        payload = request.data
+        if not isinstance(payload, list) or not all(isinstance(item, dict) for item in payload):
+            return Response({"error": "Payload must be a list of objects"}, status=status.HTTP_400_BAD_REQUEST)
+        if not payload:
+            return Response({"error": "Empty payload not allowed"}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = OfferingUploadJob.objects.create(payload=payload, total_items=len(payload))
+        transaction.on_commit(lambda: ingest_offering_upload.delay(str(job.id)))
+        return Response(
+            {
+                "job_id": job.id,
+                "status_url": reverse("offering-upload-job", kwargs={"job_id": job.id}, request=request),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class StoreOfferingDataStreamView(APIView):
+    @swagger_auto_schema(
+        operation_summary="Store Daily Offering Data from a streamed JSON array or NDJSON body",
+        request_body=OfferingPayloadItemSerializer(many=True),
+        responses={
+            201: openapi.Response(description="Data stored successfully.", schema=StoreOfferingResponseSerializer),
+            400: openapi.Response(description="Invalid input data."),
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        stream = request.stream
+        if stream is None:
+            return Response({"error": "Empty payload not allowed"}, status=status.HTTP_400_BAD_REQUEST)
+        if request.content_type.split(";")[0].strip() in NDJSON_CONTENT_TYPES:
+            items = iter_ndjson(stream)
+        else:
+            items = iter_json_array(stream)
+
         trading_days = set()
-        start_time_cet = arrow.get(item_data["startTime"]).to(pytz.timezone("CET"))
-        slot_length = item_data["slotLength"]
-        values = item_data["values"]
-        position_name = item_data["reference"]
+        with transaction.atomic():
+            error = self._store_items(items, trading_days)
+            if error is not None:
+                transaction.set_rollback(True)
+                return Response(error, status=status.HTTP_400_BAD_REQUEST)
+
+        if not trading_days:
+            return Response({"error": "Empty payload not allowed"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"message": "Data stored successfully", "details": {"trading_days": sorted(trading_days)}},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def _store_items(self, items, trading_days: set) -> dict | None:
+        index = 0
+        try:
+            for index, item in enumerate(items):
+                validator = OfferingPayloadValidator(data=item)
+                if not validator.is_valid():
+                    return {"error_details": validator.errors, "error": "serialisation error", "index": index}
+                item_data = validator.validated_data
+                days = split_into_days(
+                    item_data["reference"],
+                    item_data["startTime"],
+                    item_data["slotLength"],
+                    item_data["values"],
+                    item_data["micro_values"],
+                )
+                store_offering_days(days)
+                trading_days.update(day.date for day in days)
+        except JSONStreamError as e:
+            log.error(e)
+            return {"error": str(e)}
+        except ValueError as e:
+            log.error(e)
+            return {"error": str(e), "index": index}
+        return None
+
+
+class OfferingUploadJobView(APIView):
+    @swagger_auto_schema(
+        operation_summary="Asynchronous upload status",
+        responses={200: OfferingUploadJobSerializer, 404: openapi.Response(description="Unknown job.")},
+    )
+    def get(self, request, job_id, *args, **kwargs):
+        job = get_object_or_404(OfferingUploadJob.objects.defer("payload"), pk=job_id)
+        return Response(OfferingUploadJobSerializer(job).data)
+
+
+class OfferingSlotsView(APIView):
+    @swagger_auto_schema(
+        operation_summary="Offered values of a position per slot within a time range",
+        query_serializer=OfferingSlotQuerySerializer,
+        responses={200: OfferingSlotsResponseSerializer, 400: openapi.Response(description="Invalid query.")},
+    )
+    def get(self, request, *args, **kwargs):
+        query = OfferingSlotQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(
+                {"error_details": query.errors, "error": "serialisation error"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        position_name, start, end = (query.validated_data[k] for k in ("position", "start", "end"))
+        slots = OfferingSlot.objects.between(position_name, start, end).values_list("slot_start", "slot_length", "value")
+        return Response(
+            {
+                "position_name": position_name,
+                "slots": [
+                    {"start": slot_start, "slot_length": slot_length, "value": str(fixed_point.from_micro(value))}
+                    for slot_start, slot_length, value in slots
+                ],
+            }
+        )
+
+
+class OfferingRollupsView(APIView):
+    @swagger_auto_schema(
+        operation_summary="Offered volume per slot summed by country, product or client",
+        query_serializer=OfferingRollupQuerySerializer,
+        responses={200: OfferingRollupsResponseSerializer, 400: openapi.Response(description="Invalid query.")},
+    )
+    def get(self, request, *args, **kwargs):
+        query = OfferingRollupQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(
+                {"error_details": query.errors, "error": "serialisation error"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = query.validated_data
+        rows = aggregate(
+            params["by"], params["start"], params["end"], params["slot_length"],
+            **{k: params.get(k) for k in ("country", "product", "client")},
+        )
+        return Response(
+            {
+                "slot_length": params["slot_length"],
+                "results": [
+                    {
+                        **{k: row[k] for k in ("country", "product", "client") if k in row},
+                        "start": row["slot_start"],
+                        "total": str(fixed_point.from_micro(row["total"])),
+                        "count": row["count"],
+                        "min": str(fixed_point.from_micro(row["min_value"])),
+                        "max": str(fixed_point.from_micro(row["max_value"])),
+                    }
+                    for row in rows
+                ],
+            }
+        )
+
+
+class OfferingListView(APIView):
+    @swagger_auto_schema(
+        operation_summary="Offerings with their current values",
+        query_serializer=OfferingListQuerySerializer,
+        responses={
+            200: OfferingListResponseSerializer,
+            304: openapi.Response(description="Not modified since the ETag / Last-Modified sent."),
+            400: openapi.Response(description="Invalid query."),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        query = OfferingListQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(
+                {"error_details": query.errors, "error": "serialisation error"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        params = query.validated_data
+
+        offerings = (
+            DailyOffering.objects.matching(**{k: params.get(k) for k in OFFERING_FILTERS})
+            .select_related("current_entry")
+            .defer("current_entry__values")
+            # the JSON values are read only for entries stored before values were packed
+            .annotate(
+                unpacked_values=Case(
+                    When(current_entry__packed_values__isnull=True, then=F("current_entry__values")),
+                    output_field=JSONField(),
+                )
+            )
+        )
+        try:
+            page, next_cursor = keyset_page(offerings, params.get("cursor"), params["page_size"])
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        current_time = start_time_cet
-        value_index = 0
+        # versions change with every stored entry, so they identify the page content without serializing it
+        etag = quote_etag(
+            hashlib.sha256(
+                repr([next_cursor, *((o.id, o.version, o.current_entry_id) for o in page)]).encode()
+            ).hexdigest()
+        )
+        entry_times = [o.current_entry.created_at for o in page if o.current_entry is not None]
+        last_modified = int(max(entry_times).timestamp()) if entry_times else None
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return self._with_validators(not_modified, etag, last_modified)
 
-        while value_index < len(values):
-            current_date = current_time.date()
-            trading_days.add(current_date)
-            day_slot = TimeSlot.at(current_date, tz="CET")
-            hours_in_day = len(day_slot.split(slot_length))
+        for offering in page:
+            if offering.current_entry is not None and offering.current_entry.packed_values is None:
+                offering.current_entry.values = offering.unpacked_values
 
-            if value_index + hours_in_day > len(values):
-                raise ValueError(f"Not enough values for day {current_date}")
+        next_url = None
+        if next_cursor is not None:
+            next_query = request.query_params.copy()
+            next_query["cursor"] = next_cursor
+            next_url = request.build_absolute_uri(f"{request.path}?{next_query.urlencode()}")
+        response = Response({"results": OfferingSerializer(page, many=True).data, "next": next_url})
+        return self._with_validators(response, etag, last_modified)
 
-            day_values = values[value_index : value_index + hours_in_day]
+    @staticmethod
+    def _with_validators(response, etag: str, last_modified: int | None):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
 
-            daily_offering, _ = DailyOffering.objects.get_or_create(position_name=position_name, date=current_date)
 
-            daily_offering.add_entry(slot_length, day_values)
+class OfferingExportView(APIView):
+    @swagger_auto_schema(
+        operation_summary="Streamed export of current offering values per UTC slot as CSV or Arrow IPC stream",
+        query_serializer=OfferingFilterSerializer,
+        responses={200: openapi.Response(description="CSV or Arrow IPC stream."), 400: "Invalid query."},
+    )
+    def get(self, request, file_format: str, *args, **kwargs):
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Format must be one of: {', '.join(EXPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        query = OfferingFilterSerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(
+                {"error_details": query.errors, "error": "serialisation error"}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-            value_index += hours_in_day
-            current_time = current_time.shift(days=1).replace(hour=0, minute=0, second=0, microsecond=0)
+        offerings = export_offerings(DailyOffering.objects.matching(**query.validated_data))
+        days = iter_days(offerings)
+        try:
+            content = iter_csv(days) if file_format == "csv" else iter_arrow(days)
+            first_chunk = next(content)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        return trading_days
+        response = StreamingHttpResponse(
+            itertools.chain([first_chunk], content), content_type=EXPORT_FORMATS[file_format]
+        )
+        response["Content-Disposition"] = f'attachment; filename="offerings.{file_format}"'
+        return response
@@ -0,0 +1,8 @@
+from django.contrib import admin
+
+from simulation.models import Demand, SimulationRun
+
+# Register your models here.
+
+admin.site.register(Demand)
+admin.site.register(SimulationRun)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class SimulationConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'simulation'
+
+    def ready(self):
+        from simulation import signals  # noqa: F401
@@ -0,0 +1,41 @@
+import numpy as np
+
+from simulation.models import ClearingMethod
+
+# offers are (slots, positions) and demand (slots,) int64 micro-MW matrices, every slot is cleared independently
+
+
+def clear_pro_rata(offers: np.ndarray, demand: np.ndarray) -> np.ndarray:
+    """Accepts the same share of every offer in a slot, all of them when the slot's demand covers the total.
+
+    Accepted volumes are rounded down to the micro-MW, so a slot never accepts more than its demand.
+    """
+    offers = np.maximum(offers, 0)
+    offered = offers.sum(axis=1)
+    demand = np.maximum(demand, 0)
+    short = offered > demand
+    ratio = np.ones(len(offered))
+    np.divide(demand, offered, out=ratio, where=short)
+    accepted = np.floor(offers * ratio[:, None]).astype(offers.dtype)
+    return np.where(short[:, None], np.minimum(accepted, offers), offers)
+
+
+def clear_merit_order(offers: np.ndarray, demand: np.ndarray, priority: np.ndarray) -> np.ndarray:
+    """Fills the demand of every slot with whole offers in ascending `priority`, the last one accepted partially."""
+    offers = np.maximum(offers, 0)
+    order = np.argsort(priority, kind="stable")
+    ranked = offers[:, order]
+    ahead = np.cumsum(ranked, axis=1) - ranked
+    accepted = np.empty_like(ranked)
+    accepted[:, order] = np.clip(np.maximum(demand, 0)[:, None] - ahead, 0, ranked)
+    return accepted
+
+
+def clear(method: str, offers: np.ndarray, demand: np.ndarray, priority: np.ndarray) -> np.ndarray:
+    if offers.shape[0] != len(demand):
+        raise ValueError(f"Demand has {len(demand)} slots, offers have {offers.shape[0]}")
+    if method == ClearingMethod.PRO_RATA:
+        return clear_pro_rata(offers, demand)
+    if method == ClearingMethod.MERIT_ORDER:
+        return clear_merit_order(offers, demand, priority)
+    raise ValueError(f"Unknown clearing method: {method}")
@@ -0,0 +1,374 @@
+import io
+import json
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, replace
+from datetime import date
+
+import numpy as np
+import structlog
+from django.db import transaction
+from django.utils import timezone
+from more_itertools import chunked
+
+from common import const
+from common.db import bulk_insert
+from common.trading_calendar import trading_day
+from offering import values as fixed_point
+from offering.models import DailyOffering
+from rules.models import SaleDefinition
+from simulation.clearing import clear
+from simulation.models import AcceptedOffer, ClearingMethod, Demand, MarketClearing, SimulationRun
+
+log = structlog.get_logger("simulation")
+
+BATCH_SIZE = 5000
+
+BookKey = tuple[str, int]
+
+
+@dataclass(frozen=True)
+class OrderBook:
+    """Current offers of the positions whose product is `market` on a delivery day, one column per position.
+
+    `accepted` is the volume accepted from each position by the earlier sales of the day, `cleared` the part of it
+    accepted by the run that stored the book.
+    """
+
+    market: str
+    slot_length: int
+    offering_ids: np.ndarray
+    entry_ids: np.ndarray
+    offers: np.ndarray
+    accepted: np.ndarray
+    cleared: np.ndarray | None = None
+
+    @classmethod
+    def empty(cls, market: str, slot_length: int, slot_count: int) -> "OrderBook":
+        no_ids = np.empty(0, dtype=np.int64)
+        no_values = np.empty((slot_count, 0), dtype=fixed_point.PACKED_DTYPE)
+        return cls(market, slot_length, no_ids, no_ids, no_values, no_values)
+
+    def residual(self) -> np.ndarray:
+        """Offered volume not accepted yet, a position lowering its offer below its accepted volume offers none."""
+        return np.maximum(np.maximum(self.offers, 0) - self.accepted, 0)
+
+    def with_offers(self, offering_ids: Sequence[int], entry_ids: Sequence[int], offers: np.ndarray) -> "OrderBook":
+        """Replaces the offers of known positions and appends new ones, accepted volume stays with its position."""
+        columns = {offering_id: i for i, offering_id in enumerate(self.offering_ids.tolist())}
+        known = [(columns[o], i) for i, o in enumerate(offering_ids) if o in columns]
+        new = [i for i, o in enumerate(offering_ids) if o not in columns]
+
+        entry_column = self.entry_ids.copy()
+        offer_matrix = self.offers.copy()
+        if known:
+            book_columns, changed = (list(c) for c in zip(*known))
+            entry_column[book_columns] = np.asarray(entry_ids)[changed]
+            offer_matrix[:, book_columns] = offers[:, changed]
+        no_values = np.zeros((len(offer_matrix), len(new)), dtype=self.accepted.dtype)
+        return replace(
+            self,
+            offering_ids=np.concatenate([self.offering_ids, np.asarray(offering_ids, dtype=np.int64)[new]]),
+            entry_ids=np.concatenate([entry_column, np.asarray(entry_ids, dtype=np.int64)[new]]),
+            offers=np.hstack([offer_matrix, offers[:, new]]),
+            accepted=np.hstack([self.accepted, no_values]),
+            cleared=None if self.cleared is None else np.hstack([self.cleared, no_values]),
+        )
+
+    def without(self, offering_ids: set[int]) -> "OrderBook":
+        """Drops the offers of positions that moved to another order book, their accepted volume is kept."""
+        moved = np.isin(self.offering_ids, list(offering_ids))
+        if not moved.any():
+            return self
+        offers = self.offers.copy()
+        offers[:, moved] = 0
+        return replace(self, offers=offers)
+
+
+@dataclass(frozen=True)
+class SaleState:
+    """What the sales of a delivery day know about its offers, passed from one sale to the next.
+
+    Offerings whose current entry is not the one in their order book are read again before the next sale,
+    everything else is taken from the state, so a later sale does not re-read and re-decode the offers of the whole
+    day. A run stores the state of every order book with its `MarketClearing`.
+    """
+
+    day: date
+    books: dict[BookKey, OrderBook]
+
+    def entries(self) -> set[tuple[int, int]]:
+        """(offering id, entry id) pairs the order books hold offers of."""
+        return {
+            pair
+            for book in self.books.values()
+            for pair in zip(book.offering_ids.tolist(), book.entry_ids.tolist())
+        }
+
+    def to_bytes(self) -> bytes:
+        keys = sorted(self.books)
+        arrays = {}
+        for i, key in enumerate(keys):
+            book = self.books[key]
+            arrays.update({
+                f"{i}_offering_ids": book.offering_ids,
+                f"{i}_entry_ids": book.entry_ids,
+                f"{i}_offers": book.offers,
+                f"{i}_accepted": book.accepted,
+            })
+            if book.cleared is not None:
+                arrays[f"{i}_cleared"] = book.cleared
+        meta = {"day": self.day.isoformat(), "keys": keys}
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, meta=np.array(json.dumps(meta)), **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SaleState":
+        with np.load(io.BytesIO(data)) as arrays:
+            meta = json.loads(str(arrays["meta"]))
+            books = {
+                (market, slot_length): OrderBook(
+                    market,
+                    slot_length,
+                    arrays[f"{i}_offering_ids"],
+                    arrays[f"{i}_entry_ids"],
+                    arrays[f"{i}_offers"],
+                    arrays[f"{i}_accepted"],
+                    arrays[f"{i}_cleared"] if f"{i}_cleared" in arrays else None,
+                )
+                for i, (market, slot_length) in enumerate(meta["keys"])
+            }
+        return cls(date.fromisoformat(meta["day"]), books)
+
+    @classmethod
+    def merge(cls, day: date, parts: Iterable["SaleState"]) -> "SaleState":
+        """One state of the order books of `parts`."""
+        return cls(day, {key: book for part in parts for key, book in part.books.items()})
+
+    def only(self, keys: Iterable[BookKey]) -> "SaleState":
+        return SaleState(self.day, {key: self.books[key] for key in keys})
+
+
+OfferRows = dict[BookKey, tuple[list[int], list[int], list[bytes]]]
+
+
+def _read_offers(day: date, markets: set[str], known: set[tuple[int, int]] | None = None) -> OfferRows:
+    """Packed current offers of `markets` grouped by order book, except the (offering id, entry id) pairs in `known`.
+
+    Entry ids are assigned at insert, not at commit, so an entry committed after a state was taken can be older than
+    entries the state holds. Changed offerings are therefore found by comparing every current entry with `known`,
+    only their packed values are read.
+    """
+    offerings = DailyOffering.objects.current_on(day).filter(
+        product__in=markets, current_entry__packed_values__isnull=False
+    )
+    columns = ("product", "current_entry__slot_length", "id", "current_entry_id", "current_entry__packed_values")
+    if known is None:
+        rows = offerings.order_by("id").values_list(*columns)
+    else:
+        current = offerings.order_by("id").values_list("id", "current_entry_id")
+        changed = [offering_id for offering_id, entry_id in current if (offering_id, entry_id) not in known]
+        rows = (
+            row
+            for batch in chunked(changed, BATCH_SIZE)
+            for row in offerings.filter(id__in=batch).order_by("id").values_list(*columns)
+        )
+    grouped: OfferRows = defaultdict(lambda: ([], [], []))
+    for product, slot_length, offering_id, entry_id, packed_values in rows:
+        offering_ids, entry_ids, packed = grouped[(product, slot_length)]
+        offering_ids.append(offering_id)
+        entry_ids.append(entry_id)
+        packed.append(bytes(packed_values))
+    return grouped
+
+
+def _decode(day: date, slot_length: int, packed: list[bytes]) -> np.ndarray:
+    slot_count = trading_day(day, slot_length, tz=const.trading_timezone_name).slot_count
+    return np.ascontiguousarray(fixed_point.unpack(b"".join(packed)).reshape(len(packed), slot_count).T)
+
+
+def load_order_books(day: date, keys: Iterable[tuple[str, int]]) -> dict[tuple[str, int], OrderBook]:
+    """Order books of (market, slot length) keys, decoded from the packed values of the current entries at once."""
+    return load_state(day, keys).books
+
+
+def load_state(day: date, keys: Iterable[BookKey]) -> SaleState:
+    keys = set(keys)
+    grouped = _read_offers(day, {market for market, _ in keys})
+    books = {}
+    for market, slot_length in keys:
+        slot_count = trading_day(day, slot_length, tz=const.trading_timezone_name).slot_count
+        book = OrderBook.empty(market, slot_length, slot_count)
+        if (market, slot_length) in grouped:
+            offering_ids, entry_ids, packed = grouped[(market, slot_length)]
+            book = book.with_offers(offering_ids, entry_ids, _decode(day, slot_length, packed))
+        books[(market, slot_length)] = book
+    return SaleState(day, books)
+
+
+def refresh_state(state: SaleState, keys: Iterable[BookKey]) -> SaleState:
+    """Brings `state` up to date with the entries stored since it was taken and adds order books of new keys.
+
+    Only offerings of the markets of `state` and `keys` are read.
+    """
+    keys = set(keys)
+    books = dict(state.books)
+    if books:
+        grouped = _read_offers(state.day, {market for market, _ in books}, state.entries())
+        for key, (offering_ids, entry_ids, packed) in grouped.items():
+            # a position offering another slot length than before leaves its order book
+            moved = set(offering_ids)
+            for other in books.keys() - {key}:
+                books[other] = books[other].without(moved)
+            if key in books:
+                books[key] = books[key].with_offers(offering_ids, entry_ids, _decode(state.day, key[1], packed))
+
+    missing = keys - books.keys()
+    if missing:
+        # markets that got a demand after the previous sale have no order book yet
+        books.update(load_state(state.day, missing).books)
+    return SaleState(state.day, books)
+
+
+def previous_run(day: date, sale: SaleDefinition | None) -> int | None:
+    """Run of the closest earlier sale of the delivery day, the run of `sale` continues from its state."""
+    if sale is None:
+        return None
+    return (
+        SimulationRun.objects.filter(date=day, sale__days_offset__gt=sale.days_offset, finished_at__isnull=False)
+        .order_by("-sale__days_offset", "-id")
+        .values_list("id", flat=True)
+        .first()
+    )
+
+
+def state_after(run_id: int | None, day: date, markets: Iterable[str] | None = None) -> SaleState:
+    """State a run left for the order books of `markets` (all by default), decoding only their clearings."""
+    if run_id is None:
+        return SaleState(day, {})
+    clearings = MarketClearing.objects.filter(run_id=run_id, state__isnull=False)
+    if markets is not None:
+        clearings = clearings.filter(market__in=list(markets))
+    states = clearings.values_list("state", flat=True)
+    return SaleState.merge(day, (SaleState.from_bytes(bytes(data)) for data in states))
+
+
+def build_accepted_offers(run_id: int, book: OrderBook, accepted: np.ndarray,
+                          columns: np.ndarray) -> list[AcceptedOffer]:
+    """Rows of the volume accepted from the positions of the `columns` mask that got any."""
+    columns = columns & accepted.any(axis=0)
+    return [
+        AcceptedOffer(
+            run_id=run_id,
+            market_id=book.market,
+            offering_id=offering_id,
+            entry_id=entry_id,
+            packed_values=values.tobytes(),
+        )
+        for offering_id, entry_id, values in zip(
+            book.offering_ids[columns].tolist(),
+            book.entry_ids[columns].tolist(),
+            np.ascontiguousarray(accepted.T[columns]),
+        )
+    ]
+
+
+def clear_market(run: SimulationRun, demands: Sequence[Demand], state: SaleState, method: str) -> tuple[SaleState, int]:
+    """Clears the order books of `demands` of one market and stores the results, returns their state after the run.
+
+    The offers not accepted by earlier sales are cleared against the demand they left.
+    """
+    books = {}
+    clearings, accepted_offers = [], []
+    for demand in demands:
+        key = (demand.market_id, demand.slot_length)
+        book = state.books[key]
+        residual = book.residual()
+        remaining_demand = np.maximum(demand.micro_values() - book.accepted.sum(axis=1), 0)
+        accepted = clear(method, residual, remaining_demand, book.entry_ids)
+        books[key] = replace(book, accepted=book.accepted + accepted, cleared=accepted)
+
+        clearings.append(
+            MarketClearing(
+                run=run,
+                market_id=demand.market_id,
+                slot_length=demand.slot_length,
+                demand=fixed_point.pack(remaining_demand),
+                offered=fixed_point.pack(residual.sum(axis=1)),
+                accepted=fixed_point.pack(accepted.sum(axis=1)),
+                state=SaleState(state.day, {key: books[key]}).to_bytes(),
+            )
+        )
+        accepted_offers.extend(build_accepted_offers(run.pk, book, accepted, accepted.any(axis=0)))
+    with transaction.atomic():
+        MarketClearing.objects.bulk_create(clearings)
+        bulk_insert(AcceptedOffer, accepted_offers, BATCH_SIZE)
+    return SaleState(state.day, books), len(accepted_offers)
+
+
+def market_demands(day: date, markets: Iterable[str] | None = None) -> dict[str, list[Demand]]:
+    demands = Demand.objects.filter(date=day).order_by("market_id", "slot_length")
+    if markets is not None:
+        demands = demands.filter(market__in=list(markets))
+    grouped = defaultdict(list)
+    for demand in demands:
+        grouped[demand.market_id].append(demand)
+    return grouped
+
+
+def simulate_market(run: SimulationRun, market: str, previous_run_id: int | None) -> int:
+    """Clears one market of `run` reading only its offerings and its part of the previous sale's state."""
+    demands = market_demands(run.date, [market])[market]
+    state = refresh_state(
+        state_after(previous_run_id, run.date, [market]),
+        {(demand.market_id, demand.slot_length) for demand in demands},
+    )
+    _, offers = clear_market(run, demands, state, run.method)
+    return offers
+
+
+def simulate_round(state: SaleState, method: str = ClearingMethod.PRO_RATA, sale: SaleDefinition | None = None,
+                   previous_run_id: int | None = None) -> tuple[SimulationRun, SaleState]:
+    """Clears every market with a demand on the day of `state` one after the other, returns the next state."""
+    day = state.day
+    demands = market_demands(day)
+    state = refresh_state(state, {(d.market_id, d.slot_length) for market in demands.values() for d in market})
+
+    with transaction.atomic():
+        run = SimulationRun.objects.create(date=day, method=method, sale=sale, previous_id=previous_run_id)
+        parts, offers = [], 0
+        for market_demand in demands.values():
+            part, count = clear_market(
+                run, market_demand, state.only((d.market_id, d.slot_length) for d in market_demand), method
+            )
+            parts.append(part)
+            offers += count
+        run.finished_at = timezone.now()
+        run.save(update_fields=["finished_at"])
+
+    log.info("trading simulated", date=day.isoformat(), method=method, sale=sale and sale.name,
+             markets=len(demands), offers=offers)
+    return run, SaleState.merge(day, parts) if parts else state
+
+
+def simulate_trading_on(day: date, method: str = ClearingMethod.PRO_RATA,
+                        sale: SaleDefinition | None = None) -> SimulationRun:
+    """Clears the current offers of every market with a demand on `day`, all slots of a market in one step.
+
+    A sale following an earlier sale of the same delivery day continues from the state that sale left.
+    """
+    previous_run_id = previous_run(day, sale)
+    run, _ = simulate_round(state_after(previous_run_id, day), method, sale, previous_run_id)
+    return run
+
+
+def simulate_sales(day: date, sales: Sequence[SaleDefinition],
+                   method: str = ClearingMethod.PRO_RATA) -> list[SimulationRun]:
+    """Runs the sales of a delivery day in order, each one clearing what the earlier ones left."""
+    state = SaleState(day, {})
+    runs = []
+    for sale in sorted(sales, key=lambda s: -s.days_offset):
+        run, state = simulate_round(state, method, sale, runs[-1].pk if runs else None)
+        runs.append(run)
+    return runs
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from simulation.models import SimulationRun
+from simulation.resimulation import resimulate
+
+
+class Command(BaseCommand):
+    help = "Brings a simulation run up to date with the offerings stored since, clearing only the changed slots."
+
+    def add_arguments(self, parser):
+        parser.add_argument("run_id", type=int)
+        parser.add_argument(
+            "--verify", action="store_true", help="Compare with clearing every slot, store nothing when they differ."
+        )
+
+    def handle(self, *args, run_id: int, verify: bool, **options):
+        run = SimulationRun.objects.filter(pk=run_id).first()
+        if run is None:
+            raise CommandError(f"Simulation run {run_id} does not exist")
+        try:
+            result = resimulate(run, verify)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Simulation run {run.pk}: {result.slots} slots cleared again, {result.offers} offers changed"
+            )
+        )
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rules.models import SaleDefinition
+from simulation.engine import simulate_sales, simulate_trading_on
+from simulation.models import ClearingMethod
+
+
+class Command(BaseCommand):
+    help = "Clears the current offers of a delivery day against the demand of every market and stores the results."
+
+    def add_arguments(self, parser):
+        parser.add_argument("date", type=date.fromisoformat)
+        parser.add_argument("--method", choices=ClearingMethod.values, default=ClearingMethod.PRO_RATA)
+        parser.add_argument(
+            "--sales", action="store_true", help="Run every sale definition in turn, each clearing what earlier left."
+        )
+
+    def handle(self, *args, date: date, method: str, sales: bool, **options):
+        try:
+            if sales:
+                runs = simulate_sales(date, list(SaleDefinition.objects.all()), method)
+            else:
+                runs = [simulate_trading_on(date, method)]
+        except ValueError as e:
+            raise CommandError(str(e))
+        for run in runs:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Simulation run {run.pk}: {run.accepted_offers.count()} offers in {run.clearings.count()} markets"
+                )
+            )
@@ -0,0 +1,13 @@
+from prometheus_client import Counter, Histogram
+
+sale_start_lag = Histogram(
+    "simulation_sale_start_lag_seconds",
+    "Delay between the gate close of a sale and the start of its simulation",
+    ["sale"],
+    buckets=(0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, float("inf")),
+)
+sale_results_late = Counter(
+    "simulation_sale_results_late_total",
+    "Sales whose simulation had not finished at their result time",
+    ["sale"],
+)
@@ -0,0 +1,67 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('offering', '0010_dailyoffering_identity'),
+        ('rules', '0002_saledefinition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Demand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slot_length', models.IntegerField(choices=[(3600, 'HOUR'), (1900, 'QUARTER')], default=3600)),
+                ('packed_values', models.BinaryField()),
+                ('market', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='demands', to='rules.market')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('market', 'date', 'slot_length'), name='simulation_demand_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SimulationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('method', models.CharField(choices=[('pro_rata', 'Pro Rata'), ('merit_order', 'Merit Order')], default='pro_rata', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MarketClearing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot_length', models.IntegerField(choices=[(3600, 'HOUR'), (1900, 'QUARTER')])),
+                ('demand', models.BinaryField()),
+                ('offered', models.BinaryField()),
+                ('accepted', models.BinaryField()),
+                ('market', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='rules.market')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clearings', to='simulation.simulationrun')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('run', 'market', 'slot_length'), name='simulation_clearing_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AcceptedOffer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('packed_values', models.BinaryField()),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='offering.dailyofferingentry')),
+                ('market', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='rules.market')),
+                ('offering', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='offering.dailyoffering')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accepted_offers', to='simulation.simulationrun')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('run', 'offering'), name='simulation_accepted_offer_unique')],
+            },
+        ),
+    ]
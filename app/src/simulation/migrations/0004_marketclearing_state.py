@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulation', '0003_simulationrun_state'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='simulationrun',
+            name='state',
+        ),
+        migrations.AddField(
+            model_name='marketclearing',
+            name='state',
+            field=models.BinaryField(editable=False, null=True),
+        ),
+    ]
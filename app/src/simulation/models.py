@@ -0,0 +1,91 @@
+from collections.abc import Sequence
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from django.db import models
+
+from common.slot_length import SlotLength
+from offering import values as fixed_point
+from offering.models import DailyOffering, DailyOfferingEntry
+from rules.models import Market, SaleDefinition
+
+
+class ClearingMethod(models.TextChoices):
+    PRO_RATA = "pro_rata"
+    MERIT_ORDER = "merit_order"
+
+
+class Demand(models.Model):
+    """Volume a market buys in every slot of a delivery day, offers of the market's product are cleared against it."""
+
+    market = models.ForeignKey(Market, on_delete=models.CASCADE, related_name="demands")
+    date = models.DateField()
+    slot_length = models.IntegerField(default=3600, choices=SlotLength.choices())
+    packed_values = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["market", "date", "slot_length"], name="simulation_demand_unique"),
+        ]
+
+    @classmethod
+    def build(cls, market: Market | str, day: date, slot_length: int, values: Sequence[str | Decimal]) -> "Demand":
+        market_id = market.pk if isinstance(market, Market) else market
+        return cls(market_id=market_id, date=day, slot_length=slot_length, packed_values=fixed_point.pack(values))
+
+    def micro_values(self) -> np.ndarray:
+        return fixed_point.unpack(self.packed_values)
+
+    def __str__(self):
+        return f"{self.date} - {self.market_id}"
+
+
+class SimulationRun(models.Model):
+    date = models.DateField()
+    # set for runs started by the gate close of a sale
+    sale = models.ForeignKey(SaleDefinition, null=True, on_delete=models.SET_NULL, related_name="+")
+    # run of the earlier sale of the delivery day this run continued from
+    previous = models.ForeignKey("self", null=True, on_delete=models.SET_NULL, related_name="+")
+    method = models.CharField(max_length=20, choices=ClearingMethod.choices, default=ClearingMethod.PRO_RATA)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f"SimulationRun({self.date}, {self.method})"
+
+
+class MarketClearing(models.Model):
+    """Per slot demand, offered and accepted totals (micro-MW) of one market in a run."""
+
+    run = models.ForeignKey(SimulationRun, on_delete=models.CASCADE, related_name="clearings")
+    market = models.ForeignKey(Market, on_delete=models.CASCADE, related_name="+")
+    slot_length = models.IntegerField(choices=SlotLength.choices())
+    demand = models.BinaryField()
+    offered = models.BinaryField()
+    accepted = models.BinaryField()
+    # offers and accepted volume of the order book after the run, the next sale of the delivery day continues from it
+    state = models.BinaryField(null=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["run", "market", "slot_length"], name="simulation_clearing_unique"),
+        ]
+
+
+class AcceptedOffer(models.Model):
+    """Per slot volume (micro-MW) accepted from the entry a position-day offered in a run."""
+
+    run = models.ForeignKey(SimulationRun, on_delete=models.CASCADE, related_name="accepted_offers")
+    market = models.ForeignKey(Market, on_delete=models.CASCADE, related_name="+")
+    offering = models.ForeignKey(DailyOffering, on_delete=models.CASCADE, related_name="+")
+    entry = models.ForeignKey(DailyOfferingEntry, on_delete=models.CASCADE, related_name="+")
+    packed_values = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["run", "offering"], name="simulation_accepted_offer_unique"),
+        ]
+
+    def micro_values(self) -> np.ndarray:
+        return fixed_point.unpack(self.packed_values)
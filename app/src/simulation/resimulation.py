@@ -0,0 +1,201 @@
+from dataclasses import dataclass, replace
+
+import numpy as np
+import structlog
+from django.db import transaction
+from django.utils import timezone
+
+from common.db import bulk_insert
+from offering import values as fixed_point
+from simulation.clearing import clear
+from simulation.engine import (
+    BATCH_SIZE,
+    BookKey,
+    OrderBook,
+    SaleState,
+    build_accepted_offers,
+    market_demands,
+    previous_run,
+    refresh_state,
+    state_after,
+)
+from simulation.models import AcceptedOffer, ClearingMethod, Demand, MarketClearing, SimulationRun
+
+log = structlog.get_logger("simulation")
+
+
+class ResimulationMismatch(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Resimulation:
+    run: SimulationRun
+    # slots cleared again, over all markets
+    slots: int
+    # positions whose accepted volume or entry changed
+    offers: int
+
+
+@dataclass(frozen=True)
+class _Cleared:
+    book: OrderBook
+    demand: np.ndarray
+    offered: np.ndarray
+    accepted: np.ndarray
+    rewritten: np.ndarray
+    slots: int
+
+
+def _pad(values: np.ndarray, columns: int) -> np.ndarray:
+    return np.hstack([values, np.zeros((len(values), columns - values.shape[1]), dtype=values.dtype)])
+
+
+def _start(book: OrderBook) -> OrderBook:
+    """The book as the run that stored it found it, before its own accepted volume."""
+    return replace(book, accepted=book.accepted - book.cleared, cleared=None)
+
+
+def _clear_changed(method: str, old: OrderBook, old_clearing: MarketClearing, new: OrderBook,
+                   demand: Demand) -> _Cleared:
+    """Clears again the slots of `new` whose offers, priorities or demand differ from those `old` was cleared with.
+
+    Every slot is cleared independently, the other slots keep their results, bit for bit those of a full run.
+    `new` extends the columns of `old` with positions that offered since.
+    """
+    columns = len(new.offering_ids)
+    residual = new.residual()
+    demand_values = np.maximum(demand.micro_values() - new.accepted.sum(axis=1), 0)
+    old_residual = _pad(_start(old).residual(), columns)
+    old_entry_ids = np.concatenate([old.entry_ids, np.zeros(columns - len(old.entry_ids), dtype=np.int64)])
+
+    changed = residual != old_residual
+    reentered = new.entry_ids != old_entry_ids
+    if method == ClearingMethod.MERIT_ORDER:
+        # a new entry moves the position back in the merit order of every slot it offers in
+        changed |= reentered & ((residual > 0) | (old_residual > 0))
+    slots = changed.any(axis=1) | (demand_values != fixed_point.unpack(old_clearing.demand))
+
+    cleared = _pad(old.cleared, columns)
+    offered = fixed_point.unpack(old_clearing.offered).copy()
+    accepted_total = fixed_point.unpack(old_clearing.accepted).copy()
+    if slots.any():
+        cleared[slots] = clear(method, residual[slots], demand_values[slots], new.entry_ids)
+        offered[slots] = residual[slots].sum(axis=1)
+        accepted_total[slots] = cleared[slots].sum(axis=1)
+    rewritten = (cleared != _pad(old.cleared, columns)).any(axis=0) | (reentered & cleared.any(axis=0))
+    return _Cleared(
+        replace(new, accepted=new.accepted + cleared, cleared=cleared),
+        demand_values, offered, accepted_total, rewritten, int(slots.sum()),
+    )
+
+
+def _clear_all(method: str, new: OrderBook, demand: Demand) -> _Cleared:
+    residual = new.residual()
+    demand_values = np.maximum(demand.micro_values() - new.accepted.sum(axis=1), 0)
+    cleared = clear(method, residual, demand_values, new.entry_ids)
+    return _Cleared(
+        replace(new, accepted=new.accepted + cleared, cleared=cleared),
+        demand_values, residual.sum(axis=1), cleared.sum(axis=1), np.ones(len(new.offering_ids), dtype=bool),
+        len(demand_values),
+    )
+
+
+def _by_offering(book: OrderBook) -> dict[int, list[int]]:
+    taken = book.cleared.any(axis=0)
+    return dict(zip(book.offering_ids[taken].tolist(), book.cleared.T[taken].tolist()))
+
+
+def _verify(run: SimulationRun, previous_run_id: int | None, demands: dict[str, list[Demand]],
+            results: dict[BookKey, _Cleared]) -> None:
+    """Compares the results with a run clearing every slot from the stored offerings."""
+    keys = {(d.market_id, d.slot_length) for market in demands.values() for d in market}
+    full = refresh_state(state_after(previous_run_id, run.date), keys)
+    mismatches = []
+    for demand in (d for market in demands.values() for d in market):
+        key = (demand.market_id, demand.slot_length)
+        expected, actual = _clear_all(run.method, full.books[key], demand), results[key]
+        if (
+            _by_offering(expected.book) != _by_offering(actual.book)
+            or not np.array_equal(expected.demand, actual.demand)
+            or not np.array_equal(expected.offered, actual.offered)
+            or not np.array_equal(expected.accepted, actual.accepted)
+        ):
+            mismatches.append(f"{key[0]}/{key[1]}")
+    if mismatches:
+        raise ResimulationMismatch(f"Run {run.pk} differs from a full run in {', '.join(mismatches)}")
+
+
+def resimulate(run: SimulationRun, verify: bool = False) -> Resimulation:
+    """Brings `run` up to date with the offerings stored since, clearing again only the slots they changed.
+
+    Offerings are read only when their current entry is not the one the run cleared. When the sale the run continued
+    from was simulated again since, every slot is cleared again. With `verify` the results are compared with
+    clearing every slot from scratch and nothing is stored when they differ.
+    """
+    previous_run_id = previous_run(run.date, run.sale)
+    demands = market_demands(run.date)
+    keys = {(d.market_id, d.slot_length) for market in demands.values() for d in market}
+    clearings = {(c.market_id, c.slot_length): c for c in MarketClearing.objects.filter(run=run)}
+    old = state_after(run.pk, run.date)
+    rebased = (
+        previous_run_id != run.previous_id
+        or (
+            previous_run_id is not None
+            and SimulationRun.objects.filter(pk=previous_run_id, finished_at__gt=run.finished_at).exists()
+        )
+        # books stored without the volume accepted by their own run
+        or any(book.cleared is None for book in old.books.values())
+    )
+
+    if rebased:
+        start = refresh_state(state_after(previous_run_id, run.date), keys)
+    else:
+        start = refresh_state(
+            SaleState(old.day, {key: _start(book) for key, book in old.books.items()}), keys
+        )
+
+    results = {}
+    for demand in (d for market in demands.values() for d in market):
+        key = (demand.market_id, demand.slot_length)
+        if rebased or key not in old.books:
+            results[key] = _clear_all(run.method, start.books[key], demand)
+        else:
+            results[key] = _clear_changed(run.method, old.books[key], clearings[key], start.books[key], demand)
+
+    if verify:
+        _verify(run, previous_run_id, demands, results)
+
+    with transaction.atomic():
+        removed = [clearing.pk for key, clearing in clearings.items() if key not in keys]
+        MarketClearing.objects.filter(pk__in=removed).delete()
+        stale = AcceptedOffer.objects.filter(run=run)
+        (stale if rebased else stale.exclude(market__in=list(demands))).delete()
+
+        updated, created, accepted_offers = [], [], []
+        # positions of order books without a demand any more lose their accepted volume
+        rewritten = [o for key, book in old.books.items() if key not in keys for o in book.offering_ids.tolist()]
+        for key, result in results.items():
+            book = result.book
+            clearing = clearings.get(key) or MarketClearing(run=run, market_id=key[0], slot_length=key[1])
+            clearing.demand = fixed_point.pack(result.demand)
+            clearing.offered = fixed_point.pack(result.offered)
+            clearing.accepted = fixed_point.pack(result.accepted)
+            clearing.state = SaleState(run.date, {key: book}).to_bytes()
+            (updated if clearing.pk else created).append(clearing)
+            rewritten.extend(book.offering_ids[result.rewritten].tolist())
+            accepted_offers.extend(build_accepted_offers(run.pk, book, book.cleared, result.rewritten))
+
+        MarketClearing.objects.bulk_update(updated, ["demand", "offered", "accepted", "state"])
+        MarketClearing.objects.bulk_create(created)
+        for i in range(0, 0 if rebased else len(rewritten), BATCH_SIZE):
+            AcceptedOffer.objects.filter(run=run, offering__in=rewritten[i:i + BATCH_SIZE]).delete()
+        bulk_insert(AcceptedOffer, accepted_offers, BATCH_SIZE)
+        run.previous_id = previous_run_id
+        run.finished_at = timezone.now()
+        run.save(update_fields=["previous", "finished_at"])
+
+    slots = sum(result.slots for result in results.values())
+    log.info("trading simulated again", run_id=run.pk, date=run.date.isoformat(), slots=slots,
+             offers=len(rewritten), verified=verify)
+    return Resimulation(run, slots, len(rewritten))
@@ -0,0 +1,163 @@
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+import arrow
+import pytz
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django_celery_beat.models import ClockedSchedule, PeriodicTask
+
+from rules.models import SaleDefinition
+
+GATE_CLOSE_TASK = "simulation.tasks.run_sale"
+RESULT_TASK = "simulation.tasks.check_sale_result"
+TASK_PREFIX = "sale:"
+
+
+@dataclass(frozen=True)
+class SaleInstants:
+    sale_id: int
+    delivery_day: date
+    gate_close_at: datetime
+    result_at: datetime
+
+
+def local_instant(day: date, at: time, tz_name: str) -> datetime:
+    """UTC instant of a wall clock time of `day` in `tz_name`.
+
+    A time skipped by a switch to summer time moves forward by the skipped hour, a time repeated by the switch
+    back is its first occurrence.
+    """
+    tz = pytz.timezone(tz_name)
+    wall_clock = datetime.combine(day, at)
+    try:
+        local = tz.localize(wall_clock, is_dst=None)
+    except pytz.AmbiguousTimeError:
+        local = tz.localize(wall_clock, is_dst=True)
+    except pytz.NonExistentTimeError:
+        local = tz.localize(wall_clock, is_dst=False)
+    return local.astimezone(dt_timezone.utc)
+
+
+def sale_calendar(sale: SaleDefinition, first_day: date, days: int) -> list[SaleInstants]:
+    """Gate close and result instants of the sale of every delivery day in [first_day, first_day + days)."""
+    instants = []
+    for offset in range(days):
+        delivery_day = first_day + timedelta(days=offset)
+        sale_day = delivery_day - timedelta(days=sale.days_offset)
+        instants.append(
+            SaleInstants(
+                sale.pk,
+                delivery_day,
+                local_instant(sale_day, sale.gate_close_time, sale.timezone_name),
+                local_instant(sale_day, sale.result_time, sale.timezone_name),
+            )
+        )
+    return instants
+
+
+def task_prefix(sale_id: int) -> str:
+    return f"{TASK_PREFIX}{sale_id}:"
+
+
+def scheduled_tasks(instants: SaleInstants) -> dict[str, tuple[str, datetime, dict]]:
+    """Periodic task name -> (task, clocked time, kwargs) of one sale of one delivery day."""
+    prefix = f"{task_prefix(instants.sale_id)}{instants.delivery_day.isoformat()}"
+    kwargs = {"sale_id": instants.sale_id, "delivery_day": instants.delivery_day.isoformat()}
+    return {
+        f"{prefix}:gate-close": (GATE_CLOSE_TASK, instants.gate_close_at,
+                                 {**kwargs, "gate_close_at": instants.gate_close_at.isoformat()}),
+        f"{prefix}:result": (RESULT_TASK, instants.result_at, {**kwargs, "result_at": instants.result_at.isoformat()}),
+    }
+
+
+def sync_sale_schedule(sale: SaleDefinition, now: datetime | None = None) -> int:
+    """Makes the pending one-off tasks of `sale` match its calendar for the coming days, returns the tasks changed.
+
+    Only tasks whose time or arguments differ are written, tasks that are due or already ran are left alone.
+    """
+    now = now or timezone.now()
+    # the sales held from today on decide the delivery days `days_offset` days later
+    first_day = arrow.get(now).to(pytz.timezone(sale.timezone_name)).date() + timedelta(days=sale.days_offset)
+    wanted = {}
+    for instants in sale_calendar(sale, first_day, settings.SALE_SCHEDULE_DAYS_AHEAD):
+        wanted.update((name, spec) for name, spec in scheduled_tasks(instants).items() if spec[1] > now)
+
+    with transaction.atomic():
+        pending = {
+            task.name: task
+            for task in PeriodicTask.objects.filter(
+                name__startswith=task_prefix(sale.pk), one_off=True, enabled=True
+            ).select_related("clocked")
+        }
+        # due tasks beat has not sent yet are kept, they are disabled once sent
+        stale = [task for name, task in pending.items() if name not in wanted and task.clocked.clocked_time > now]
+        PeriodicTask.objects.filter(pk__in=[task.pk for task in stale]).delete()
+        # schedules the removed and moved tasks used, other orphaned schedules are not this sale's to delete
+        released = {task.clocked_id for task in stale}
+
+        changed = len(stale)
+        for name, (task_name, clocked_time, kwargs) in wanted.items():
+            current = pending.get(name)
+            if current is not None and (current.task, current.clocked.clocked_time, json.loads(current.kwargs)) == (
+                task_name, clocked_time, kwargs
+            ):
+                continue
+            clocked, _ = ClockedSchedule.objects.get_or_create(clocked_time=clocked_time)
+            if current is not None and current.clocked_id != clocked.pk:
+                released.add(current.clocked_id)
+            PeriodicTask.objects.update_or_create(
+                name=name,
+                defaults={
+                    "task": task_name,
+                    "clocked": clocked,
+                    "one_off": True,
+                    "enabled": True,
+                    "kwargs": json.dumps(kwargs),
+                },
+            )
+            changed += 1
+        _delete_unused_schedules(released)
+    return changed
+
+
+def sync_sale_schedules(now: datetime | None = None) -> int:
+    return sum(sync_sale_schedule(sale, now) for sale in SaleDefinition.objects.all())
+
+
+def remove_sale_schedule(sale_id: int) -> int:
+    with transaction.atomic():
+        tasks = PeriodicTask.objects.filter(
+            name__startswith=task_prefix(sale_id), one_off=True, enabled=True, clocked__clocked_time__gt=timezone.now()
+        )
+        released = set(tasks.values_list("clocked_id", flat=True))
+        deleted, _ = tasks.delete()
+        _delete_unused_schedules(released)
+    return deleted
+
+
+def delete_sent_sale_tasks(now: datetime | None = None) -> int:
+    """Deletes the one-off sale tasks beat disabled after sending them more than `SALE_SCHEDULE_RETENTION_DAYS` ago.
+
+    Sync and removal only look at enabled tasks, without this every sale would leave two tasks per delivery day.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        tasks = PeriodicTask.objects.filter(
+            name__startswith=TASK_PREFIX,
+            one_off=True,
+            enabled=False,
+            clocked__clocked_time__lt=now - timedelta(days=settings.SALE_SCHEDULE_RETENTION_DAYS),
+        )
+        released = set(tasks.values_list("clocked_id", flat=True))
+        deleted, _ = tasks.delete()
+        _delete_unused_schedules(released)
+    return deleted
+
+
+def _delete_unused_schedules(clocked_ids: set[int]) -> None:
+    """Deletes those of `clocked_ids` no task uses any more, schedules can be shared by tasks of several sales."""
+    if clocked_ids:
+        ClockedSchedule.objects.filter(pk__in=clocked_ids, periodictask__isnull=True).delete()
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rules.models import SaleDefinition
+from simulation.schedule import remove_sale_schedule, sync_sale_schedule
+
+
+@receiver(post_save, sender=SaleDefinition)
+def reschedule_sale(sender, instance: SaleDefinition, **kwargs):
+    transaction.on_commit(lambda: sync_sale_schedule(instance))
+
+
+@receiver(post_delete, sender=SaleDefinition)
+def unschedule_sale(sender, instance: SaleDefinition, **kwargs):
+    sale_id = instance.pk
+    transaction.on_commit(lambda: remove_sale_schedule(sale_id))
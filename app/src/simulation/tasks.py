@@ -0,0 +1,96 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from itertools import repeat
+
+import structlog
+from celery import chord, shared_task
+from django.conf import settings
+from django.db import connection, connections
+from django.utils import timezone
+
+from rules.models import SaleDefinition
+from simulation import metrics
+from simulation.engine import previous_run, simulate_market
+from simulation.models import ClearingMethod, Demand, SimulationRun
+from simulation.schedule import delete_sent_sale_tasks, sync_sale_schedules
+
+log = structlog.get_logger("simulation")
+
+
+@shared_task
+def run_sale(sale_id: int, delivery_day: str, gate_close_at: str) -> int | None:
+    sale = SaleDefinition.objects.filter(pk=sale_id).first()
+    if sale is None:
+        log.warning("sale definition removed before its gate close", sale_id=sale_id, delivery_day=delivery_day)
+        return None
+    lag = (timezone.now() - datetime.fromisoformat(gate_close_at)).total_seconds()
+    metrics.sale_start_lag.labels(sale=sale.name).observe(lag)
+    log.info("sale simulation started", sale=sale.name, delivery_day=delivery_day, lag_seconds=lag)
+    return simulate_trading_in_parallel(date.fromisoformat(delivery_day), sale=sale).pk
+
+
+def simulate_trading_in_parallel(day: date, method: str = ClearingMethod.PRO_RATA,
+                                 sale: SaleDefinition | None = None) -> SimulationRun:
+    """Clears every market with a demand on `day` in its own task, the run is finished once all of them are done.
+
+    Workers run the market tasks of a chord, eager runs clear the markets in a local process pool of
+    `SIMULATION_WORKERS` processes, or one after the other within a transaction or on SQLite.
+    """
+    previous_run_id = previous_run(day, sale)
+    run = SimulationRun.objects.create(date=day, method=method, sale=sale, previous_id=previous_run_id)
+    markets = sorted(set(Demand.objects.filter(date=day).values_list("market_id", flat=True)))
+    if settings.CELERY_TASK_ALWAYS_EAGER or not markets:
+        finish_simulation(_simulate_markets_locally(run, markets, previous_run_id), run.pk)
+        run.refresh_from_db(fields=["finished_at"])
+    else:
+        chord(simulate_market_task.s(run.pk, market, previous_run_id) for market in markets)(
+            finish_simulation.s(run.pk)
+        )
+    return run
+
+
+def _simulate_market(run_id: int, market: str, previous_run_id: int | None) -> int:
+    return simulate_market(SimulationRun.objects.get(pk=run_id), market, previous_run_id)
+
+
+def _simulate_markets_locally(run: SimulationRun, markets: list[str], previous_run_id: int | None) -> list[int]:
+    workers = min(settings.SIMULATION_WORKERS, len(markets))
+    # forked processes would not see the uncommitted run and closing the connection would abort the transaction,
+    # SQLite serializes the writers anyway
+    if workers <= 1 or connection.in_atomic_block or connection.vendor == "sqlite":
+        return [simulate_market(run, market, previous_run_id) for market in markets]
+    # forked processes must not share the connections of this one
+    connections.close_all()
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork")) as pool:
+        return list(pool.map(_simulate_market, repeat(run.pk), markets, repeat(previous_run_id)))
+
+
+@shared_task
+def simulate_market_task(run_id: int, market: str, previous_run_id: int | None) -> int:
+    return _simulate_market(run_id, market, previous_run_id)
+
+
+@shared_task
+def finish_simulation(offers: list[int], run_id: int) -> int:
+    SimulationRun.objects.filter(pk=run_id).update(finished_at=timezone.now())
+    log.info("trading simulated", run_id=run_id, markets=len(offers), offers=sum(offers))
+    return run_id
+
+
+@shared_task
+def check_sale_result(sale_id: int, delivery_day: str, result_at: str) -> bool:
+    finished = SimulationRun.objects.filter(
+        sale_id=sale_id, date=date.fromisoformat(delivery_day), finished_at__lte=datetime.fromisoformat(result_at)
+    ).exists()
+    if not finished:
+        sale = SaleDefinition.objects.filter(pk=sale_id).first()
+        metrics.sale_results_late.labels(sale=sale.name if sale else str(sale_id)).inc()
+        log.warning("sale simulation not finished at result time", sale_id=sale_id, delivery_day=delivery_day)
+    return finished
+
+
+@shared_task
+def refresh_sale_schedules() -> int:
+    delete_sent_sale_tasks()
+    return sync_sale_schedules()
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from assertpy import assert_that
+
+from simulation.clearing import clear, clear_merit_order, clear_pro_rata
+from simulation.models import ClearingMethod
+
+
+def matrix(*slots: list[int]) -> np.ndarray:
+    return np.array(slots, dtype=np.int64)
+
+
+def test_pro_rata_accepts_everything_when_demand_covers_offers():
+    offers = matrix([10, 20], [5, 0])
+
+    accepted = clear_pro_rata(offers, np.array([30, 100]))
+
+    assert_that(accepted.tolist()).is_equal_to(offers.tolist())
+
+
+def test_pro_rata_shares_short_demand():
+    accepted = clear_pro_rata(matrix([10, 30], [1, 1], [3, 3]), np.array([20, 0, 5]))
+
+    assert_that(accepted.tolist()).is_equal_to([[5, 15], [0, 0], [2, 2]])
+
+
+def test_pro_rata_ignores_negative_offers():
+    accepted = clear_pro_rata(matrix([-10, 10]), np.array([5]))
+
+    assert_that(accepted.tolist()).is_equal_to([[0, 5]])
+
+
+def test_merit_order_fills_demand_by_priority():
+    offers = matrix([10, 20, 30], [10, 20, 30])
+
+    accepted = clear_merit_order(offers, np.array([25, 60]), priority=np.array([3, 1, 2]))
+
+    assert_that(accepted.tolist()).is_equal_to([[0, 20, 5], [10, 20, 30]])
+
+
+def test_accepted_never_exceeds_demand_or_offers():
+    rng = np.random.default_rng(7)
+    offers = rng.integers(0, 10**9, size=(24, 500))
+    demand = rng.integers(0, 10**11, size=24)
+
+    for method in ClearingMethod.values:
+        accepted = clear(method, offers, demand, np.arange(500))
+        assert_that(bool((accepted <= offers).all() and (accepted >= 0).all())).is_true()
+        assert_that(bool((accepted.sum(axis=1) <= demand).all())).is_true()
+
+
+def test_clear_rejects_demand_of_other_length():
+    with pytest.raises(ValueError, match="Demand has 23 slots, offers have 24"):
+        clear(ClearingMethod.PRO_RATA, np.zeros((24, 1), dtype=np.int64), np.zeros(23, dtype=np.int64), np.zeros(1))
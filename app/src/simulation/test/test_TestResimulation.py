@@ -0,0 +1,107 @@
+from datetime import date, time
+
+import pytest
+from assertpy import assert_that
+
+from offering import values as fixed_point
+from offering.ingestion import split_into_days, store_offering_days
+from rules.models import Market, SaleDefinition
+from simulation.engine import simulate_trading_on
+from simulation.models import AcceptedOffer, ClearingMethod, Demand, MarketClearing
+from simulation.resimulation import ResimulationMismatch, resimulate
+
+pytestmark = pytest.mark.django_db
+
+DAY = date(2025, 1, 16)
+
+
+def store(position_name: str, values: list[str]) -> None:
+    store_offering_days(split_into_days(position_name, "2025-01-15T23:00:00Z", 3600, values))
+
+
+@pytest.fixture
+def markets():
+    Market.objects.create(code="FCRN")
+    Market.objects.create(code="FCRD")
+    Demand.build("FCRN", DAY, 3600, ["6"] * 24).save()
+    Demand.build("FCRD", DAY, 3600, ["10"] * 24).save()
+    store("FI_client1_FCRN", ["4"] * 24)
+    store("FI_client2_FCRN", ["8"] * 24)
+    store("FI_client1_FCRD", ["3"] * 24)
+
+
+def results(run) -> tuple[dict[str, tuple[int, list[int]]], dict[str, tuple[list[int], ...]]]:
+    offers = {
+        offer.offering.position_name: (offer.entry_id, offer.micro_values().tolist())
+        for offer in AcceptedOffer.objects.filter(run=run).select_related("offering")
+    }
+    clearings = {
+        clearing.market_id: tuple(
+            fixed_point.unpack(values).tolist() for values in (clearing.demand, clearing.offered, clearing.accepted)
+        )
+        for clearing in MarketClearing.objects.filter(run=run)
+    }
+    return offers, clearings
+
+
+@pytest.mark.parametrize("method", [ClearingMethod.PRO_RATA, ClearingMethod.MERIT_ORDER])
+def test_resimulation_clears_changed_slots_like_a_full_run(markets, method):
+    run = simulate_trading_on(DAY, method)
+    store("FI_client1_FCRN", ["2", "2", "2"] + ["4"] * 21)
+    store("SE_client3_FCRD", ["5"] * 24)
+
+    result = resimulate(run, verify=True)
+
+    assert_that(results(run)).is_equal_to(results(simulate_trading_on(DAY, method)))
+    if method == ClearingMethod.PRO_RATA:
+        assert_that(result.slots).is_equal_to(3 + 24)
+    else:
+        # the new entry puts client1 behind client2 in every slot
+        assert_that(result.slots).is_equal_to(24 + 24)
+
+
+def test_resimulation_without_changes_clears_nothing(markets):
+    run = simulate_trading_on(DAY)
+    before = results(run)
+
+    result = resimulate(run)
+
+    assert_that((result.slots, result.offers)).is_equal_to((0, 0))
+    assert_that(results(run)).is_equal_to(before)
+
+
+def test_resimulation_follows_changed_demand(markets):
+    run = simulate_trading_on(DAY)
+    Demand.objects.filter(market="FCRN").update(packed_values=fixed_point.pack(["3"] + ["6"] * 23))
+
+    assert_that(resimulate(run, verify=True).slots).is_equal_to(1)
+    assert_that(results(run)).is_equal_to(results(simulate_trading_on(DAY)))
+
+
+def test_verification_rejects_results_differing_from_a_full_run(markets):
+    run = simulate_trading_on(DAY)
+    clearing = MarketClearing.objects.get(run=run, market="FCRN")
+    clearing.accepted = fixed_point.pack(["1"] * 24)
+    clearing.save()
+
+    assert_that(resimulate).raises(ResimulationMismatch).when_called_with(run, verify=True).contains("FCRN/3600")
+
+
+def test_later_sale_is_cleared_again_after_the_earlier_sale_ran_again(markets, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=False):
+        first_sale, second_sale = (
+            SaleDefinition.objects.create(name=name, days_offset=offset, gate_close_time=time(9), result_time=time(10))
+            for name, offset in [("D-2", 2), ("D-1", 1)]
+        )
+    first = simulate_trading_on(DAY, sale=first_sale)
+    store("SE_client3_FCRD", ["5"] * 24)
+    second = simulate_trading_on(DAY, sale=second_sale)
+    assert_that(results(second)[0]).contains_key("SE_client3_FCRD")
+
+    resimulate(first)
+    result = resimulate(second, verify=True)
+
+    # the earlier sale took the new offer too, the later one has nothing left to accept
+    assert_that(result.slots).is_equal_to(48)
+    assert_that(results(first)[0]).contains_key("SE_client3_FCRD")
+    assert_that(results(second)[0]).is_empty()
@@ -0,0 +1,176 @@
+import json
+from datetime import date, datetime, time, timezone
+
+import pytest
+from assertpy import assert_that
+from django_celery_beat.models import ClockedSchedule, PeriodicTask
+from prometheus_client import REGISTRY
+
+from rules.models import Market, SaleDefinition
+from simulation.models import Demand, SimulationRun
+from simulation.schedule import delete_sent_sale_tasks, local_instant, sale_calendar, sync_sale_schedule
+from simulation.tasks import check_sale_result, run_sale
+
+pytestmark = pytest.mark.django_db
+
+NOW = datetime(2025, 3, 28, 6, tzinfo=timezone.utc)
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def sale(settings, django_capture_on_commit_callbacks):
+    settings.SALE_SCHEDULE_DAYS_AHEAD = 3
+    with django_capture_on_commit_callbacks(execute=False):
+        return SaleDefinition.objects.create(
+            name="D-1", days_offset=1, gate_close_time=time(9, 30), result_time=time(10), timezone_name="CET"
+        )
+
+
+def scheduled(sale: SaleDefinition) -> dict[str, tuple[datetime, dict]]:
+    return {
+        task.name: (task.clocked.clocked_time, json.loads(task.kwargs))
+        for task in PeriodicTask.objects.filter(name__startswith=f"sale:{sale.pk}:").select_related("clocked")
+    }
+
+
+def test_local_instant_follows_dst():
+    assert_that(local_instant(date(2025, 3, 29), time(9, 30), "CET")).is_equal_to(utc(2025, 3, 29, 8, 30))
+    assert_that(local_instant(date(2025, 3, 30), time(9, 30), "CET")).is_equal_to(utc(2025, 3, 30, 7, 30))
+    # skipped by the switch to summer time, the same instant as 03:30 CEST
+    assert_that(local_instant(date(2025, 3, 30), time(2, 30), "CET")).is_equal_to(utc(2025, 3, 30, 1, 30))
+    # repeated by the switch back, the first occurrence
+    assert_that(local_instant(date(2025, 10, 26), time(2, 30), "CET")).is_equal_to(utc(2025, 10, 26, 0, 30))
+
+
+def test_sale_calendar_closes_days_offset_before_delivery(sale):
+    sale.days_offset = 2
+
+    [instants] = sale_calendar(sale, date(2025, 4, 1), 1)
+
+    assert_that(instants.delivery_day).is_equal_to(date(2025, 4, 1))
+    assert_that(instants.gate_close_at).is_equal_to(utc(2025, 3, 30, 7, 30))
+    assert_that(instants.result_at).is_equal_to(utc(2025, 3, 30, 8))
+
+
+def test_sync_registers_clocked_tasks_for_coming_sales(sale):
+    assert_that(sync_sale_schedule(sale, NOW)).is_equal_to(6)
+
+    tasks = scheduled(sale)
+    assert_that(sorted(tasks)).is_equal_to([
+        f"sale:{sale.pk}:2025-03-29:gate-close",
+        f"sale:{sale.pk}:2025-03-29:result",
+        f"sale:{sale.pk}:2025-03-30:gate-close",
+        f"sale:{sale.pk}:2025-03-30:result",
+        f"sale:{sale.pk}:2025-03-31:gate-close",
+        f"sale:{sale.pk}:2025-03-31:result",
+    ])
+    assert_that(tasks[f"sale:{sale.pk}:2025-03-29:gate-close"][0]).is_equal_to(utc(2025, 3, 28, 8, 30))
+    assert_that(tasks[f"sale:{sale.pk}:2025-03-31:gate-close"]).is_equal_to((
+        utc(2025, 3, 30, 7, 30),
+        {"sale_id": sale.pk, "delivery_day": "2025-03-31", "gate_close_at": "2025-03-30T07:30:00+00:00"},
+    ))
+    assert_that(PeriodicTask.objects.get(name=f"sale:{sale.pk}:2025-03-29:gate-close").task).is_equal_to(
+        "simulation.tasks.run_sale"
+    )
+
+
+def test_sync_skips_unchanged_tasks_and_keeps_due_ones(sale):
+    sync_sale_schedule(sale, NOW)
+
+    assert_that(sync_sale_schedule(sale, utc(2025, 3, 28, 9, 45))).is_equal_to(0)
+    assert_that(sync_sale_schedule(sale, utc(2025, 3, 29, 9, 45))).is_equal_to(2)
+    assert_that(scheduled(sale)).contains_key(
+        f"sale:{sale.pk}:2025-03-29:gate-close", f"sale:{sale.pk}:2025-04-01:gate-close"
+    )
+
+
+def test_changed_definition_reschedules_pending_tasks(sale, django_capture_on_commit_callbacks, time_machine):
+    time_machine.move_to(NOW, tick=False)
+    sync_sale_schedule(sale)
+
+    sale.gate_close_time = time(8)
+    with django_capture_on_commit_callbacks(execute=True):
+        sale.save()
+
+    gate_closes = {name: at for name, (at, _) in scheduled(sale).items() if name.endswith("gate-close")}
+    assert_that(set(gate_closes.values())).is_equal_to(
+        {utc(2025, 3, 28, 7), utc(2025, 3, 29, 7), utc(2025, 3, 30, 6)}
+    )
+
+
+def test_deleted_definition_removes_pending_tasks(sale, django_capture_on_commit_callbacks, time_machine):
+    time_machine.move_to(NOW, tick=False)
+    sync_sale_schedule(sale)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sale.delete()
+
+    assert_that(PeriodicTask.objects.filter(name__startswith="sale:").exists()).is_false()
+
+
+def test_sync_deletes_only_schedules_of_its_own_removed_tasks(sale, django_capture_on_commit_callbacks,
+                                                              time_machine):
+    time_machine.move_to(NOW, tick=False)
+    sync_sale_schedule(sale)
+    unrelated = ClockedSchedule.objects.create(clocked_time=utc(2025, 4, 10, 12))
+    before = set(ClockedSchedule.objects.values_list("clocked_time", flat=True))
+
+    sale.gate_close_time = time(8)
+    with django_capture_on_commit_callbacks(execute=True):
+        sale.save()
+
+    remaining = set(ClockedSchedule.objects.values_list("clocked_time", flat=True))
+    assert_that(remaining).contains(unrelated.clocked_time).does_not_contain(utc(2025, 3, 28, 8, 30))
+    assert_that(remaining - before).is_length(3)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sale.delete()
+
+    assert_that(list(ClockedSchedule.objects.all())).is_equal_to([unrelated])
+
+
+def test_sent_tasks_are_deleted_after_retention(sale, settings):
+    settings.SALE_SCHEDULE_RETENTION_DAYS = 2
+    sync_sale_schedule(sale, NOW)
+    # beat disables one-off tasks once it sent them
+    PeriodicTask.objects.filter(name__startswith=f"sale:{sale.pk}:").update(enabled=False)
+    shared = ClockedSchedule.objects.get(clocked_time=utc(2025, 3, 28, 8, 30))
+    PeriodicTask.objects.create(name="other", task="x", clocked=shared, one_off=True, enabled=False)
+
+    assert_that(delete_sent_sale_tasks(utc(2025, 3, 31, 8, 45))).is_equal_to(3)
+
+    assert_that({clocked_time for clocked_time, _ in scheduled(sale).values()}).is_equal_to(
+        {utc(2025, 3, 29, 9), utc(2025, 3, 30, 7, 30), utc(2025, 3, 30, 8)}
+    )
+    assert_that(set(ClockedSchedule.objects.values_list("clocked_time", flat=True))).is_equal_to(
+        {utc(2025, 3, 28, 8, 30), utc(2025, 3, 29, 9), utc(2025, 3, 30, 7, 30), utc(2025, 3, 30, 8)}
+    )
+
+
+def test_run_sale_simulates_and_records_start_lag(sale, time_machine, settings):
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    Market.objects.create(code="FCRN")
+    Demand.build("FCRN", date(2025, 3, 29), 3600, ["1"] * 24).save()
+    time_machine.move_to(utc(2025, 3, 28, 8, 30, 3), tick=False)
+    lag_before = REGISTRY.get_sample_value("simulation_sale_start_lag_seconds_sum", {"sale": "D-1"}) or 0
+
+    run_id = run_sale(sale.pk, "2025-03-29", "2025-03-28T08:30:00+00:00")
+
+    run = SimulationRun.objects.get(pk=run_id)
+    assert_that((run.sale_id, run.date)).is_equal_to((sale.pk, date(2025, 3, 29)))
+    assert_that(run.finished_at).is_not_none()
+    assert_that(REGISTRY.get_sample_value("simulation_sale_start_lag_seconds_sum", {"sale": "D-1"})).is_equal_to(
+        lag_before + 3.0
+    )
+
+
+def test_check_sale_result_counts_late_sales(sale):
+    before = REGISTRY.get_sample_value("simulation_sale_results_late_total", {"sale": "D-1"}) or 0
+
+    assert_that(check_sale_result(sale.pk, "2025-03-29", "2025-03-28T09:00:00+00:00")).is_false()
+    assert_that(REGISTRY.get_sample_value("simulation_sale_results_late_total", {"sale": "D-1"})).is_equal_to(
+        before + 1
+    )
@@ -0,0 +1,216 @@
+from datetime import date, time
+
+import pytest
+from assertpy import assert_that
+from django.db import transaction
+
+from offering import values as fixed_point
+from offering.ingestion import advance_current_entries, split_into_days, store_offering_days
+from offering.models import DailyOffering, DailyOfferingEntry
+from rules.models import Market, SaleDefinition
+from simulation.engine import (
+    SaleState,
+    load_order_books,
+    load_state,
+    refresh_state,
+    simulate_sales,
+    simulate_trading_on,
+    state_after,
+)
+from simulation.models import AcceptedOffer, ClearingMethod, Demand, MarketClearing
+from simulation import tasks
+from simulation.tasks import simulate_trading_in_parallel
+
+pytestmark = pytest.mark.django_db
+
+DAY = date(2025, 1, 16)
+
+
+def store(position_name: str, values: list[str]) -> None:
+    store_offering_days(split_into_days(position_name, "2025-01-15T23:00:00Z", 3600, values))
+
+
+@pytest.fixture
+def markets():
+    Market.objects.create(code="FCRN")
+    Market.objects.create(code="FCRD")
+    Demand.build("FCRN", DAY, 3600, ["6"] * 24).save()
+    Demand.build("FCRD", DAY, 3600, ["10"] * 24).save()
+
+
+def accepted_by_position(run) -> dict[str, list[int]]:
+    return {
+        offer.offering.position_name: offer.micro_values().tolist()
+        for offer in AcceptedOffer.objects.filter(run=run).select_related("offering")
+    }
+
+
+def test_load_order_books_builds_slot_by_position_matrices(markets):
+    store("FI_client1_FCRN", [str(i) for i in range(24)])
+    store("SE_client2_FCRN", ["1"] * 24)
+    store("FI_client1_FCRD", ["1"] * 24)
+
+    books = load_order_books(DAY, {("FCRN", 3600), ("AFRR", 3600)})
+
+    book = books[("FCRN", 3600)]
+    assert_that(book.offers.shape).is_equal_to((24, 2))
+    assert_that(book.offers[:, 0].tolist()).is_equal_to([i * fixed_point.SCALE for i in range(24)])
+    assert_that(books[("AFRR", 3600)].offers.shape).is_equal_to((24, 0))
+
+
+def test_pro_rata_run_persists_accepted_volume_per_position(markets):
+    store("FI_client1_FCRN", ["4"] * 24)
+    store("FI_client2_FCRN", ["8"] * 24)
+    store("FI_client1_FCRD", ["3"] * 24)
+
+    run = simulate_trading_on(DAY)
+
+    assert_that(run.finished_at).is_not_none()
+    assert_that(accepted_by_position(run)).is_equal_to({
+        "FI_client1_FCRN": [2_000_000] * 24,
+        "FI_client2_FCRN": [4_000_000] * 24,
+        "FI_client1_FCRD": [3_000_000] * 24,
+    })
+    clearing = MarketClearing.objects.get(run=run, market="FCRD")
+    assert_that(fixed_point.unpack(clearing.offered).tolist()).is_equal_to([3_000_000] * 24)
+    assert_that(fixed_point.unpack(clearing.accepted).tolist()).is_equal_to([3_000_000] * 24)
+
+
+def test_merit_order_run_prefers_earlier_entries(markets):
+    store("FI_client2_FCRN", ["4"] * 24)
+    store("FI_client1_FCRN", ["4"] * 24)
+
+    run = simulate_trading_on(DAY, ClearingMethod.MERIT_ORDER)
+
+    assert_that(accepted_by_position(run)).is_equal_to({
+        "FI_client2_FCRN": [4_000_000] * 24,
+        "FI_client1_FCRN": [2_000_000] * 24,
+    })
+
+
+def test_market_without_offers_is_cleared_empty(markets):
+    run = simulate_trading_on(DAY)
+
+    assert_that(run.accepted_offers.count()).is_equal_to(0)
+    clearing = MarketClearing.objects.get(run=run, market="FCRN")
+    assert_that(fixed_point.unpack(clearing.accepted).tolist()).is_equal_to([0] * 24)
+
+
+@pytest.fixture
+def sales(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=False):
+        return [
+            SaleDefinition.objects.create(name=name, days_offset=offset, gate_close_time=time(9), result_time=time(10))
+            for name, offset in [("D-1", 1), ("D-2", 2)]
+        ]
+
+
+def test_later_sale_clears_what_the_earlier_sale_left(markets, sales):
+    store("FI_client1_FCRD", ["3"] * 24)
+    first = simulate_trading_on(DAY, sale=sales[1])
+
+    store("FI_client1_FCRD", ["5"] * 24)
+    store("SE_client2_FCRD", ["4"] * 24)
+    second = simulate_trading_on(DAY, sale=sales[0])
+
+    assert_that(accepted_by_position(first)).contains_entry({"FI_client1_FCRD": [3_000_000] * 24})
+    assert_that(accepted_by_position(second)).is_equal_to({
+        "FI_client1_FCRD": [2_000_000] * 24,
+        "SE_client2_FCRD": [4_000_000] * 24,
+    })
+    clearing = MarketClearing.objects.get(run=second, market="FCRD")
+    assert_that(fixed_point.unpack(clearing.demand).tolist()).is_equal_to([7_000_000] * 24)
+    assert_that(fixed_point.unpack(clearing.offered).tolist()).is_equal_to([6_000_000] * 24)
+
+
+def test_simulate_sales_runs_sales_in_days_offset_order(markets, sales):
+    store("FI_client1_FCRN", ["4"] * 24)
+    store("FI_client2_FCRN", ["8"] * 24)
+
+    first, second = simulate_sales(DAY, sales)
+
+    assert_that([first.sale_id, second.sale_id]).is_equal_to([sales[1].pk, sales[0].pk])
+    assert_that(accepted_by_position(first)).is_length(2)
+    assert_that(accepted_by_position(second)).is_empty()
+    book = state_after(second.pk, DAY).books[("FCRN", 3600)]
+    assert_that(book.accepted.sum(axis=1).tolist()).is_equal_to([6_000_000] * 24)
+
+
+def test_sale_state_round_trips_through_bytes(markets):
+    store("FI_client1_FCRN", [str(i) for i in range(24)])
+    state = load_state(DAY, {("FCRN", 3600), ("FCRD", 3600)})
+
+    restored = SaleState.from_bytes(state.to_bytes())
+
+    assert_that((restored.day, restored.entries())).is_equal_to((state.day, state.entries()))
+    assert_that(restored.books[("FCRN", 3600)].offers.tolist()).is_equal_to(state.books[("FCRN", 3600)].offers.tolist())
+    assert_that(restored.books[("FCRD", 3600)].offers.shape).is_equal_to((24, 0))
+
+
+def test_refresh_reads_entry_committed_after_a_newer_one(markets):
+    store("FI_client1_FCRN", ["1"] * 24)
+    [late_day] = split_into_days("FI_client1_FCRN", "2025-01-15T23:00:00Z", 3600, ["2"] * 24)
+    # an upload gets its entry id, then commits only after another upload stored a newer entry
+    late = DailyOfferingEntry.build(late_day.slot_length, late_day.values, late_day.micro_values)
+    late.save()
+    store("FI_client2_FCRN", ["1"] * 24)
+    state = load_state(DAY, {("FCRN", 3600)})
+
+    offering = DailyOffering.objects.get(position_name="FI_client1_FCRN")
+    offering.entries.add(late)
+    advance_current_entries([late_day], [late.pk], {("FI_client1_FCRN", DAY): offering.pk})
+
+    book = refresh_state(state, {("FCRN", 3600)}).books[("FCRN", 3600)]
+    assert_that(dict(zip(book.offering_ids.tolist(), book.offers[0].tolist()))).contains_entry(
+        {offering.pk: 2_000_000}
+    )
+
+
+@pytest.fixture
+def eager(settings):
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    settings.SIMULATION_WORKERS = 1
+
+
+def test_parallel_run_matches_sequential_run(markets, eager):
+    store("FI_client1_FCRN", ["4"] * 24)
+    store("FI_client2_FCRN", ["8"] * 24)
+    store("FI_client1_FCRD", ["3"] * 24)
+
+    parallel = simulate_trading_in_parallel(DAY, ClearingMethod.MERIT_ORDER)
+
+    assert_that(parallel.finished_at).is_not_none()
+    sequential = simulate_trading_on(DAY, ClearingMethod.MERIT_ORDER)
+    assert_that(accepted_by_position(parallel)).is_equal_to(accepted_by_position(sequential))
+
+
+def test_eager_run_in_a_transaction_does_not_fork(markets, eager, settings, monkeypatch):
+    settings.SIMULATION_WORKERS = 4
+    monkeypatch.setattr(tasks, "ProcessPoolExecutor", None)
+    store("FI_client1_FCRN", ["4"] * 24)
+    store("FI_client1_FCRD", ["3"] * 24)
+
+    with transaction.atomic():
+        run = simulate_trading_in_parallel(DAY)
+
+    assert_that(run.finished_at).is_not_none()
+    assert_that(accepted_by_position(run)).contains_key("FI_client1_FCRN", "FI_client1_FCRD")
+
+
+def test_parallel_sale_continues_from_each_market_state(markets, sales, eager):
+    store("FI_client1_FCRD", ["3"] * 24)
+    store("FI_client1_FCRN", ["4"] * 24)
+    simulate_trading_in_parallel(DAY, sale=sales[1])
+
+    store("SE_client2_FCRD", ["4"] * 24)
+    second = simulate_trading_in_parallel(DAY, sale=sales[0])
+
+    assert_that(accepted_by_position(second)).is_equal_to({"SE_client2_FCRD": [4_000_000] * 24})
+
+
+def test_state_after_reads_only_the_requested_markets(markets):
+    store("FI_client1_FCRN", ["4"] * 24)
+    run = simulate_trading_on(DAY)
+
+    assert_that(state_after(run.pk, DAY, ["FCRN"]).books).is_length(1).contains_key(("FCRN", 3600))
+    assert_that(state_after(run.pk, DAY).books).is_length(2)